@@ -0,0 +1,493 @@
+# app/api.py
+
+import argparse
+import os
+import secrets
+from collections.abc import AsyncIterator, Callable, Sequence
+from datetime import UTC, date, datetime
+from functools import cache
+from typing import Annotated
+
+import pandas as pd
+import uvicorn
+from fastapi import Body, Depends, FastAPI, HTTPException, status
+from fastapi.responses import JSONResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert, get_async_engine
+from app.importers import (
+    CLIENT_TEXT_COLUMNS,
+    RowError,
+    validate_clients,
+    validate_products,
+)
+from app.inventory import (
+    InsufficientStockError,
+    adjust_stock,
+    receive_stock,
+    record_opening_stock,
+)
+from app.migrate import current_revision, head_revision
+from app.models import (
+    Client,
+    ClientCategory,
+    ClientType,
+    Order,
+    PaymentMethod,
+    Product,
+    ProductUnit,
+)
+from app.order_service import OrderLine, OrderService, OrderValidationError
+from app.utils import reserve_product_indexes
+
+# Bearer token every request must carry; unset leaves the API open (development).
+API_TOKEN = os.getenv("API_TOKEN") or None
+# Most items accepted in one batch request.
+API_MAX_BATCH = int(os.getenv("API_MAX_BATCH", "1000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "2"))
+
+
+# --- Request and response bodies ---
+class ProductIn(BaseModel):
+    name: str
+    unit: str = Field(description="One of: pcs, kg, set, m.")
+    vat_rate: float = 23.0
+    stock: float = Field(
+        0.0, description="Opening stock, recorded as a receipt; ignored for updates."
+    )
+    product_index: int | None = Field(
+        None, description="Updates the product with this index; omit to create one."
+    )
+
+
+class ClientIn(BaseModel):
+    """A client; one with the VAT ID of an existing client updates it."""
+
+    category: str = Field(description="'Company' or 'Individual'.")
+    client_type: str = ClientType.RECIPIENT.value
+    company_name: str | None = None
+    vat_id: str | None = None
+    first_name: str | None = None
+    last_name: str | None = None
+    email: str | None = None
+    phone_number: str | None = None
+    address_street: str | None = None
+    address_zipcode: str | None = None
+    address_city: str | None = None
+
+
+class OrderLineIn(BaseModel):
+    product_id: int
+    quantity: float
+    price_per_unit: float
+
+
+class OrderIn(BaseModel):
+    client_id: int
+    lines: list[OrderLineIn]
+    order_date: datetime | None = None
+
+    @field_validator("order_date")
+    @classmethod
+    def naive_utc(cls, value: datetime | None) -> datetime | None:
+        """The database stores naive UTC timestamps; offsets are converted."""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(UTC).replace(tzinfo=None)
+        return value
+
+
+class InvoiceIn(BaseModel):
+    order_id: int
+    payment_method: PaymentMethod = PaymentMethod.BANK_TRANSFER
+    payment_due_date: date | None = None
+    paid: bool = False
+
+
+class StockReceiptIn(BaseModel):
+    product_id: int
+    quantity: float = Field(gt=0)
+    note: str | None = None
+
+
+class StockAdjustmentIn(BaseModel):
+    """A stock count; the difference to the recorded stock is an adjustment."""
+
+    product_id: int
+    counted: float = Field(ge=0)
+    note: str | None = None
+
+
+class ItemResult(BaseModel):
+    """The outcome of one batch item; index is its position in the request."""
+
+    index: int
+    ok: bool
+    id: int | None = None
+    invoice_number: str | None = None
+    errors: list[str] = []
+
+
+class BatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[ItemResult]
+
+    @classmethod
+    def of(cls, results: dict[int, ItemResult]) -> "BatchResult":
+        ordered = [results[index] for index in sorted(results)]
+        succeeded = sum(result.ok for result in ordered)
+        return cls(
+            succeeded=succeeded, failed=len(ordered) - succeeded, results=ordered
+        )
+
+
+# Request bodies of the batch endpoints.
+ProductBatch = Annotated[list[ProductIn], Body(min_length=1, max_length=API_MAX_BATCH)]
+ClientBatch = Annotated[list[ClientIn], Body(min_length=1, max_length=API_MAX_BATCH)]
+OrderBatch = Annotated[list[OrderIn], Body(min_length=1, max_length=API_MAX_BATCH)]
+InvoiceBatch = Annotated[list[InvoiceIn], Body(min_length=1, max_length=API_MAX_BATCH)]
+StockReceiptBatch = Annotated[
+    list[StockReceiptIn], Body(min_length=1, max_length=API_MAX_BATCH)
+]
+StockAdjustmentBatch = Annotated[
+    list[StockAdjustmentIn], Body(min_length=1, max_length=API_MAX_BATCH)
+]
+
+
+# --- Batch operations; each runs in one transaction and does not commit ---
+def _failures(errors: list[RowError]) -> dict[int, ItemResult]:
+    results: dict[int, ItemResult] = {}
+    for error in errors:
+        result = results.setdefault(error.row, ItemResult(index=error.row, ok=False))
+        result.errors.append(error.message)
+    return results
+
+
+def _save_rows(
+    db: Session,
+    indexes: list[int],
+    write: Callable[[], list[int]],
+    results: dict[int, ItemResult],
+) -> None:
+    """
+    Runs a bulk write in a savepoint, so a failure only fails these items, and
+    records the id write returns for each item.
+    """
+    try:
+        with db.begin_nested():
+            ids = write() if indexes else []
+    except SQLAlchemyError as e:
+        message = f"Batch could not be saved: {e.__class__.__name__}."
+        for index in indexes:
+            results[index] = ItemResult(index=index, ok=False, errors=[message])
+        return
+    for index, id_ in zip(indexes, ids, strict=True):
+        results[index] = ItemResult(index=index, ok=True, id=id_)
+
+
+# RETURNING rows of an upsert are matched to the items by their unique key:
+# asyncpg cannot run upserts with sort_by_parameter_order.
+def upsert_products(db: Session, items: Sequence[ProductIn]) -> BatchResult:
+    """
+    Creates products without an index and updates the ones with an index, in
+    one INSERT ... ON CONFLICT. The opening stock of new products is recorded
+    as a receipt; the stock of existing products is only changed through
+    orders and the inventory ledger.
+    """
+    frame = pd.DataFrame([item.model_dump() for item in items])
+    products, errors = validate_products(frame)
+    results = _failures(errors)
+
+    given = frame["product_index"].dropna().astype(int)
+    repeated = given.duplicated(keep="first")
+    known = set(
+        db.scalars(
+            select(Product.product_index).where(
+                Product.product_index.in_(given.unique().tolist())
+            )
+        )
+    )
+    for index, product_index in given.items():
+        if product_index not in known:
+            message = f"Product with index {product_index} not found."
+        elif repeated[index]:
+            message = f"Product index {product_index} appears more than once."
+        else:
+            continue
+        result = results.setdefault(index, ItemResult(index=int(index), ok=False))
+        result.errors.append(message)
+    products = products.drop(index=list(results), errors="ignore")
+
+    updates = {index: items[index].product_index for index in products.index}
+    new_indexes = iter(
+        reserve_product_indexes(db, sum(value is None for value in updates.values()))
+    )
+    rows = [
+        {
+            "name": name,
+            "product_index": (
+                next(new_indexes) if updates[index] is None else updates[index]
+            ),
+            "unit": ProductUnit(unit),
+            "stock": float(stock),
+            "vat_rate": float(vat_rate),
+        }
+        for index, (name, unit, stock, vat_rate) in zip(
+            products.index, products.itertuples(index=False), strict=True
+        )
+    ]
+    stmt = dialect_insert(db)(Product)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Product.product_index],
+        set_={
+            "name": stmt.excluded.name,
+            "unit": stmt.excluded.unit,
+            "vat_rate": stmt.excluded.vat_rate,
+        },
+    ).returning(Product.product_index, Product.id)
+
+    def write() -> list[int]:
+        ids = dict(db.execute(stmt, rows).tuples().all())
+        record_opening_stock(
+            db,
+            [
+                row["product_index"]
+                for index, row in zip(products.index, rows, strict=True)
+                if updates[index] is None
+            ],
+        )
+        return [ids[row["product_index"]] for row in rows]
+
+    _save_rows(db, products.index.tolist(), write, results)
+    return BatchResult.of(results)
+
+
+def upsert_clients(db: Session, items: Sequence[ClientIn]) -> BatchResult:
+    """
+    Creates clients and updates the ones whose VAT ID already exists, in one
+    INSERT ... ON CONFLICT. Clients without a VAT ID are always created, with
+    a plain bulk INSERT.
+    """
+    frame = pd.DataFrame([item.model_dump() for item in items]).fillna("")
+    # Existing VAT IDs are updated rather than rejected as in a file import.
+    clients, errors = validate_clients(frame, lambda vat_ids: set())
+    results = _failures(errors)
+    rows = [
+        {
+            **{column: row[column] or None for column in CLIENT_TEXT_COLUMNS},
+            "category": ClientCategory(row["category"]),
+            "client_type": ClientType(row["client_type"]),
+        }
+        for row in clients.to_dict("records")
+    ]
+    stmt = dialect_insert(db)(Client)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Client.vat_id],
+        set_={
+            column: stmt.excluded[column]
+            for column in (*CLIENT_TEXT_COLUMNS, "category", "client_type")
+            if column != "vat_id"
+        },
+    ).returning(Client.vat_id, Client.id)
+
+    def write() -> list[int]:
+        keyed = [row for row in rows if row["vat_id"]]
+        ids = dict(db.execute(stmt, keyed).tuples().all()) if keyed else {}
+        unkeyed = [row for row in rows if not row["vat_id"]]
+        new_ids = iter(
+            db.scalars(
+                insert(Client).returning(Client.id, sort_by_parameter_order=True),
+                unkeyed,
+            ).all()
+            if unkeyed
+            else []
+        )
+        return [ids[row["vat_id"]] if row["vat_id"] else next(new_ids) for row in rows]
+
+    _save_rows(db, clients.index.tolist(), write, results)
+    return BatchResult.of(results)
+
+
+def _per_item[T](
+    db: Session, items: Sequence[T], apply: Callable[[T], tuple[int, str | None]]
+) -> BatchResult:
+    """
+    Applies each item in its own savepoint, so a failing item, including one
+    the database rejects, is rolled back alone. apply returns the id and
+    invoice number of the item.
+    """
+    results = {}
+    for index, item in enumerate(items):
+        try:
+            with db.begin_nested():
+                id_, invoice_number = apply(item)
+        except OrderValidationError as e:
+            results[index] = ItemResult(index=index, ok=False, errors=e.problems)
+        except (InsufficientStockError, ValueError) as e:
+            results[index] = ItemResult(index=index, ok=False, errors=[str(e)])
+        except SQLAlchemyError as e:
+            message = f"Item could not be saved: {e.__class__.__name__}."
+            results[index] = ItemResult(index=index, ok=False, errors=[message])
+        else:
+            results[index] = ItemResult(
+                index=index, ok=True, id=id_, invoice_number=invoice_number
+            )
+    return BatchResult.of(results)
+
+
+def create_orders(db: Session, items: Sequence[OrderIn]) -> BatchResult:
+    """Creates orders with OrderService; stock is reserved as in the UI."""
+    service = OrderService(db)
+
+    def create(item: OrderIn) -> tuple[int, str | None]:
+        order = service.create_order(
+            item.client_id,
+            [OrderLine(**line.model_dump()) for line in item.lines],
+            order_date=item.order_date,
+        )
+        return order.id, None
+
+    return _per_item(db, items, create)
+
+
+def issue_invoices(db: Session, items: Sequence[InvoiceIn]) -> BatchResult:
+    """Invoices orders; their PDFs are rendered by the render workers."""
+    service = OrderService(db)
+
+    def issue(item: InvoiceIn) -> tuple[int, str | None]:
+        order = db.get(Order, item.order_id)
+        if order is None:
+            raise ValueError(f"Order #{item.order_id} not found.")
+        invoice_number = service.issue_invoice(
+            order, item.payment_due_date, item.payment_method, paid=item.paid
+        )
+        return order.id, invoice_number
+
+    return _per_item(db, items, issue)
+
+
+def receive_stock_items(db: Session, items: Sequence[StockReceiptIn]) -> BatchResult:
+    """Adds delivered stock, recording each item as a receipt."""
+
+    def receive(item: StockReceiptIn) -> tuple[int, str | None]:
+        receive_stock(db, [(item.product_id, item.quantity)], note=item.note)
+        return item.product_id, None
+
+    return _per_item(db, items, receive)
+
+
+def adjust_stock_items(db: Session, items: Sequence[StockAdjustmentIn]) -> BatchResult:
+    """Sets stock to counted quantities, recording the differences as adjustments."""
+
+    def adjust(item: StockAdjustmentIn) -> tuple[int, str | None]:
+        adjust_stock(db, item.product_id, item.counted, note=item.note)
+        return item.product_id, None
+
+    return _per_item(db, items, adjust)
+
+
+# --- HTTP ---
+app = FastAPI(title="Mini ERP API", version="1")
+bearer = HTTPBearer(auto_error=False)
+
+
+@cache
+def session_factory() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    async with session_factory()() as session:
+        yield session
+
+
+def require_token(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer)],
+) -> None:
+    if API_TOKEN is None:
+        return
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials, API_TOKEN
+    ):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid or missing token.")
+
+
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
+protected = [Depends(require_token)]
+
+
+async def run_batch[T](
+    session: AsyncSession,
+    operation: Callable[[Session, Sequence[T]], BatchResult],
+    items: Sequence[T],
+) -> BatchResult:
+    """Runs a batch operation on the async session's connection and commits it."""
+    result = await session.run_sync(operation, items)
+    await session.commit()
+    return result
+
+
+@app.post("/products/batch", dependencies=protected)
+async def post_products(items: ProductBatch, session: SessionDep) -> BatchResult:
+    return await run_batch(session, upsert_products, items)
+
+
+@app.post("/clients/batch", dependencies=protected)
+async def post_clients(items: ClientBatch, session: SessionDep) -> BatchResult:
+    return await run_batch(session, upsert_clients, items)
+
+
+@app.post("/orders/batch", dependencies=protected)
+async def post_orders(items: OrderBatch, session: SessionDep) -> BatchResult:
+    return await run_batch(session, create_orders, items)
+
+
+@app.post("/invoices/batch", dependencies=protected)
+async def post_invoices(items: InvoiceBatch, session: SessionDep) -> BatchResult:
+    return await run_batch(session, issue_invoices, items)
+
+
+@app.post("/stock/receipts/batch", dependencies=protected)
+async def post_stock_receipts(
+    items: StockReceiptBatch, session: SessionDep
+) -> BatchResult:
+    return await run_batch(session, receive_stock_items, items)
+
+
+@app.post("/stock/adjustments/batch", dependencies=protected)
+async def post_stock_adjustments(
+    items: StockAdjustmentBatch, session: SessionDep
+) -> BatchResult:
+    return await run_batch(session, adjust_stock_items, items)
+
+
+@app.get("/health")
+async def health(session: SessionDep) -> JSONResponse:
+    """Reports whether the database is reachable and at the expected revision."""
+    revision = await session.run_sync(lambda db: current_revision(db.connection()))
+    head = head_revision()
+    ok = revision == head
+    return JSONResponse(
+        {"status": "ok" if ok else "outdated", "revision": revision, "head": head},
+        status_code=status.HTTP_200_OK if ok else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the batch JSON API.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=API_WORKERS)
+    args = parser.parse_args()
+    uvicorn.run("app.api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
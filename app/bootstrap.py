@@ -0,0 +1,194 @@
+# app/bootstrap.py
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import DBAPIError
+
+from app.database import engine
+from app.migrate import current_revision, head_revision, schema_drift
+from app.overdue import start_overdue_sweeper
+
+logger = logging.getLogger(__name__)
+
+# How long the first page load waits for the database to accept connections.
+DB_READY_TIMEOUT = float(os.getenv("DB_READY_TIMEOUT", "10"))
+# Relative to the working directory, like the Docker image's WORKDIR.
+CSS_FILE_PATH = "assets/style.css"
+# Level of the app.* loggers (bootstrap, SQL instrumentation, overdue sweeps).
+APP_LOG_LEVEL = os.getenv("APP_LOG_LEVEL", "INFO").upper()
+
+
+@dataclass(frozen=True)
+class BootstrapState:
+    """Outcome of the once-per-process setup shared by every page."""
+
+    ready: bool
+    problems: tuple[str, ...] = ()
+    warnings: tuple[str, ...] = ()
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    finished_at: datetime = field(default_factory=datetime.now)
+
+
+_lock = threading.Lock()
+_state: BootstrapState | None = None
+# Shown while the first bootstrap of the process is still running.
+_STARTING = BootstrapState(
+    ready=False,
+    problems=("The application is starting; reload the page in a moment.",),
+)
+_assets: dict[str, str] = {}
+
+
+def read_asset(path: str) -> str | None:
+    """
+    Returns a static file's content, read from disk once per process. A
+    missing file is looked for again on the next call.
+    """
+    content = _assets.get(path)
+    if content is None:
+        try:
+            content = _assets[path] = Path(path).read_text()
+        except FileNotFoundError:
+            return None
+    return content
+
+
+def configure_logging() -> None:
+    """
+    Sends the app.* loggers to stderr. Streamlit only configures its own
+    loggers, so without a handler their INFO records would be dropped.
+    """
+    app_logger = logging.getLogger("app")
+    if not app_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        app_logger.addHandler(handler)
+        app_logger.setLevel(APP_LOG_LEVEL)
+
+
+def wait_for_database(engine: Engine, timeout: float) -> str | None:
+    """Retries a trivial query until it succeeds; returns the last error if not."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            return None
+        except DBAPIError as e:
+            if time.monotonic() >= deadline:
+                return str(e.orig or e)
+            time.sleep(1)
+
+
+def _run_bootstrap() -> BootstrapState:
+    timings: dict[str, float] = {}
+    problems: list[str] = []
+    warnings: list[str] = []
+    started = phase_started = time.perf_counter()
+
+    def lap(phase: str) -> None:
+        nonlocal phase_started
+        now = time.perf_counter()
+        timings[phase] = round((now - phase_started) * 1000, 1)
+        phase_started = now
+
+    error = wait_for_database(engine, DB_READY_TIMEOUT)
+    lap("database")
+    if error:
+        problems.append(f"The database is not reachable: {error}")
+    else:
+        with engine.connect() as connection:
+            current, head = current_revision(connection), head_revision()
+            if current != head:
+                problems.append(
+                    f"The database schema is at revision {current}, the application "
+                    f"needs {head}. Run `python -m app.migrate upgrade`."
+                )
+            else:
+                # Drift is worth knowing about but does not stop the app.
+                warnings.extend(
+                    f"Schema drift: {diff}" for diff in schema_drift(connection)
+                )
+        lap("schema")
+
+    if read_asset(CSS_FILE_PATH) is None:
+        warnings.append(f"{CSS_FILE_PATH} not found; pages are unstyled.")
+    lap("assets")
+
+    if not problems:
+        start_overdue_sweeper()
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    return BootstrapState(
+        ready=not problems,
+        problems=tuple(problems),
+        warnings=tuple(warnings),
+        timings_ms=timings,
+    )
+
+
+def bootstrap() -> BootstrapState:
+    """
+    Runs the database readiness check, the schema verification and the asset
+    loading once per process. A successful result is cached, so later reruns
+    cost nothing; a failed one is retried on the next call. Only one attempt
+    runs at a time: while it waits for the database, other calls return the
+    last outcome instead of queueing behind it.
+    """
+    global _state
+    state = _state
+    if state is not None and state.ready:
+        return state
+    if not _lock.acquire(blocking=False):
+        return _state or _STARTING
+    try:
+        if _state is None or not _state.ready:
+            configure_logging()
+            _state = _run_bootstrap()
+            logger.log(
+                logging.INFO if _state.ready else logging.ERROR,
+                json.dumps(
+                    {
+                        "event": "bootstrap",
+                        "ready": _state.ready,
+                        "timings_ms": _state.timings_ms,
+                        "problems": _state.problems,
+                        "warnings": _state.warnings,
+                    }
+                ),
+            )
+        return _state
+    finally:
+        _lock.release()
+
+
+def readiness() -> BootstrapState | None:
+    """Returns the last bootstrap outcome, or None before the first page load."""
+    return _state
+
+
+def prepare_page() -> BootstrapState:
+    """
+    Starts a page rerun: bootstraps the process if needed, stops the page with
+    an explanation when the application is not ready, and applies the CSS.
+    """
+    import streamlit as st
+
+    from app.style_loader import load_css
+
+    state = bootstrap()
+    if not state.ready:
+        st.error(
+            "The application is not ready:\n\n"
+            + "\n".join(f"- {problem}" for problem in state.problems)
+        )
+        st.stop()
+    load_css()
+    return state
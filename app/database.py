@@ -1,21 +1,193 @@
 # app/database.py (FINAL CORRECTED VERSION)
 
 import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import cache, wraps
+from typing import Any, Concatenate
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy import Engine, create_engine, event, make_url
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session, sessionmaker
+
+from app.instrumentation import instrument_engine
 
 DB_USER = os.getenv("POSTGRES_USER", "admin")
 DB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "admin")
 DB_HOST = os.getenv("POSTGRES_HOST", "db")
 DB_NAME = os.getenv("POSTGRES_DB", "erp_db")
 
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+DATABASE_URL = os.getenv(
+    "DATABASE_URL", f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+)
+
+# Connection pool settings, shared by every browser session of this process.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Optional read replica for read-only sessions; they use the primary when unset.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL") or None
+# Seconds after a commit during which read-only sessions stay on the primary,
+# so users see their own writes while the replica catches up.
+DB_REPLICA_LAG_WINDOW = float(os.getenv("DB_REPLICA_LAG_WINDOW", "5"))
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """Returns the pool settings for a database URL."""
+    options: dict[str, Any] = {"pool_pre_ping": True}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+
+@cache
+def get_engine(url: str = DATABASE_URL) -> Engine:
+    """
+    Returns the process-wide engine for a URL, surviving Streamlit reruns.
+    Its statements are timed for the per-rerun query stats.
+    """
+    engine = create_engine(url, **engine_options(url))
+    instrument_engine(engine)
+    return engine
+
+
+# Async drivers used by the API process for each database backend.
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """Returns a database URL with the async driver of its backend."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    return parsed.set(
+        drivername=f"{backend}+{ASYNC_DRIVERS[backend]}"
+    ).render_as_string(hide_password=False)
 
-engine = create_engine(DATABASE_URL)
+
+@cache
+def get_async_engine(url: str = DATABASE_URL) -> AsyncEngine:
+    """Returns the process-wide async engine for a URL, with the same pool settings."""
+    engine = create_async_engine(async_database_url(url), **engine_options(url))
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+engine = get_engine()
+replica_engine = get_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+class ReadOnlySessionError(RuntimeError):
+    """Raised when a read-only session is asked to write."""
+
+
+class ReadOnlySession(Session):
+    """Session of session_scope(read_only=True); refuses to write."""
+
+
+ReadSessionLocal = sessionmaker(
+    class_=ReadOnlySession, autocommit=False, autoflush=False
+)
+
+# Monotonic time of this process's last committed write.
+_last_write = float("-inf")
+
+
+def mark_written() -> None:
+    """
+    Keeps read-only sessions on the primary for the lag window. Called after
+    every commit that wrote; call it after seeing another process's write.
+    """
+    global _last_write
+    _last_write = time.monotonic()
+
+
+def read_engine() -> Engine:
+    """Returns the replica, or the primary if there is none or we just wrote."""
+    if replica_engine is None:
+        return engine
+    # Process-wide rather than per user: a write pins everyone's reads to the
+    # primary for a few seconds, which errs on the side of fresh data.
+    if time.monotonic() - _last_write < DB_REPLICA_LAG_WINDOW:
+        return engine
+    return replica_engine
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_writes(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        if isinstance(state.session, ReadOnlySession):
+            raise ReadOnlySessionError("Cannot write through a read-only session.")
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "before_flush")
+def _track_flush_writes(db: Session, *args: Any) -> None:
+    if not (db.new or db.dirty or db.deleted):
+        return
+    if isinstance(db, ReadOnlySession):
+        raise ReadOnlySessionError("Cannot flush changes of a read-only session.")
+    db.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_committed_writes(db: Session) -> None:
+    if db.info.pop("wrote", False):
+        mark_written()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(db: Session) -> None:
+    db.info.pop("wrote", None)
+
+
+@contextmanager
+def session_scope(read_only: bool = False) -> Iterator[Session]:
+    """
+    Yields a session and always returns its connection to the pool, including
+    when a page is interrupted by st.stop() or st.rerun(). Uncommitted work
+    is rolled back. Read-only sessions are served by the replica, if any.
+    """
+    db = ReadSessionLocal(bind=read_engine()) if read_only else SessionLocal()
+    try:
+        yield db
+    finally:
+        # close() rolls back anything left uncommitted
+        db.close()
+
+
+def with_session[**P, R](
+    func: Callable[Concatenate[Session, P], R],
+) -> Callable[P, R]:
+    """Decorator that passes a scoped session as the first argument."""
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        with session_scope() as db:
+            return func(db, *args, **kwargs)
+
+    return wrapper
+
+
 # The new, modern way using a class for mypy and SQLAlchemy 2.0
 class Base(DeclarativeBase):
     pass
+
+
+def dialect_insert(db: Session) -> Callable[..., Any]:
+    """
+    Returns the dialect-specific insert() of the session's database, which
+    supports ON CONFLICT clauses on both PostgreSQL and SQLite.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
@@ -0,0 +1,364 @@
+# app/importers.py
+
+import csv
+import io
+import os
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO
+
+import pandas as pd
+from sqlalchemy import Table, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.inventory import record_opening_stock
+from app.models import Client, ClientCategory, ClientType, Product, ProductUnit
+from app.reference_cache import mark_tables_changed
+from app.utils import reserve_product_indexes
+
+DEFAULT_CHUNK_SIZE = 5000
+ALLOWED_VAT_RATES = (23.0, 8.0, 5.0, 0.0)
+NIP_WEIGHTS = (6, 5, 7, 2, 3, 4, 5, 6, 7)
+
+PRODUCT_COLUMNS = {"name", "unit"}
+CLIENT_COLUMNS = {"category"}
+CLIENT_TEXT_COLUMNS = (
+    "company_name",
+    "vat_id",
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+    "address_street",
+    "address_zipcode",
+    "address_city",
+)
+
+
+@dataclass(frozen=True)
+class RowError:
+    row: int
+    message: str
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    errors: list[RowError] = field(default_factory=list)
+
+
+# --- Reading ---
+def read_chunks(
+    source: str | BinaryIO, file_name: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Reads a CSV or XLSX file in chunks of string columns. The index of each
+    chunk holds the row numbers as seen in a spreadsheet (header = row 1).
+    """
+    if os.path.splitext(file_name)[1].lower() == ".xlsx":
+        chunks = _read_xlsx_chunks(source, chunk_size)
+    else:
+        chunks = pd.read_csv(
+            source,
+            chunksize=chunk_size,
+            dtype=str,
+            keep_default_na=False,
+            skipinitialspace=True,
+        )
+    next_row = 2
+    for chunk in chunks:
+        chunk.columns = [str(c).strip().lower() for c in chunk.columns]
+        chunk.index = pd.RangeIndex(next_row, next_row + len(chunk))
+        next_row += len(chunk)
+        yield chunk
+
+
+def _read_xlsx_chunks(
+    source: str | BinaryIO, chunk_size: int
+) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)  # type: ignore[union-attr]
+        header = [str(value or "") for value in next(rows, ())]
+        batch: list[list[str]] = []
+        for row in rows:
+            batch.append(["" if value is None else str(value) for value in row])
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def _text(chunk: pd.DataFrame, column: str, default: str = "") -> pd.Series:
+    if column not in chunk:
+        return pd.Series(default, index=chunk.index, dtype=str)
+    values = chunk[column].astype(str).str.strip()
+    return values.mask(values == "", default)
+
+
+def _collect_errors(
+    checks: list[tuple[pd.Series, str]],
+) -> tuple[pd.Series, list[RowError]]:
+    """Turns vectorised rule masks into per-row errors and a mask of valid rows."""
+    invalid = pd.Series(False, index=checks[0][0].index)
+    errors: list[RowError] = []
+    for mask, message in checks:
+        mask = mask.fillna(True).astype(bool)
+        errors.extend(RowError(int(row), message) for row in mask.index[mask])
+        invalid |= mask
+    return ~invalid, errors
+
+
+# --- Validation ---
+def valid_nip(vat_ids: pd.Series) -> pd.Series:
+    """Checks the Polish NIP checksum of 10-digit VAT IDs (optionally 'PL'-prefixed)."""
+    digits = vat_ids.str.extract(r"^(?:PL)?(\d{10})$", expand=False)
+    is_nip = digits.notna()
+    nip = digits.fillna("0" * 10)
+    checksum = (
+        sum(nip.str[i].astype(int) * weight for i, weight in enumerate(NIP_WEIGHTS))
+        % 11
+    )
+    return ~is_nip | (checksum == nip.str[9].astype(int))
+
+
+def validate_products(chunk: pd.DataFrame) -> tuple[pd.DataFrame, list[RowError]]:
+    """Validates a chunk of products in vectorised passes."""
+    name = _text(chunk, "name")
+    unit = _text(chunk, "unit").str.lower()
+    vat_rate = pd.to_numeric(_text(chunk, "vat_rate", "23"), errors="coerce")
+    stock = pd.to_numeric(_text(chunk, "stock", "0"), errors="coerce")
+    units = [u.value for u in ProductUnit]
+    rates = ", ".join(f"{rate:g}" for rate in ALLOWED_VAT_RATES)
+
+    valid, errors = _collect_errors(
+        [
+            (name == "", "Product name is required."),
+            (~unit.isin(units), f"Unit must be one of: {', '.join(units)}."),
+            (~vat_rate.isin(ALLOWED_VAT_RATES), f"VAT rate must be one of: {rates}."),
+            (stock.isna() | (stock < 0), "Stock must be a non-negative number."),
+        ]
+    )
+    products = pd.DataFrame(
+        {"name": name, "unit": unit, "stock": stock, "vat_rate": vat_rate}
+    )[valid]
+    return products, errors
+
+
+def validate_clients(
+    chunk: pd.DataFrame, existing_vat_ids: Callable[[list[str]], set[str]]
+) -> tuple[pd.DataFrame, list[RowError]]:
+    """Validates a chunk of clients in vectorised passes."""
+    columns = {column: _text(chunk, column) for column in CLIENT_TEXT_COLUMNS}
+    vat_id = columns["vat_id"].str.upper().str.replace(r"[\s-]", "", regex=True)
+    columns["vat_id"] = vat_id
+    category = _text(chunk, "category").str.capitalize()
+    client_type = _text(
+        chunk, "client_type", ClientType.RECIPIENT.value
+    ).str.capitalize()
+    is_company = category == ClientCategory.COMPANY.value
+    has_vat_id = vat_id != ""
+
+    taken = existing_vat_ids(vat_id[has_vat_id].unique().tolist())
+    valid, errors = _collect_errors(
+        [
+            (
+                ~category.isin([c.value for c in ClientCategory]),
+                "Category must be 'Company' or 'Individual'.",
+            ),
+            (
+                ~client_type.isin([t.value for t in ClientType]),
+                "Client type must be 'Recipient' or 'Supplier'.",
+            ),
+            (
+                is_company & ((columns["company_name"] == "") | ~has_vat_id),
+                "Companies need a company name and a VAT ID.",
+            ),
+            (
+                ~is_company
+                & ((columns["first_name"] == "") | (columns["last_name"] == "")),
+                "Individuals need a first and last name.",
+            ),
+            (
+                has_vat_id & ~vat_id.str.fullmatch(r"([A-Z]{2})?[0-9A-Z]{8,12}"),
+                "VAT ID has an invalid format.",
+            ),
+            (has_vat_id & ~valid_nip(vat_id), "VAT ID (NIP) checksum is invalid."),
+            (
+                has_vat_id & vat_id.duplicated(keep="first"),
+                "VAT ID appears more than once in the file.",
+            ),
+            (
+                has_vat_id & vat_id.isin(taken),
+                "A client with this VAT ID already exists.",
+            ),
+            (
+                (columns["email"] != "")
+                & ~columns["email"].str.fullmatch(r"[^@\s]+@[^@\s]+\.[^@\s]+"),
+                "Email address is invalid.",
+            ),
+        ]
+    )
+    clients = pd.DataFrame(
+        {**columns, "category": category, "client_type": client_type}
+    )[valid]
+    return clients, errors
+
+
+# --- Loading ---
+def _copy_rows(
+    db: Session, table: Table, columns: list[str], rows: Iterable[tuple]
+) -> None:
+    """Streams rows into a table with PostgreSQL COPY."""
+    # The session does not see the raw COPY; tell the reference cache.
+    mark_tables_changed(db, [table.name])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(r"\N" if value is None else value for value in row)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) "
+            r"FROM STDIN WITH (FORMAT csv, NULL '\N')",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def _load_rows(db: Session, table: Table, rows: list[dict[str, Any]]) -> None:
+    """Loads rows with COPY on PostgreSQL, or batched multi-row INSERTs elsewhere."""
+    if db.get_bind().dialect.name == "postgresql":
+        columns = list(rows[0])
+        _copy_rows(db, table, columns, (tuple(row.values()) for row in rows))
+    else:
+        db.execute(insert(table), rows)
+
+
+def _import(
+    db: Session,
+    chunks: Iterable[pd.DataFrame],
+    required_columns: set[str],
+    prepare: Callable[
+        [pd.DataFrame], tuple[Table, pd.Index, list[dict[str, Any]], list[RowError]]
+    ],
+    progress: Callable[[ImportReport], None] | None,
+    loaded: Callable[[list[dict[str, Any]]], None] | None = None,
+) -> ImportReport:
+    """
+    Loads each chunk in its own transaction; loaded runs in that transaction
+    once the chunk's rows are written.
+    """
+    report = ImportReport()
+    for chunk in chunks:
+        missing = required_columns - set(chunk.columns)
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}.")
+        # valid holds the file row numbers of the rows that are loaded.
+        table, valid, rows, errors = prepare(chunk)
+        report.errors.extend(errors)
+        if rows:
+            # One transaction per chunk: a failing chunk leaves earlier ones intact.
+            try:
+                _load_rows(db, table, rows)
+                if loaded:
+                    loaded(rows)
+                db.commit()
+                report.imported += len(rows)
+            except SQLAlchemyError as e:
+                db.rollback()
+                message = f"Chunk could not be saved: {e.__class__.__name__}."
+                report.errors.extend(RowError(int(row), message) for row in valid)
+        if progress:
+            progress(report)
+    report.errors.sort(key=lambda error: error.row)
+    return report
+
+
+def import_products(
+    db: Session,
+    source: str | BinaryIO,
+    file_name: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Callable[[ImportReport], None] | None = None,
+) -> ImportReport:
+    """
+    Imports products from a CSV/XLSX file with name, unit, stock and vat_rate.
+    The imported stock is recorded in the inventory ledger as a receipt.
+    """
+
+    def prepare(
+        chunk: pd.DataFrame,
+    ) -> tuple[Table, pd.Index, list[dict[str, Any]], list[RowError]]:
+        products, errors = validate_products(chunk)
+        indexes = reserve_product_indexes(db, len(products))
+        unit_names = {u.value: u.name for u in ProductUnit}
+        rows = [
+            {
+                "name": name,
+                "product_index": index,
+                "unit": unit_names[unit],
+                "stock": float(stock),
+                "vat_rate": float(vat_rate),
+            }
+            for (name, unit, stock, vat_rate), index in zip(
+                products.itertuples(index=False), indexes, strict=True
+            )
+        ]
+        return Product.__table__, products.index, rows, errors  # type: ignore[return-value]
+
+    return _import(
+        db,
+        read_chunks(source, file_name, chunk_size),
+        PRODUCT_COLUMNS,
+        prepare,
+        progress,
+        lambda rows: record_opening_stock(db, [row["product_index"] for row in rows]),
+    )
+
+
+def import_clients(
+    db: Session,
+    source: str | BinaryIO,
+    file_name: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Callable[[ImportReport], None] | None = None,
+) -> ImportReport:
+    """Imports clients from a CSV/XLSX file with a category column and contact data."""
+
+    def existing_vat_ids(vat_ids: list[str]) -> set[str]:
+        if not vat_ids:
+            return set()
+        return set(db.scalars(select(Client.vat_id).where(Client.vat_id.in_(vat_ids))))
+
+    def prepare(
+        chunk: pd.DataFrame,
+    ) -> tuple[Table, pd.Index, list[dict[str, Any]], list[RowError]]:
+        clients, errors = validate_clients(chunk, existing_vat_ids)
+        category_names = {c.value: c.name for c in ClientCategory}
+        type_names = {t.value: t.name for t in ClientType}
+        rows = [
+            {
+                **{column: row[column] or None for column in CLIENT_TEXT_COLUMNS},
+                "category": category_names[row["category"]],
+                "client_type": type_names[row["client_type"]],
+            }
+            for row in clients.to_dict("records")
+        ]
+        return Client.__table__, clients.index, rows, errors  # type: ignore[return-value]
+
+    return _import(
+        db,
+        read_chunks(source, file_name, chunk_size),
+        CLIENT_COLUMNS,
+        prepare,
+        progress,
+    )
@@ -0,0 +1,210 @@
+# app/instrumentation.py
+
+import json
+import logging
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are logged with their parameters.
+SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "250"))
+# The same statement issued this many times in one rerun is a likely N+1.
+REPEATED_STATEMENT_THRESHOLD = int(os.getenv("SQL_REPEATED_STATEMENT_THRESHOLD", "5"))
+# Shows the per-rerun query panel in the sidebar of every page.
+SQL_DEBUG_PANEL = os.getenv("SQL_DEBUG_PANEL", "").lower() in ("1", "true", "yes")
+
+_MAX_LOGGED_PARAMETERS = 500
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    total_ms: float = 0.0
+
+
+@dataclass
+class RerunQueries:
+    """The statements issued while rendering one page rerun."""
+
+    page: str
+    statements: dict[str, StatementStats] = field(default_factory=dict)
+    slow_queries: list[tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return sum(s.count for s in self.statements.values())
+
+    @property
+    def total_ms(self) -> float:
+        return sum(s.total_ms for s in self.statements.values())
+
+    def repeated(
+        self, threshold: int = REPEATED_STATEMENT_THRESHOLD
+    ) -> dict[str, StatementStats]:
+        """Returns the statements issued at least threshold times, most first."""
+        return dict(
+            sorted(
+                (
+                    (statement, stats)
+                    for statement, stats in self.statements.items()
+                    if stats.count >= threshold
+                ),
+                key=lambda item: -item[1].count,
+            )
+        )
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        stats = self.statements.setdefault(statement, StatementStats())
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+        if elapsed_ms >= SLOW_QUERY_MS:
+            self.slow_queries.append((statement, elapsed_ms))
+
+
+_current_rerun: ContextVar[RerunQueries | None] = ContextVar(
+    "current_rerun", default=None
+)
+
+
+def _compact(statement: str) -> str:
+    return " ".join(statement.split())
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    elapsed_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+    rerun = _current_rerun.get()
+    if rerun is not None:
+        rerun.record(_compact(statement), elapsed_ms)
+    if elapsed_ms >= SLOW_QUERY_MS:
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "slow_query",
+                    "page": rerun.page if rerun else None,
+                    "duration_ms": round(elapsed_ms, 1),
+                    "statement": _compact(statement),
+                    "parameters": repr(parameters)[:_MAX_LOGGED_PARAMETERS],
+                    "executemany": many,
+                }
+            )
+        )
+
+
+def _handle_error(context: Any) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    if context.connection is not None and context.execution_context is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Times every statement the engine executes; safe to call more than once."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def track_queries(page: str) -> Iterator[RerunQueries]:
+    """
+    Collects the statements of one page rerun and logs a summary when it ends,
+    flagging statements repeated often enough to be a likely N+1 pattern.
+    """
+    rerun = RerunQueries(page)
+    token = _current_rerun.set(rerun)
+    started = time.perf_counter()
+    try:
+        yield rerun
+    finally:
+        _current_rerun.reset(token)
+        repeated = rerun.repeated()
+        logger.info(
+            json.dumps(
+                {
+                    "event": "rerun_queries",
+                    "page": page,
+                    "rerun_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "statements": rerun.count,
+                    "sql_ms": round(rerun.total_ms, 1),
+                    "slow_queries": len(rerun.slow_queries),
+                }
+            )
+        )
+        for statement, stats in repeated.items():
+            logger.warning(
+                json.dumps(
+                    {
+                        "event": "repeated_statement",
+                        "page": page,
+                        "count": stats.count,
+                        "total_ms": round(stats.total_ms, 1),
+                        "statement": statement,
+                    }
+                )
+            )
+
+
+def render_debug_panel(rerun: RerunQueries) -> None:
+    """Shows the rerun's statements and the reference cache stats in the sidebar."""
+    import streamlit as st
+
+    from app.reference_cache import reference_cache
+
+    with st.sidebar.expander(f"SQL: {rerun.count} statements, {rerun.total_ms:.0f} ms"):
+        cache = reference_cache.stats()
+        st.caption(
+            f"Reference cache: {cache.hit_rate:.0%} hits of "
+            f"{cache.hits + cache.misses} lookups, {cache.entries} entries, "
+            f"{cache.size_bytes / 1024:.0f} KiB, {cache.invalidations} invalidated"
+        )
+        repeated = rerun.repeated()
+        if repeated:
+            st.warning(
+                f"{len(repeated)} statement(s) repeated "
+                f"{REPEATED_STATEMENT_THRESHOLD}+ times; likely N+1 queries."
+            )
+        st.dataframe(
+            [
+                {
+                    "Count": stats.count,
+                    "Total (ms)": round(stats.total_ms, 1),
+                    "Statement": statement,
+                }
+                for statement, stats in sorted(
+                    rerun.statements.items(), key=lambda item: -item[1].total_ms
+                )
+            ],
+            hide_index=True,
+        )
+
+
+@contextmanager
+def instrumented_rerun(page: str) -> Iterator[RerunQueries]:
+    """
+    Wraps a page script: tracks its queries and, with SQL_DEBUG_PANEL set,
+    shows them in the sidebar, including when the page stops early.
+    """
+    with track_queries(page) as rerun:
+        try:
+            yield rerun
+        finally:
+            if SQL_DEBUG_PANEL:
+                render_debug_panel(rerun)
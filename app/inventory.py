@@ -0,0 +1,247 @@
+# app/inventory.py
+
+from collections import defaultdict
+from collections.abc import Collection, Iterable
+from datetime import datetime
+
+from sqlalchemy import (
+    ARRAY,
+    ColumnElement,
+    DateTime,
+    Float,
+    Integer,
+    bindparam,
+    case,
+    cast,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session
+
+from app.models import InventoryMovement, MovementReason, Product
+
+
+class InsufficientStockError(ValueError):
+    """Raised when a reservation would take a product's stock below zero."""
+
+    def __init__(self, shortages: dict[str, tuple[float, float]]) -> None:
+        self.shortages = shortages
+        details = ", ".join(
+            f"{name} (requested {requested:g}, available {available:g})"
+            for name, (requested, available) in shortages.items()
+        )
+        super().__init__(f"Insufficient stock for: {details}.")
+
+
+def _total_quantities(lines: Iterable[tuple[int, float]]) -> dict[int, float]:
+    quantities: dict[int, float] = defaultdict(float)
+    for product_id, quantity in lines:
+        quantities[product_id] += quantity
+    return quantities
+
+
+def _line_quantity(
+    db: Session, quantities: dict[int, float]
+) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    """
+    The condition matching the products of the lines and each one's quantity,
+    so one UPDATE changes the stock of all of them.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Two array parameters instead of one bound value per line.
+        requested = (
+            func.unnest(
+                bindparam("product_ids", list(quantities), type_=ARRAY(Integer)),
+                bindparam("quantities", list(quantities.values()), type_=ARRAY(Float)),
+            )
+            .table_valued("product_id", "quantity")
+            .render_derived(name="requested")
+        )
+        return Product.id == requested.c.product_id, requested.c.quantity
+    # SQLite cannot name the columns of a VALUES list.
+    return Product.id.in_(quantities), case(quantities, value=Product.id)
+
+
+def _expire_stock(db: Session, product_ids: Collection[int]) -> None:
+    """Makes loaded products reread the stock an UPDATE changed behind the ORM."""
+    for product in db.identity_map.values():
+        if isinstance(product, Product) and product.id in product_ids:
+            db.expire(product, ["stock"])
+
+
+def _record_movements(
+    db: Session,
+    quantities: dict[int, float],
+    reason: MovementReason,
+    order_id: int | None = None,
+    note: str | None = None,
+) -> None:
+    db.execute(
+        insert(InventoryMovement),
+        [
+            {
+                "product_id": product_id,
+                "order_id": order_id,
+                "quantity": quantity,
+                "reason": reason,
+                "note": note,
+            }
+            for product_id, quantity in quantities.items()
+        ],
+    )
+
+
+def reserve_stock(
+    db: Session,
+    lines: Iterable[tuple[int, float]],
+    order_id: int | None = None,
+    reason: MovementReason = MovementReason.ORDER,
+) -> None:
+    """
+    Takes (product id, quantity) lines out of stock and records them in the
+    inventory ledger. The products are locked in id order, so concurrent
+    reservations of the same products queue up instead of overselling or
+    deadlocking. On any error the caller must roll back the transaction.
+    """
+    quantities = _total_quantities(lines)
+    if not quantities:
+        return
+
+    locked = db.execute(
+        select(Product.id, Product.name, Product.stock)
+        .where(Product.id.in_(quantities))
+        .order_by(Product.id)
+        .with_for_update()
+    ).all()
+    missing = quantities.keys() - {product_id for product_id, _, _ in locked}
+    if missing:
+        raise ValueError(f"Unknown product ids: {sorted(missing)}.")
+    shortages = {
+        name: (quantities[product_id], stock)
+        for product_id, name, stock in locked
+        if stock < quantities[product_id]
+    }
+    if shortages:
+        raise InsufficientStockError(shortages)
+
+    # One statement for the whole cart; the condition guards backends where the
+    # SELECT above does not lock (SQLite) against a concurrent writer.
+    matches_line, requested_qty = _line_quantity(db, quantities)
+    updated = set(
+        db.scalars(
+            update(Product)
+            .where(matches_line, Product.stock >= requested_qty)
+            .values(stock=Product.stock - requested_qty)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
+    )
+    if len(updated) != len(quantities):
+        short = db.execute(
+            select(Product.id, Product.name, Product.stock).where(
+                Product.id.in_(quantities.keys() - updated)
+            )
+        )
+        raise InsufficientStockError(
+            {name: (quantities[product_id], stock) for product_id, name, stock in short}
+        )
+    _expire_stock(db, quantities)
+    _record_movements(
+        db,
+        {product_id: -quantity for product_id, quantity in quantities.items()},
+        reason,
+        order_id=order_id,
+    )
+
+
+def receive_stock(
+    db: Session, lines: Iterable[tuple[int, float]], note: str | None = None
+) -> None:
+    """
+    Adds received (product id, quantity) lines to stock and records them in
+    the inventory ledger as receipts. On any error the caller must roll back
+    the transaction.
+    """
+    quantities = _total_quantities(lines)
+    if not quantities:
+        return
+    if any(quantity <= 0 for quantity in quantities.values()):
+        raise ValueError("Received quantities must be positive.")
+
+    matches_line, received_qty = _line_quantity(db, quantities)
+    updated = set(
+        db.scalars(
+            update(Product)
+            .where(matches_line)
+            .values(stock=Product.stock + received_qty)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
+    )
+    missing = quantities.keys() - updated
+    if missing:
+        raise ValueError(f"Unknown product ids: {sorted(missing)}.")
+    _expire_stock(db, quantities)
+    _record_movements(db, quantities, MovementReason.RECEIPT, note=note)
+
+
+def adjust_stock(
+    db: Session, product_id: int, counted: float, note: str | None = None
+) -> float:
+    """
+    Sets a product's stock to a counted quantity, for example after a
+    stocktake, and records the difference in the inventory ledger as an
+    adjustment. Returns the difference.
+    """
+    if counted < 0:
+        raise ValueError("Stock cannot be negative.")
+    stock = db.scalar(
+        select(Product.stock).where(Product.id == product_id).with_for_update()
+    )
+    if stock is None:
+        raise ValueError(f"Unknown product ids: [{product_id}].")
+    difference = counted - stock
+    if difference:
+        # Applied as a change, so the ledger still adds up to the stock if an
+        # order reserved the product meanwhile (SQLite does not lock above).
+        db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(stock=Product.stock + difference)
+            .execution_options(synchronize_session=False)
+        )
+        _expire_stock(db, [product_id])
+        _record_movements(
+            db, {product_id: difference}, MovementReason.ADJUSTMENT, note=note
+        )
+    return difference
+
+
+def record_opening_stock(
+    db: Session, product_indexes: Collection[int], note: str = "Opening stock"
+) -> None:
+    """
+    Records the stock that new products were created with as receipts, in
+    one INSERT ... SELECT, so the ledger adds up to their stock. Call it once,
+    in the transaction that created the products.
+    """
+    if not product_indexes:
+        return
+    db.execute(
+        insert(InventoryMovement).from_select(
+            ["product_id", "quantity", "reason", "created_at", "note"],
+            select(
+                Product.id,
+                Product.stock,
+                cast(
+                    literal(MovementReason.RECEIPT, InventoryMovement.reason.type),
+                    InventoryMovement.reason.type,
+                ),
+                literal(datetime.utcnow(), DateTime),
+                literal(note),
+            ).where(Product.product_index.in_(product_indexes), Product.stock > 0),
+        )
+    )
@@ -0,0 +1,125 @@
+# app/invoice_archive.py
+
+import argparse
+import hashlib
+import io
+import os
+import stat
+import sys
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert, session_scope
+from app.models import CompanyProfile, InvoiceDocument, Order
+from app.render_jobs import enqueue_render
+
+# Shared by the app and the render workers; relative to the working directory.
+INVOICE_ARCHIVE_DIR = Path(os.getenv("INVOICE_ARCHIVE_DIR", "invoice_archive"))
+
+
+def archive_path(sha256: str) -> Path:
+    """Where a PDF with this checksum lives; fanned out to keep directories small."""
+    return INVOICE_ARCHIVE_DIR / sha256[:2] / f"{sha256}.pdf"
+
+
+def store_pdf(pdf_bytes: bytes) -> str:
+    """
+    Writes a PDF into the archive under its SHA-256 and returns the checksum.
+    The file is made read-only and never rewritten: storing the same content
+    twice is a no-op.
+    """
+    sha256 = hashlib.sha256(pdf_bytes).hexdigest()
+    path = archive_path(sha256)
+    if path.exists():
+        return sha256
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temporary, "wb") as f:
+        f.write(pdf_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+    os.chmod(temporary, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    os.replace(temporary, path)
+    return sha256
+
+
+def record_invoice_document(db: Session, order_id: int, sha256: str) -> InvoiceDocument:
+    """
+    Points an order at its archived PDF. The first document recorded for an
+    order is final; later calls return it unchanged. Does not commit.
+    """
+    order = db.get_one(Order, order_id)
+    stmt = dialect_insert(db)(InvoiceDocument).values(
+        order_id=order_id,
+        invoice_number=order.invoice_number,
+        sha256=sha256,
+        size_bytes=archive_path(sha256).stat().st_size,
+    )
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["order_id"]))
+    return db.get_one(InvoiceDocument, order_id)
+
+
+def open_invoice_document(document: InvoiceDocument) -> io.BufferedReader:
+    """Opens an archived PDF for streaming; nothing is rendered."""
+    return open(archive_path(document.sha256), "rb")
+
+
+def verify_invoice_document(document: InvoiceDocument) -> str | None:
+    """Re-hashes an archived PDF; returns a problem description or None."""
+    try:
+        with open_invoice_document(document) as f:
+            actual = hashlib.file_digest(f, "sha256").hexdigest()
+    except FileNotFoundError:
+        return f"{document.invoice_number}: {archive_path(document.sha256)} is missing."
+    if actual != document.sha256:
+        return f"{document.invoice_number}: checksum mismatch, the file was modified."
+    return None
+
+
+def enqueue_missing_documents(db: Session) -> int:
+    """
+    Queues renders for invoices issued before the archive existed and returns
+    how many were queued. Does not commit.
+    """
+    if db.scalars(select(CompanyProfile).limit(1)).first() is None:
+        return 0
+    order_ids = db.scalars(
+        select(Order.id)
+        .outerjoin(InvoiceDocument)
+        .where(Order.invoice_number.is_not(None), InvoiceDocument.order_id.is_(None))
+        .order_by(Order.id)
+    ).all()
+    for order_id in order_ids:
+        enqueue_render(db, order_id)
+    return len(order_ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the issued invoice archive.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("verify", help="check every archived PDF against its checksum")
+    commands.add_parser("backfill", help="queue renders for unarchived invoices")
+    args = parser.parse_args()
+
+    with session_scope() as db:
+        if args.command == "backfill":
+            queued = enqueue_missing_documents(db)
+            db.commit()
+            print(f"Queued {queued} invoice(s) for archiving.")
+            return
+        problems = [
+            problem
+            for document in db.scalars(select(InvoiceDocument))
+            if (problem := verify_invoice_document(document))
+        ]
+    for problem in problems:
+        print(problem)
+    if problems:
+        sys.exit(1)
+    print("All archived invoices match their checksums.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# app/invoice_export.py
+
+import multiprocessing
+import os
+import shutil
+import zipfile
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import IO
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import DATABASE_URL
+from app.invoice_archive import archive_path, record_invoice_document, store_pdf
+from app.models import InvoiceDocument, Order
+from app.render_worker import render_invoice
+from app.utils import invoice_file_name
+
+# Order ids per query when looking up archived documents.
+DOCUMENT_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class ExportProgress:
+    done: int
+    total: int
+    failed: int
+
+
+@dataclass
+class ExportResult:
+    exported: int = 0
+    failed: list[tuple[int, str]] = field(default_factory=list)
+
+
+def parse_invoice_number(invoice_number: str) -> tuple[str, int, int, int]:
+    """Splits an invoice number in the FV/Number/Month/Year format."""
+    try:
+        prefix, number, month, year = invoice_number.strip().split("/")
+        return prefix, int(number), int(month), int(year)
+    except ValueError as e:
+        raise ValueError(
+            f"Invalid invoice number '{invoice_number}', expected FV/Number/Month/Year."
+        ) from e
+
+
+def select_invoices_for_export(
+    db: Session,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    first_number: str | None = None,
+    last_number: str | None = None,
+) -> list[tuple[int, str]]:
+    """
+    Returns (order id, invoice number) pairs of invoiced orders in a date range
+    and/or an invoice-number range. A number range must lie within one period.
+    """
+    query = select(Order.id, Order.invoice_number).where(
+        Order.invoice_number.is_not(None)
+    )
+    if date_from:
+        query = query.where(Order.order_date >= date_from)
+    if date_to:
+        query = query.where(Order.order_date <= date_to)
+
+    number_range: tuple[int, int] | None = None
+    if first_number or last_number:
+        first = parse_invoice_number(first_number or last_number or "")
+        last = parse_invoice_number(last_number or first_number or "")
+        prefix, start, month, year = first
+        if (last[0], last[2], last[3]) != (prefix, month, year):
+            raise ValueError("An invoice number range must stay within one period.")
+        query = query.where(Order.invoice_number.like(f"{prefix}/%/{month}/{year}"))
+        number_range = (start, last[1])
+
+    rows = db.execute(query.order_by(Order.order_date, Order.id)).all()
+    selected = [(order_id, str(number)) for order_id, number in rows]
+    if number_range:
+        start, end = number_range
+        selected = [
+            (order_id, number)
+            for order_id, number in selected
+            if start <= parse_invoice_number(number)[1] <= end
+        ]
+    return selected
+
+
+# --- Worker process state ---
+_worker_sessions: sessionmaker[Session] | None = None
+
+
+def _init_worker(database_url: str) -> None:
+    global _worker_sessions
+    engine = create_engine(database_url)
+    _worker_sessions = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _render_invoice(order_id: int) -> tuple[str, str]:
+    """
+    Renders and archives, inside a worker process, an issued invoice that has
+    no archived PDF yet. Returns the invoice number and the checksum of the
+    order's archived document.
+    """
+    assert _worker_sessions is not None, "Worker was not initialised."
+    with _worker_sessions() as db:
+        sha256 = store_pdf(render_invoice(db, order_id))
+        # An order keeps the first document archived for it.
+        document = record_invoice_document(db, order_id, sha256)
+        db.commit()
+        return document.invoice_number, document.sha256
+
+
+def _archived_documents(
+    database_url: str, order_ids: Sequence[int]
+) -> dict[int, tuple[str, str]]:
+    """Maps orders with an archived PDF to its invoice number and checksum."""
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            return {
+                order_id: (invoice_number, sha256)
+                for start in range(0, len(order_ids), DOCUMENT_BATCH_SIZE)
+                for order_id, invoice_number, sha256 in connection.execute(
+                    select(
+                        InvoiceDocument.order_id,
+                        InvoiceDocument.invoice_number,
+                        InvoiceDocument.sha256,
+                    ).where(
+                        InvoiceDocument.order_id.in_(
+                            order_ids[start : start + DOCUMENT_BATCH_SIZE]
+                        )
+                    )
+                )
+            }
+    finally:
+        engine.dispose()
+
+
+def _render_missing(
+    order_ids: Sequence[int],
+    database_url: str,
+    max_workers: int | None,
+    rendered: Callable[[int, str, str], None],
+    failed: Callable[[int, str], None],
+) -> None:
+    """Renders and archives invoices across a process pool, reporting each one."""
+    workers = min(max_workers or os.cpu_count() or 1, len(order_ids))
+    max_in_flight = workers * 2
+    pending_ids = iter(order_ids)
+    in_flight: dict[Future[tuple[str, str]], int] = {}
+
+    # "spawn" keeps forked children away from the Streamlit server's threads.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(database_url,),
+    ) as executor:
+
+        def submit_next() -> None:
+            order_id = next(pending_ids, None)
+            if order_id is not None:
+                in_flight[executor.submit(_render_invoice, order_id)] = order_id
+
+        for _ in range(max_in_flight):
+            submit_next()
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                order_id = in_flight.pop(future)
+                try:
+                    invoice_number, sha256 = future.result()
+                except Exception as e:
+                    failed(order_id, str(e))
+                else:
+                    rendered(order_id, invoice_number, sha256)
+                submit_next()
+
+
+def export_invoices_zip(
+    order_ids: Sequence[int],
+    destination: str | IO[bytes],
+    database_url: str = DATABASE_URL,
+    max_workers: int | None = None,
+    progress: Callable[[ExportProgress], None] | None = None,
+) -> ExportResult:
+    """
+    Streams the issued invoices of the given orders into a ZIP archive.
+    Archived PDFs are copied from disk in this process; only invoices without
+    one are rendered, across a process pool, and archived first. PDFs are
+    copied in chunks and never held in memory whole.
+    """
+    total = len(order_ids)
+    result = ExportResult()
+    documents = _archived_documents(database_url, order_ids)
+
+    with zipfile.ZipFile(destination, "w", compression=zipfile.ZIP_STORED) as archive:
+
+        def report() -> None:
+            if progress:
+                progress(
+                    ExportProgress(
+                        done=result.exported + len(result.failed),
+                        total=total,
+                        failed=len(result.failed),
+                    )
+                )
+
+        def failed(order_id: int, error: str) -> None:
+            result.failed.append((order_id, error))
+            report()
+
+        def write_pdf(order_id: int, invoice_number: str, sha256: str) -> None:
+            try:
+                with (
+                    open(archive_path(sha256), "rb") as source,
+                    archive.open(invoice_file_name(invoice_number), "w") as target,
+                ):
+                    shutil.copyfileobj(source, target)
+            except OSError as e:
+                failed(order_id, str(e))
+            else:
+                result.exported += 1
+                report()
+
+        for order_id in order_ids:
+            if order_id in documents:
+                write_pdf(order_id, *documents[order_id])
+        to_render = [order_id for order_id in order_ids if order_id not in documents]
+        if to_render:
+            _render_missing(to_render, database_url, max_workers, write_pdf, failed)
+    return result
@@ -0,0 +1,108 @@
+# app/invoice_renderer.py
+
+import hashlib
+import os
+import threading
+from typing import Any
+
+from jinja2 import Environment, FileSystemLoader, Template
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+INVOICE_TEMPLATE_PATH = "app/invoice_template.html"
+INVOICE_STYLESHEET_PATH = "app/invoice_template.css"
+
+
+class InvoiceRenderer:
+    """
+    Holds the compiled invoice template, the parsed stylesheet and the font
+    configuration, so many invoices can be rendered without repeating setup.
+    """
+
+    def __init__(
+        self,
+        template_path: str = INVOICE_TEMPLATE_PATH,
+        stylesheet_path: str = INVOICE_STYLESHEET_PATH,
+        base_url: str = ".",
+    ) -> None:
+        self.template_path = template_path
+        self.stylesheet_path = stylesheet_path
+        # The base_url helps WeasyPrint find relative paths for assets like fonts
+        self.base_url = base_url
+        self._lock = threading.Lock()
+        self._template: Template
+        self._stylesheet: CSS
+        self._font_config: FontConfiguration
+        self._signature: tuple[int, ...] = ()
+        self.fingerprint = ""
+        self.reload()
+
+    def _file_signature(self) -> tuple[int, ...]:
+        template_stat = os.stat(self.template_path)
+        stylesheet_stat = os.stat(self.stylesheet_path)
+        return (
+            template_stat.st_mtime_ns,
+            template_stat.st_size,
+            stylesheet_stat.st_mtime_ns,
+            stylesheet_stat.st_size,
+        )
+
+    def reload(self) -> None:
+        """Re-reads and recompiles the template, stylesheet and fonts from disk."""
+        with self._lock:
+            signature = self._file_signature()
+            with open(self.template_path, "rb") as f:
+                template_source = f.read()
+            with open(self.stylesheet_path, "rb") as f:
+                stylesheet_source = f.read()
+
+            env = Environment(
+                loader=FileSystemLoader(os.path.dirname(self.template_path) or "."),
+                auto_reload=False,
+            )
+            template = env.get_template(os.path.basename(self.template_path))
+            font_config = FontConfiguration()
+            stylesheet = CSS(
+                string=stylesheet_source.decode("utf-8"),
+                base_url=self.base_url,
+                font_config=font_config,
+            )
+
+            self._template = template
+            self._stylesheet = stylesheet
+            self._font_config = font_config
+            self._signature = signature
+            self.fingerprint = hashlib.sha256(
+                template_source + b"\0" + stylesheet_source
+            ).hexdigest()
+
+    def reload_if_changed(self) -> bool:
+        """Reloads when the template or stylesheet changed on disk."""
+        if self._file_signature() == self._signature:
+            return False
+        self.reload()
+        return True
+
+    def render_html(self, context: dict[str, Any]) -> str:
+        return self._template.render(context)
+
+    def render_pdf(self, context: dict[str, Any]) -> bytes:
+        html_out = self.render_html(context)
+        pdf_bytes = HTML(string=html_out, base_url=self.base_url).write_pdf(
+            stylesheets=[self._stylesheet], font_config=self._font_config
+        )
+        return bytes(pdf_bytes)
+
+
+_renderer: InvoiceRenderer | None = None
+_renderer_lock = threading.Lock()
+
+
+def get_invoice_renderer() -> InvoiceRenderer:
+    """Returns the process-wide renderer, creating it on first use."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = InvoiceRenderer()
+    return _renderer
@@ -2,21 +2,15 @@
 
 import streamlit as st
 
-from app.database import engine
-from app.models import Base
-from app.style_loader import load_css  # <-- THE MISSING IMPORT!
+from app.bootstrap import prepare_page
 
-# --- Initial Database Setup ---
-# This is the crucial line that was missing.
-# It connects to the DB and creates all tables defined in models.py if they don't exist.
-Base.metadata.create_all(bind=engine)
-# --- End of Setup ---
+# The schema is created and upgraded by `python -m app.migrate upgrade`.
 
 
 # Set the page configuration. This should be the first Streamlit command.
 st.set_page_config(page_title="Mini ERP Home", page_icon="👑", layout="wide")
 
-load_css()
+prepare_page()
 
 
 st.title("Welcome to your Mini ERP System! 👑")
@@ -0,0 +1,131 @@
+# app/migrate.py
+
+import argparse
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import Connection, inspect
+
+from app.database import DATABASE_URL, engine
+from app.models import Base
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+# The oldest schema create_all built before migrations were introduced; newer
+# unversioned databases are adopted at it too, as 0002 skips what they have.
+BASELINE_REVISION = "0001"
+# Objects the models declare for PostgreSQL only.
+POSTGRESQL_ONLY = {"ix_products_name_trgm", "product_index_seq"}
+
+
+def object_filter(connection: Connection) -> Callable[..., bool]:
+    """Leaves PostgreSQL-only objects out of schema comparisons on other backends."""
+    postgresql = connection.dialect.name == "postgresql"
+
+    def include_object(
+        obj: Any, name: str | None, type_: str, reflected: bool, compare_to: Any
+    ) -> bool:
+        return postgresql or name not in POSTGRESQL_ONLY
+
+    return include_object
+
+
+def alembic_config(connection: Connection | None = None) -> Config:
+    """Builds the Alembic configuration without an alembic.ini file."""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.set_main_option("file_template", "%%(rev)s_%%(slug)s")
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+    config.attributes["connection"] = connection
+    return config
+
+
+def current_revision(connection: Connection) -> str | None:
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def head_revision() -> str | None:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def upgrade(connection: Connection, revision: str = "head") -> None:
+    """
+    Migrates the database to a revision. A database created by create_all
+    before migrations existed is adopted as the baseline revision first.
+    """
+    config = alembic_config(connection)
+    if current_revision(connection) is None and inspect(connection).has_table("orders"):
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, revision)
+
+
+def schema_drift(connection: Connection) -> list[Any]:
+    """Lists the differences between the ORM models and the database schema."""
+    context = MigrationContext.configure(
+        connection,
+        opts={"include_object": object_filter(connection), "compare_type": True},
+    )
+    return compare_metadata(context, Base.metadata)
+
+
+def check(connection: Connection) -> list[str]:
+    """Returns the problems that make the database unfit for the current code."""
+    problems = []
+    current, head = current_revision(connection), head_revision()
+    if current != head:
+        problems.append(f"Database is at revision {current}, the code expects {head}.")
+    problems.extend(f"Schema drift: {diff}" for diff in schema_drift(connection))
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the database schema.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="migrate to a revision")
+    upgrade_parser.add_argument("revision", nargs="?", default="head")
+    downgrade_parser = commands.add_parser("downgrade", help="revert to a revision")
+    downgrade_parser.add_argument("revision")
+    commands.add_parser("current", help="show the database's revision")
+    commands.add_parser("history", help="list the migrations")
+    commands.add_parser(
+        "check", help="fail if the database is behind or differs from the models"
+    )
+    revision_parser = commands.add_parser(
+        "revision", help="generate a migration from the model changes"
+    )
+    revision_parser.add_argument("-m", "--message", required=True)
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        config = alembic_config(connection)
+        if args.command == "upgrade":
+            upgrade(connection, args.revision)
+        elif args.command == "downgrade":
+            command.downgrade(config, args.revision)
+        elif args.command == "current":
+            print(current_revision(connection) or "empty database")
+        elif args.command == "history":
+            command.history(config)
+        elif args.command == "revision":
+            # Revisions are numbered in sequence: 0001, 0002, ...
+            rev_id = f"{int(head_revision() or 0) + 1:04d}"
+            command.revision(
+                config, message=args.message, autogenerate=True, rev_id=rev_id
+            )
+        elif args.command == "check":
+            problems = check(connection)
+            for problem in problems:
+                print(problem)
+            if problems:
+                sys.exit(1)
+            print("Database schema matches the models.")
+
+
+if __name__ == "__main__":
+    main()
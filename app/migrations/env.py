@@ -0,0 +1,45 @@
+# app/migrations/env.py
+
+from alembic import context
+from sqlalchemy import Connection, create_engine
+
+from app.database import engine_options
+from app.migrate import object_filter
+from app.models import Base
+
+config = context.config
+
+
+def run_migrations() -> None:
+    # app.migrate passes its own connection; the URL is the fallback.
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+    url = config.get_main_option("sqlalchemy.url")
+    if not url:
+        raise RuntimeError(
+            "No database to migrate: pass a connection or set sqlalchemy.url."
+        )
+    engine = create_engine(url, **engine_options(url))
+    with engine.connect() as connection:
+        _run(connection)
+    engine.dispose()
+
+
+def _run(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=Base.metadata,
+        include_object=object_filter(connection),
+        # SQLite alters tables by copying them.
+        render_as_batch=connection.dialect.name == "sqlite",
+        compare_type=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    raise RuntimeError("Offline (--sql) migrations are not supported.")
+run_migrations()
@@ -0,0 +1,137 @@
+"""Baseline: the schema as create_all built it before the performance work.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 03:04:40.136542
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENUMS = (
+    "clientcategory",
+    "clienttype",
+    "productunit",
+    "paymentstatus",
+    "paymentmethod",
+)
+TABLES = ("order_items", "orders", "products", "company_profile", "clients")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "clients",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "category",
+            sa.Enum("COMPANY", "INDIVIDUAL", name="clientcategory"),
+            nullable=False,
+        ),
+        sa.Column("company_name", sa.String(), nullable=True),
+        sa.Column("vat_id", sa.String(), nullable=True),
+        sa.Column("first_name", sa.String(), nullable=True),
+        sa.Column("last_name", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("phone_number", sa.String(), nullable=True),
+        sa.Column("address_street", sa.String(), nullable=True),
+        sa.Column("address_zipcode", sa.String(), nullable=True),
+        sa.Column("address_city", sa.String(), nullable=True),
+        sa.Column(
+            "client_type",
+            sa.Enum("RECIPIENT", "SUPPLIER", name="clienttype"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_clients_company_name"), "clients", ["company_name"], unique=False
+    )
+    op.create_index(op.f("ix_clients_id"), "clients", ["id"], unique=False)
+    op.create_index(op.f("ix_clients_vat_id"), "clients", ["vat_id"], unique=True)
+    op.create_table(
+        "company_profile",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("company_name", sa.String(), nullable=True),
+        sa.Column("vat_id", sa.String(), nullable=True),
+        sa.Column("address_street", sa.String(), nullable=True),
+        sa.Column("address_zipcode", sa.String(), nullable=True),
+        sa.Column("address_city", sa.String(), nullable=True),
+        sa.Column("bank_account_number", sa.String(), nullable=True),
+        sa.Column("additional_info", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("product_index", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "unit", sa.Enum("PCS", "KG", "SET", "M", name="productunit"), nullable=False
+        ),
+        sa.Column("stock", sa.Float(), nullable=False),
+        sa.Column("vat_rate", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_products_id"), "products", ["id"], unique=False)
+    op.create_index(op.f("ix_products_name"), "products", ["name"], unique=False)
+    op.create_index(
+        op.f("ix_products_product_index"), "products", ["product_index"], unique=True
+    )
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("invoice_number", sa.String(), nullable=True),
+        sa.Column("payment_due_date", sa.DateTime(), nullable=True),
+        sa.Column(
+            "payment_status",
+            sa.Enum("UNPAID", "PAID", "OVERDUE", name="paymentstatus"),
+            nullable=False,
+        ),
+        sa.Column(
+            "payment_method",
+            sa.Enum("BANK_TRANSFER", "CASH", "CARD", name="paymentmethod"),
+            nullable=True,
+        ),
+        sa.Column("order_date", sa.DateTime(), nullable=False),
+        sa.Column("client_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["client_id"],
+            ["clients.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_orders_id"), "orders", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_orders_invoice_number"), "orders", ["invoice_number"], unique=True
+    )
+    op.create_table(
+        "order_items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Float(), nullable=False),
+        sa.Column("price_per_unit", sa.Float(), nullable=False),
+        sa.Column("vat_rate", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["order_id"],
+            ["orders.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["product_id"],
+            ["products.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_table(table)
+    if op.get_bind().dialect.name == "postgresql":
+        for enum in ENUMS:
+            op.execute(f"DROP TYPE IF EXISTS {enum}")
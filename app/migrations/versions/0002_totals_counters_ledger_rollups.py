@@ -0,0 +1,174 @@
+"""Stored order totals, number counters, the stock ledger and sales rollups.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 04:05:12.408214
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+ROLLUP_TABLES = (
+    "sales_daily_rollups",
+    "sales_monthly_rollups",
+    "sales_client_rollups",
+    "sales_vat_rollups",
+)
+ORDER_TOTALS = ("total_net", "total_vat", "total_gross", "vat_breakdown")
+
+
+def _order_totals() -> list[sa.Column]:
+    return [
+        sa.Column("total_net", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("total_vat", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("total_gross", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("vat_breakdown", sa.JSON(), nullable=False, server_default="{}"),
+    ]
+
+
+def _rollup_keys(table: str) -> list[sa.Column]:
+    if table == "sales_daily_rollups":
+        return [sa.Column("day", sa.Date(), nullable=False)]
+    if table == "sales_monthly_rollups":
+        return [
+            sa.Column("year", sa.Integer(), nullable=False),
+            sa.Column("month", sa.Integer(), nullable=False),
+        ]
+    if table == "sales_client_rollups":
+        return [
+            sa.Column(
+                "client_id", sa.Integer(), sa.ForeignKey("clients.id"), nullable=False
+            )
+        ]
+    return [sa.Column("vat_rate", sa.Float(), autoincrement=False, nullable=False)]
+
+
+def _rollup_columns() -> list[sa.Column]:
+    return [
+        sa.Column("order_count", sa.Integer(), nullable=False),
+        sa.Column("total_net", sa.Float(), nullable=False),
+        sa.Column("total_vat", sa.Float(), nullable=False),
+        sa.Column("total_gross", sa.Float(), nullable=False),
+        sa.Column("invoice_count", sa.Integer(), nullable=False),
+        sa.Column("invoiced_gross", sa.Float(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    # Databases adopted from create_all may have some of these already.
+    bind = op.get_bind()
+    postgresql = bind.dialect.name == "postgresql"
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+
+    order_columns = {column["name"] for column in inspector.get_columns("orders")}
+    for column in _order_totals():
+        if column.name not in order_columns:
+            op.add_column("orders", column)
+
+    if "invoice_sequences" not in tables:
+        op.create_table(
+            "invoice_sequences",
+            sa.Column("prefix", sa.String(), nullable=False),
+            sa.Column("year", sa.Integer(), nullable=False),
+            sa.Column("month", sa.Integer(), nullable=False),
+            sa.Column("last_value", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("prefix", "year", "month"),
+        )
+    if "sequence_counters" not in tables:
+        op.create_table(
+            "sequence_counters",
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("last_value", sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint("name"),
+        )
+    if postgresql:
+        op.execute(
+            sa.schema.CreateSequence(
+                sa.Sequence("product_index_seq"), if_not_exists=True
+            )
+        )
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_products_name_trgm",
+            "products",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            if_not_exists=True,
+        )
+
+    if "inventory_movements" not in tables:
+        op.create_table(
+            "inventory_movements",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("product_id", sa.Integer(), nullable=False),
+            sa.Column("order_id", sa.Integer(), nullable=True),
+            sa.Column("quantity", sa.Float(), nullable=False),
+            sa.Column(
+                "reason",
+                sa.Enum("RECEIPT", "ORDER", "ADJUSTMENT", name="movementreason"),
+                nullable=False,
+            ),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("note", sa.String(), nullable=True),
+            sa.ForeignKeyConstraint(
+                ["order_id"],
+                ["orders.id"],
+            ),
+            sa.ForeignKeyConstraint(
+                ["product_id"],
+                ["products.id"],
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            op.f("ix_inventory_movements_order_id"),
+            "inventory_movements",
+            ["order_id"],
+        )
+        op.create_index(
+            op.f("ix_inventory_movements_product_id"),
+            "inventory_movements",
+            ["product_id"],
+        )
+
+    for table in ROLLUP_TABLES:
+        if table not in tables:
+            keys = _rollup_keys(table)
+            op.create_table(
+                table,
+                *keys,
+                *_rollup_columns(),
+                sa.PrimaryKeyConstraint(*(key.name for key in keys)),
+            )
+    if postgresql and "sales_vat_rollups" in tables:
+        # create_all made this float primary key a SERIAL (integer) column.
+        op.execute("ALTER TABLE sales_vat_rollups ALTER COLUMN vat_rate DROP DEFAULT")
+        op.alter_column(
+            "sales_vat_rollups",
+            "vat_rate",
+            existing_type=sa.Integer(),
+            type_=sa.Float(),
+            existing_nullable=False,
+        )
+        op.execute("DROP SEQUENCE IF EXISTS sales_vat_rollups_vat_rate_seq")
+
+
+def downgrade() -> None:
+    for table in (*ROLLUP_TABLES, "inventory_movements"):
+        op.drop_table(table)
+    op.drop_table("sequence_counters")
+    op.drop_table("invoice_sequences")
+    with op.batch_alter_table("orders") as batch_op:
+        for column in reversed(ORDER_TOTALS):
+            batch_op.drop_column(column)
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_products_name_trgm", table_name="products")
+        op.execute("DROP SEQUENCE IF EXISTS product_index_seq")
+        op.execute("DROP TYPE IF EXISTS movementreason")
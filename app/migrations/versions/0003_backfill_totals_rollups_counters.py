@@ -0,0 +1,288 @@
+"""Backfill the stored order totals, the sales rollups and the number counters.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 04:12:37.551902
+"""
+
+from collections import defaultdict
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Frozen copies of the tables as of this revision, so later model changes
+# cannot alter what the backfill does.
+orders = sa.table(
+    "orders",
+    sa.column("id", sa.Integer),
+    sa.column("invoice_number", sa.String),
+    sa.column("order_date", sa.DateTime),
+    sa.column("client_id", sa.Integer),
+    sa.column("total_net", sa.Float),
+    sa.column("total_vat", sa.Float),
+    sa.column("total_gross", sa.Float),
+    sa.column("vat_breakdown", sa.JSON),
+)
+order_items = sa.table(
+    "order_items",
+    sa.column("order_id", sa.Integer),
+    sa.column("quantity", sa.Float),
+    sa.column("price_per_unit", sa.Float),
+    sa.column("vat_rate", sa.Float),
+)
+products = sa.table("products", sa.column("product_index", sa.BigInteger))
+invoice_sequences = sa.table(
+    "invoice_sequences",
+    sa.column("prefix", sa.String),
+    sa.column("year", sa.Integer),
+    sa.column("month", sa.Integer),
+    sa.column("last_value", sa.Integer),
+)
+sequence_counters = sa.table(
+    "sequence_counters",
+    sa.column("name", sa.String),
+    sa.column("last_value", sa.BigInteger),
+)
+
+ROLLUP_COLUMNS = (
+    "order_count",
+    "total_net",
+    "total_vat",
+    "total_gross",
+    "invoice_count",
+    "invoiced_gross",
+)
+
+
+def _rollup_table(name: str, *keys: sa.ColumnClause) -> sa.TableClause:
+    return sa.table(
+        name,
+        *keys,
+        *(
+            sa.column(column, sa.Integer if column.endswith("count") else sa.Float)
+            for column in ROLLUP_COLUMNS
+        ),
+    )
+
+
+sales_daily_rollups = _rollup_table("sales_daily_rollups", sa.column("day", sa.Date))
+sales_monthly_rollups = _rollup_table(
+    "sales_monthly_rollups",
+    sa.column("year", sa.Integer),
+    sa.column("month", sa.Integer),
+)
+sales_client_rollups = _rollup_table(
+    "sales_client_rollups", sa.column("client_id", sa.Integer)
+)
+sales_vat_rollups = _rollup_table("sales_vat_rollups", sa.column("vat_rate", sa.Float))
+
+
+def _order_totals(lines: list[tuple[float, float, float]]) -> dict:
+    """The stored totals of an order, computed as the order models did here."""
+    per_rate: dict[float, list[float]] = defaultdict(lambda: [0.0, 0.0])
+    for quantity, price_per_unit, vat_rate in lines:
+        net = quantity * price_per_unit
+        per_rate[vat_rate][0] += net
+        per_rate[vat_rate][1] += net * (vat_rate / 100)
+    total_net = sum(net for net, _ in per_rate.values())
+    total_vat = sum(vat for _, vat in per_rate.values())
+    return {
+        "total_net": round(total_net, 2),
+        "total_vat": round(total_vat, 2),
+        "total_gross": round(total_net + total_vat, 2),
+        "vat_breakdown": {
+            f"{rate:g}": {
+                "net": round(net, 2),
+                "vat": round(vat, 2),
+                "gross": round(net + vat, 2),
+            }
+            for rate, (net, vat) in sorted(per_rate.items(), reverse=True)
+        },
+    }
+
+
+def _backfill_order_totals(connection: sa.Connection) -> dict[float, dict]:
+    """
+    Stores every order's totals and returns the VAT rollup rows, summed from
+    each order's rounded breakdown.
+    """
+    vat_rows: dict[float, dict] = defaultdict(
+        lambda: dict.fromkeys(ROLLUP_COLUMNS, 0.0)
+    )
+    invoiced: dict[int, bool] = dict(
+        connection.execute(sa.select(orders.c.id, orders.c.invoice_number.is_not(None)))
+        .tuples()
+        .all()
+    )
+    order_ids = sorted(invoiced)
+    for start in range(0, len(order_ids), BATCH_SIZE):
+        batch = order_ids[start : start + BATCH_SIZE]
+        lines: dict[int, list[tuple[float, float, float]]] = {
+            order_id: [] for order_id in batch
+        }
+        for order_id, quantity, price_per_unit, vat_rate in connection.execute(
+            sa.select(
+                order_items.c.order_id,
+                order_items.c.quantity,
+                order_items.c.price_per_unit,
+                order_items.c.vat_rate,
+            ).where(order_items.c.order_id.in_(batch))
+        ):
+            lines[order_id].append((quantity, price_per_unit, vat_rate))
+        totals = []
+        for order_id, order_lines in lines.items():
+            order_totals = _order_totals(order_lines)
+            totals.append({"order_id": order_id, **order_totals})
+            for rate, amounts in order_totals["vat_breakdown"].items():
+                row = vat_rows[float(rate)]
+                row["order_count"] += 1
+                row["total_net"] += amounts["net"]
+                row["total_vat"] += amounts["vat"]
+                row["total_gross"] += amounts["gross"]
+                if invoiced[order_id]:
+                    row["invoice_count"] += 1
+                    row["invoiced_gross"] += amounts["gross"]
+        connection.execute(
+            sa.update(orders)
+            .where(orders.c.id == sa.bindparam("order_id"))
+            .values(
+                total_net=sa.bindparam("total_net"),
+                total_vat=sa.bindparam("total_vat"),
+                total_gross=sa.bindparam("total_gross"),
+                vat_breakdown=sa.bindparam("vat_breakdown"),
+            ),
+            totals,
+        )
+    return vat_rows
+
+
+def _rebuild_rollups(connection: sa.Connection, vat_rows: dict[float, dict]) -> None:
+    """Recomputes the sales rollups from the stored order totals."""
+    for table in (
+        sales_daily_rollups,
+        sales_monthly_rollups,
+        sales_client_rollups,
+        sales_vat_rollups,
+    ):
+        connection.execute(sa.delete(table))
+
+    invoiced = orders.c.invoice_number.is_not(None)
+    aggregates = (
+        sa.func.count(orders.c.id),
+        sa.func.coalesce(sa.func.sum(orders.c.total_net), 0.0),
+        sa.func.coalesce(sa.func.sum(orders.c.total_vat), 0.0),
+        sa.func.coalesce(sa.func.sum(orders.c.total_gross), 0.0),
+        sa.func.coalesce(sa.func.sum(sa.case((invoiced, 1), else_=0)), 0),
+        sa.func.coalesce(
+            sa.func.sum(sa.case((invoiced, orders.c.total_gross), else_=0.0)), 0.0
+        ),
+    )
+    year = sa.extract("year", orders.c.order_date)
+    month = sa.extract("month", orders.c.order_date)
+    groupings: list[tuple[sa.TableClause, list[str], tuple[sa.ColumnElement, ...]]] = [
+        (sales_daily_rollups, ["day"], (sa.func.date(orders.c.order_date),)),
+        (sales_monthly_rollups, ["year", "month"], (year, month)),
+        (sales_client_rollups, ["client_id"], (orders.c.client_id,)),
+    ]
+    for table, keys, key_columns in groupings:
+        connection.execute(
+            sa.insert(table).from_select(
+                [*keys, *ROLLUP_COLUMNS],
+                sa.select(*key_columns, *aggregates).group_by(*key_columns),
+            )
+        )
+    if vat_rows:
+        connection.execute(
+            sa.insert(sales_vat_rollups),
+            [{"vat_rate": rate, **row} for rate, row in vat_rows.items()],
+        )
+
+
+def _backfill_invoice_sequences(connection: sa.Connection) -> None:
+    """Seeds each period's counter with the highest number already issued."""
+    last_values: dict[tuple[str, int, int], int] = defaultdict(int)
+    for number in connection.scalars(
+        sa.select(orders.c.invoice_number).where(orders.c.invoice_number.is_not(None))
+    ):
+        parts = number.split("/")  # Prefix/Number/Month/Year
+        if len(parts) != 4 or not all(part.isdigit() for part in parts[1:]):
+            continue
+        prefix, value, month, year = parts[0], *map(int, parts[1:])
+        key = (prefix, year, month)
+        last_values[key] = max(last_values[key], value)
+    existing = {
+        (prefix, year, month): last_value
+        for prefix, year, month, last_value in connection.execute(
+            sa.select(invoice_sequences)
+        )
+    }
+    for (prefix, year, month), value in last_values.items():
+        current = existing.get((prefix, year, month))
+        if current is None:
+            connection.execute(
+                sa.insert(invoice_sequences).values(
+                    prefix=prefix, year=year, month=month, last_value=value
+                )
+            )
+        elif current < value:
+            connection.execute(
+                sa.update(invoice_sequences)
+                .where(
+                    invoice_sequences.c.prefix == prefix,
+                    invoice_sequences.c.year == year,
+                    invoice_sequences.c.month == month,
+                )
+                .values(last_value=value)
+            )
+
+
+def _backfill_product_index_counter(connection: sa.Connection) -> None:
+    """Moves the product index sequence (or its emulation) past existing products."""
+    max_index = connection.scalar(sa.select(sa.func.max(products.c.product_index)))
+    if max_index is None:
+        return
+    if connection.dialect.name == "postgresql":
+        connection.execute(
+            sa.text(
+                "SELECT setval('product_index_seq', :max_index) "
+                "WHERE :max_index >= (SELECT last_value FROM product_index_seq)"
+            ),
+            {"max_index": max_index},
+        )
+        return
+    current = connection.scalar(
+        sa.select(sequence_counters.c.last_value).where(
+            sequence_counters.c.name == "product_index_seq"
+        )
+    )
+    if current is None:
+        connection.execute(
+            sa.insert(sequence_counters).values(
+                name="product_index_seq", last_value=max_index
+            )
+        )
+    elif current < max_index:
+        connection.execute(
+            sa.update(sequence_counters)
+            .where(sequence_counters.c.name == "product_index_seq")
+            .values(last_value=max_index)
+        )
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    _rebuild_rollups(connection, _backfill_order_totals(connection))
+    _backfill_invoice_sequences(connection)
+    _backfill_product_index_counter(connection)
+
+
+def downgrade() -> None:
+    # The backfilled values are dropped with their columns and tables by 0002.
+    pass
@@ -0,0 +1,60 @@
+"""Indexes for the order list, order joins and the overdue sweep.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 03:04:58.972909
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+UNPAID = sa.text("payment_status = 'UNPAID'")
+
+
+def upgrade() -> None:
+    # Databases adopted from create_all may have some of these already.
+    # Loading an order's items, and the joins of exports and reports.
+    op.create_index(
+        op.f("ix_order_items_order_id"),
+        "order_items",
+        ["order_id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        op.f("ix_order_items_product_id"),
+        "order_items",
+        ["product_id"],
+        if_not_exists=True,
+    )
+    # Keyset pagination of the order list, overall and per client.
+    op.create_index(
+        "ix_orders_order_date_id", "orders", ["order_date", "id"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_orders_client_id_order_date_id",
+        "orders",
+        ["client_id", "order_date", "id"],
+        if_not_exists=True,
+    )
+    # The overdue sweep.
+    op.create_index(
+        "ix_orders_unpaid_due_date",
+        "orders",
+        ["payment_due_date"],
+        postgresql_where=UNPAID,
+        sqlite_where=UNPAID,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_unpaid_due_date", table_name="orders")
+    op.drop_index("ix_orders_client_id_order_date_id", table_name="orders")
+    op.drop_index("ix_orders_order_date_id", table_name="orders")
+    op.drop_index(op.f("ix_order_items_product_id"), table_name="order_items")
+    op.drop_index(op.f("ix_order_items_order_id"), table_name="order_items")
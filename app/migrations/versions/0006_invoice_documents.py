@@ -0,0 +1,37 @@
+"""Pointers from invoiced orders to their archived PDFs.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 03:15:25.397033
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "invoice_documents",
+        sa.Column("order_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("invoice_number", sa.String(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["order_id"],
+            ["orders.id"],
+        ),
+        sa.PrimaryKeyConstraint("order_id"),
+    )
+    op.create_index(
+        op.f("ix_invoice_documents_sha256"), "invoice_documents", ["sha256"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("invoice_documents")
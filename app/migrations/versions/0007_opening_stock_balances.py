@@ -0,0 +1,73 @@
+"""Opening-balance adjustments, so the stock ledger adds up to each product's stock.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 05:02:41.718305
+"""
+
+from datetime import datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+OPENING_BALANCE = "Opening balance"
+
+# Frozen copies of the tables as of this revision.
+movement_reason = sa.Enum(
+    "RECEIPT", "ORDER", "ADJUSTMENT", name="movementreason", create_type=False
+)
+products = sa.table(
+    "products", sa.column("id", sa.Integer), sa.column("stock", sa.Float)
+)
+inventory_movements = sa.table(
+    "inventory_movements",
+    sa.column("product_id", sa.Integer),
+    sa.column("quantity", sa.Float),
+    sa.column("reason", movement_reason),
+    sa.column("created_at", sa.DateTime),
+    sa.column("note", sa.String),
+)
+
+
+def upgrade() -> None:
+    # Products created before receipts were recorded have stock the ledger
+    # does not explain; one adjustment per product makes up the difference.
+    recorded = (
+        sa.select(
+            inventory_movements.c.product_id,
+            sa.func.sum(inventory_movements.c.quantity).label("quantity"),
+        )
+        .group_by(inventory_movements.c.product_id)
+        .subquery()
+    )
+    difference = products.c.stock - sa.func.coalesce(recorded.c.quantity, 0.0)
+    op.execute(
+        sa.insert(inventory_movements).from_select(
+            ["product_id", "quantity", "reason", "created_at", "note"],
+            sa.select(
+                products.c.id,
+                difference,
+                sa.cast(sa.literal("ADJUSTMENT"), movement_reason),
+                sa.literal(datetime.utcnow(), sa.DateTime),
+                sa.literal(OPENING_BALANCE),
+            )
+            .select_from(
+                products.outerjoin(recorded, recorded.c.product_id == products.c.id)
+            )
+            .where(difference != 0),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        sa.delete(inventory_movements).where(
+            inventory_movements.c.reason == "ADJUSTMENT",
+            inventory_movements.c.note == OPENING_BALANCE,
+        )
+    )
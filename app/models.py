@@ -1,20 +1,43 @@
 # app/models.py (Version with ONLY the Client refactor)
 import enum
-from datetime import datetime
+from collections import defaultdict
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import chain
 
 from sqlalchemy import (
+    DDL,
+    JSON,
     BigInteger,
+    Connection,
+    Date,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    Sequence,
     String,
     Text,
+    bindparam,
+    event,
+    inspect,
+    select,
+    text,
+    update,
 )
 from sqlalchemy import (
     Enum as SAEnum,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import (
+    Mapped,
+    Session,
+    mapped_column,
+    relationship,
+)
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
 from app.database import Base
 
@@ -49,13 +72,26 @@ class PaymentMethod(enum.Enum):
     CARD = "Payment Card"
 
 
+class MovementReason(enum.Enum):
+    RECEIPT = "Receipt"
+    ORDER = "Order"
+    ADJUSTMENT = "Adjustment"
+
+
+class RenderJobStatus(enum.Enum):
+    QUEUED = "Queued"
+    RUNNING = "Running"
+    DONE = "Done"
+    FAILED = "Failed"
+
+
 # --- Models ---
 class OrderItem(Base):
     __tablename__ = "order_items"
     # ... (no changes in this class body)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"))
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), index=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), index=True)
     quantity: Mapped[float] = mapped_column(Float, nullable=False)
     price_per_unit: Mapped[float] = mapped_column(Float, nullable=False)
     vat_rate: Mapped[float] = mapped_column(Float, nullable=False)
@@ -65,6 +101,20 @@ class OrderItem(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Partial index serving the overdue sweep (see app/overdue.py): only
+        # unpaid orders are indexed, so it stays small as paid orders pile up.
+        Index(
+            "ix_orders_unpaid_due_date",
+            "payment_due_date",
+            postgresql_where=text("payment_status = 'UNPAID'"),
+            sqlite_where=text("payment_status = 'UNPAID'"),
+        ),
+        # Keyset pagination of the order list, newest first, and date filters.
+        Index("ix_orders_order_date_id", "order_date", "id"),
+        # The order list filtered by client, in the same order.
+        Index("ix_orders_client_id_order_date_id", "client_id", "order_date", "id"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     invoice_number: Mapped[str | None] = mapped_column(
         String, unique=True, index=True, nullable=True
@@ -84,10 +134,17 @@ class Order(Base):
     items: Mapped[list["OrderItem"]] = relationship(
         back_populates="order", cascade="all, delete-orphan"
     )
+    # Stored totals, kept in sync with the items on every flush (see below).
+    total_net: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    total_vat: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    total_gross: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    vat_breakdown: Mapped[dict[str, dict[str, float]]] = mapped_column(
+        JSON, nullable=False, default=dict
+    )
 
     @property
     def total_value(self) -> float:
-        return sum(item.quantity * item.price_per_unit for item in self.items)
+        return self.total_net
 
     def __repr__(self) -> str:
         if self.client:
@@ -126,8 +183,21 @@ class Client(Base):
         return f"<Client(id={self.id}, name='{self.display_name}')>"
 
 
+# Hands out product indexes on PostgreSQL; emulated by SequenceCounter on SQLite.
+product_index_seq = Sequence("product_index_seq", metadata=Base.metadata)
+
+
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Trigram index serving substring (ILIKE '%term%') and fuzzy name search.
+        Index(
+            "ix_products_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String, index=True, nullable=False)
     product_index: Mapped[int] = mapped_column(
@@ -142,6 +212,122 @@ class Product(Base):
         return f"<Product(name='{self.name}')>"
 
 
+class InventoryMovement(Base):
+    """One stock change of a product; outgoing quantities are negative."""
+
+    __tablename__ = "inventory_movements"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), index=True)
+    order_id: Mapped[int | None] = mapped_column(
+        ForeignKey("orders.id"), index=True, nullable=True
+    )
+    quantity: Mapped[float] = mapped_column(Float, nullable=False)
+    reason: Mapped[MovementReason] = mapped_column(
+        SAEnum(MovementReason), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    note: Mapped[str | None] = mapped_column(String)
+
+
+event.listen(
+    Product.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class RenderJob(Base):
+    """An invoice PDF to render in the background (see app/render_worker.py)."""
+
+    __tablename__ = "render_jobs"
+    __table_args__ = (
+        # Workers claim the oldest runnable job first.
+        Index("ix_render_jobs_status_id", "status", "id"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), index=True)
+    status: Mapped[RenderJobStatus] = mapped_column(
+        SAEnum(RenderJobStatus), nullable=False, default=RenderJobStatus.QUEUED
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Not claimed before this time; pushed back after a failed attempt.
+    run_after: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # A running job whose lease has expired belongs to a dead worker.
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime)
+    result_path: Mapped[str | None] = mapped_column(String)
+    error: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime)
+
+
+class InvoiceDocument(Base):
+    """The issued PDF of an invoice, archived once (see app/invoice_archive.py)."""
+
+    __tablename__ = "invoice_documents"
+    order_id: Mapped[int] = mapped_column(
+        ForeignKey("orders.id"), primary_key=True, autoincrement=False
+    )
+    invoice_number: Mapped[str] = mapped_column(String, nullable=False)
+    # Hex SHA-256 of the PDF, which is also its name in the archive.
+    sha256: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class InvoiceSequence(Base):
+    """Last invoice number handed out for each prefix and period."""
+
+    __tablename__ = "invoice_sequences"
+    prefix: Mapped[str] = mapped_column(String, primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[int] = mapped_column(Integer, primary_key=True)
+    last_value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class SequenceCounter(Base):
+    """Emulates a database sequence on backends without native sequences."""
+
+    __tablename__ = "sequence_counters"
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    last_value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+# --- Sales rollups (maintained by app/reporting.py) ---
+class SalesRollupMixin:
+    """Running totals shared by every sales rollup table."""
+
+    order_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_net: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    total_vat: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    total_gross: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    invoice_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    invoiced_gross: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
+class SalesDailyRollup(SalesRollupMixin, Base):
+    __tablename__ = "sales_daily_rollups"
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+
+class SalesMonthlyRollup(SalesRollupMixin, Base):
+    __tablename__ = "sales_monthly_rollups"
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+
+class SalesClientRollup(SalesRollupMixin, Base):
+    __tablename__ = "sales_client_rollups"
+    client_id: Mapped[int] = mapped_column(ForeignKey("clients.id"), primary_key=True)
+
+
+class SalesVatRollup(SalesRollupMixin, Base):
+    __tablename__ = "sales_vat_rollups"
+    # Without autoincrement=False, PostgreSQL would make this a SERIAL column.
+    vat_rate: Mapped[float] = mapped_column(
+        Float, primary_key=True, autoincrement=False
+    )
+
+
 class CompanyProfile(Base):
     __tablename__ = "company_profile"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -152,3 +338,107 @@ class CompanyProfile(Base):
     address_city: Mapped[str | None] = mapped_column(String)
     bank_account_number: Mapped[str | None] = mapped_column(String)
     additional_info: Mapped[str | None] = mapped_column(Text)
+
+
+# --- Stored order totals ---
+@dataclass
+class OrderTotals:
+    total_net: float = 0.0
+    total_vat: float = 0.0
+    total_gross: float = 0.0
+    vat_breakdown: dict[str, dict[str, float]] = field(default_factory=dict)
+
+
+def calculate_order_totals(lines: Iterable[tuple[float, float, float]]) -> OrderTotals:
+    """Computes net, VAT and gross totals from (quantity, price, VAT rate) lines."""
+    per_rate: dict[float, list[float]] = defaultdict(lambda: [0.0, 0.0])
+    for quantity, price_per_unit, vat_rate in lines:
+        net = quantity * price_per_unit
+        per_rate[vat_rate][0] += net
+        per_rate[vat_rate][1] += net * (vat_rate / 100)
+
+    total_net = sum(net for net, _ in per_rate.values())
+    total_vat = sum(vat for _, vat in per_rate.values())
+    return OrderTotals(
+        total_net=round(total_net, 2),
+        total_vat=round(total_vat, 2),
+        total_gross=round(total_net + total_vat, 2),
+        vat_breakdown={
+            f"{rate:g}": {
+                "net": round(net, 2),
+                "vat": round(vat, 2),
+                "gross": round(net + vat, 2),
+            }
+            for rate, (net, vat) in sorted(per_rate.items(), reverse=True)
+        },
+    )
+
+
+def refresh_order_totals(
+    connection: Connection, order_ids: Collection[int]
+) -> dict[int, OrderTotals]:
+    """Recomputes and stores the totals of the given orders from their items."""
+    if not order_ids:
+        return {}
+    lines: dict[int, list[tuple[float, float, float]]] = {
+        order_id: [] for order_id in order_ids
+    }
+    rows = connection.execute(
+        select(
+            OrderItem.order_id,
+            OrderItem.quantity,
+            OrderItem.price_per_unit,
+            OrderItem.vat_rate,
+        ).where(OrderItem.order_id.in_(order_ids))
+    )
+    for order_id, quantity, price_per_unit, vat_rate in rows:
+        lines[order_id].append((quantity, price_per_unit, vat_rate))
+
+    totals = {
+        order_id: calculate_order_totals(rows) for order_id, rows in lines.items()
+    }
+    connection.execute(
+        update(Order)
+        .where(Order.id == bindparam("order_id"))
+        .values(
+            total_net=bindparam("net"),
+            total_vat=bindparam("vat"),
+            total_gross=bindparam("gross"),
+            vat_breakdown=bindparam("breakdown", type_=JSON),
+        ),
+        [
+            {
+                "order_id": order_id,
+                "net": t.total_net,
+                "vat": t.total_vat,
+                "gross": t.total_gross,
+                "breakdown": t.vat_breakdown,
+            }
+            for order_id, t in totals.items()
+        ],
+    )
+    return totals
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_order_totals(session: Session, flush_context: object) -> None:
+    """Keeps the stored totals of orders in sync whenever their items change."""
+    order_ids: set[int] = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, OrderItem):
+            order_ids.add(obj.order_id)
+            order_ids.update(inspect(obj).attrs.order_id.history.deleted)
+    order_ids.discard(None)  # type: ignore[arg-type]
+    if not order_ids:
+        return
+
+    totals = refresh_order_totals(session.connection(), order_ids)
+    # Orders inserted by this flush are not in the identity map yet.
+    pending_orders = {obj.id: obj for obj in session.new if isinstance(obj, Order)}
+    for order_id, order_totals in totals.items():
+        order = session.identity_map.get(identity_key(Order, order_id))
+        if order is None:
+            order = pending_orders.get(order_id)
+        if order is not None:
+            for key in ("total_net", "total_vat", "total_gross", "vat_breakdown"):
+                set_committed_value(order, key, getattr(order_totals, key))
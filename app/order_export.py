@@ -0,0 +1,196 @@
+# app/order_export.py
+
+import argparse
+import csv
+import os
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date, datetime
+from enum import Enum
+from typing import IO, Any
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.database import session_scope
+from app.models import Client, Order, OrderItem, Product
+
+DEFAULT_BATCH_SIZE = 5000
+EXPORT_FORMATS = ("csv", "parquet")
+
+_net = OrderItem.quantity * OrderItem.price_per_unit
+# One row per order item; orders without items still get a row.
+EXPORT_COLUMNS: tuple[tuple[str, Any, pa.DataType], ...] = (
+    ("order_id", Order.id, pa.int64()),
+    ("order_date", Order.order_date, pa.timestamp("us")),
+    ("invoice_number", Order.invoice_number, pa.string()),
+    ("payment_status", Order.payment_status, pa.string()),
+    ("payment_method", Order.payment_method, pa.string()),
+    ("payment_due_date", Order.payment_due_date, pa.timestamp("us")),
+    ("order_total_net", Order.total_net, pa.float64()),
+    ("order_total_gross", Order.total_gross, pa.float64()),
+    ("client_id", Client.id, pa.int64()),
+    ("client_category", Client.category, pa.string()),
+    ("client_company_name", Client.company_name, pa.string()),
+    ("client_first_name", Client.first_name, pa.string()),
+    ("client_last_name", Client.last_name, pa.string()),
+    ("client_vat_id", Client.vat_id, pa.string()),
+    ("client_city", Client.address_city, pa.string()),
+    ("product_index", Product.product_index, pa.int64()),
+    ("product_name", Product.name, pa.string()),
+    ("unit", Product.unit, pa.string()),
+    ("quantity", OrderItem.quantity, pa.float64()),
+    ("price_per_unit", OrderItem.price_per_unit, pa.float64()),
+    ("vat_rate", OrderItem.vat_rate, pa.float64()),
+    ("line_net", _net, pa.float64()),
+    ("line_gross", _net * (1 + OrderItem.vat_rate / 100), pa.float64()),
+)
+EXPORT_SCHEMA = pa.schema(
+    [(name, arrow_type) for name, _, arrow_type in EXPORT_COLUMNS]
+)
+
+
+def order_export_query(
+    date_from: datetime | None = None, date_to: datetime | None = None
+) -> Select[Any]:
+    """Builds the flat order/item query; date_to is inclusive."""
+    query = (
+        select(*(expression for _, expression, _ in EXPORT_COLUMNS))
+        .select_from(Order)
+        .join(Client, Client.id == Order.client_id)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(Product, Product.id == OrderItem.product_id)
+        .order_by(Order.id, OrderItem.id)
+    )
+    if date_from:
+        query = query.where(Order.order_date >= date_from)
+    if date_to:
+        query = query.where(Order.order_date <= date_to)
+    return query
+
+
+def _plain(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def iter_order_rows(
+    db: Session,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> Iterator[list[tuple[Any, ...]]]:
+    """
+    Yields export rows in batches of at most batch_size. On PostgreSQL the rows
+    are read through a server-side cursor, so only one batch is held in memory.
+    """
+    result = db.execute(
+        order_export_query(date_from, date_to).execution_options(yield_per=batch_size)
+    )
+    for partition in result.partitions():
+        yield [tuple(_plain(value) for value in row) for row in partition]
+
+
+def write_csv(batches: Iterable[list[tuple[Any, ...]]], destination: IO[str]) -> int:
+    """Writes batches as CSV with a header row. Returns the number of rows."""
+    writer = csv.writer(destination)
+    writer.writerow(EXPORT_SCHEMA.names)
+    written = 0
+    for batch in batches:
+        writer.writerows(batch)
+        written += len(batch)
+    return written
+
+
+def write_parquet(
+    batches: Iterable[list[tuple[Any, ...]]], destination: str | IO[bytes]
+) -> int:
+    """Writes each batch as a Parquet row group. Returns the number of rows."""
+    written = 0
+    with pq.ParquetWriter(destination, EXPORT_SCHEMA) as writer:
+        for batch in batches:
+            columns = list(zip(*batch, strict=True))
+            writer.write_batch(
+                pa.RecordBatch.from_arrays(
+                    [
+                        pa.array(values, type=field.type)
+                        for values, field in zip(columns, EXPORT_SCHEMA, strict=True)
+                    ],
+                    schema=EXPORT_SCHEMA,
+                )
+            )
+            written += len(batch)
+    return written
+
+
+def export_orders(
+    db: Session,
+    destination: str | IO[str] | IO[bytes],
+    file_format: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Streams the order history with client and product fields to a CSV or
+    Parquet file. A CSV destination may be a path or a text stream, a Parquet
+    one a path or a binary stream. Returns the number of rows written.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{file_format}'.")
+
+    def batches() -> Iterator[list[tuple[Any, ...]]]:
+        done = 0
+        for batch in iter_order_rows(db, batch_size, date_from, date_to):
+            yield batch
+            done += len(batch)
+            if progress:
+                progress(done)
+
+    if file_format == "parquet":
+        return write_parquet(batches(), destination)  # type: ignore[arg-type]
+    if isinstance(destination, str):
+        with open(destination, "w", newline="", encoding="utf-8") as csv_file:
+            return write_csv(batches(), csv_file)
+    return write_csv(batches(), destination)  # type: ignore[arg-type]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export orders and their items to CSV or Parquet."
+    )
+    parser.add_argument("destination", help="output file, e.g. orders.parquet")
+    parser.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        help="output format (default: taken from the file extension)",
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    parser.add_argument(
+        "--to", dest="date_to", type=date.fromisoformat, help="inclusive"
+    )
+    args = parser.parse_args()
+
+    file_format = args.format or os.path.splitext(args.destination)[1].lstrip(".")
+    if file_format not in EXPORT_FORMATS:
+        parser.error("Cannot infer the format from the file name; use --format.")
+    with session_scope(read_only=True) as db:
+        written = export_orders(
+            db,
+            args.destination,
+            file_format,
+            batch_size=args.batch_size,
+            date_from=datetime.combine(args.date_from, datetime.min.time())
+            if args.date_from
+            else None,
+            date_to=datetime.combine(args.date_to, datetime.max.time())
+            if args.date_to
+            else None,
+        )
+    print(f"Exported {written} rows to {args.destination}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# app/order_queries.py
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import Select, literal, select, tuple_
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import Order, OrderItem, PaymentMethod, PaymentStatus
+
+DEFAULT_PAGE_SIZE = 25
+
+
+@dataclass(frozen=True)
+class OrderFilters:
+    date_from: datetime | None = None
+    date_to: datetime | None = None
+    payment_status: PaymentStatus | None = None
+    payment_method: PaymentMethod | None = None
+    invoice_prefix: str | None = None
+    client_id: int | None = None
+
+
+@dataclass(frozen=True)
+class OrderCursor:
+    """Position of the last order on a page, in (order_date, id) order."""
+
+    order_date: datetime
+    id: int
+
+
+@dataclass
+class OrderPage:
+    orders: list[Order]
+    next_cursor: OrderCursor | None
+
+
+def apply_order_filters(query: Select, filters: OrderFilters) -> Select:
+    """Pushes the order list filters down into SQL."""
+    if filters.date_from:
+        query = query.where(Order.order_date >= filters.date_from)
+    if filters.date_to:
+        query = query.where(Order.order_date <= filters.date_to)
+    if filters.payment_status:
+        query = query.where(Order.payment_status == filters.payment_status)
+    if filters.payment_method:
+        query = query.where(Order.payment_method == filters.payment_method)
+    if filters.invoice_prefix:
+        query = query.where(
+            Order.invoice_number.startswith(filters.invoice_prefix, autoescape=True)
+        )
+    if filters.client_id:
+        query = query.where(Order.client_id == filters.client_id)
+    return query
+
+
+def fetch_order_page(
+    db: Session,
+    filters: OrderFilters | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    after: OrderCursor | None = None,
+) -> OrderPage:
+    """
+    Returns one page of orders, newest first, using keyset pagination on
+    (order_date, id). Items and products are loaded only for that page.
+    """
+    query = apply_order_filters(
+        select(Order).options(selectinload(Order.items).joinedload(OrderItem.product)),
+        filters or OrderFilters(),
+    )
+    if after:
+        query = query.where(
+            tuple_(Order.order_date, Order.id)
+            < tuple_(literal(after.order_date), literal(after.id))
+        )
+    query = query.order_by(Order.order_date.desc(), Order.id.desc()).limit(
+        page_size + 1
+    )
+
+    orders = list(db.scalars(query).unique())
+    next_cursor = None
+    if len(orders) > page_size:
+        orders = orders[:page_size]
+        last = orders[-1]
+        next_cursor = OrderCursor(order_date=last.order_date, id=last.id)
+    return OrderPage(orders=orders, next_cursor=next_cursor)
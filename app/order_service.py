@@ -0,0 +1,175 @@
+# app/order_service.py
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.inventory import reserve_stock
+from app.models import (
+    Client,
+    CompanyProfile,
+    Order,
+    OrderItem,
+    PaymentMethod,
+    PaymentStatus,
+    Product,
+    ProductUnit,
+    calculate_order_totals,
+)
+from app.render_jobs import enqueue_render
+from app.reporting import record_order_created, record_order_invoiced
+from app.utils import get_next_invoice_number
+
+# Units that can only be sold in whole quantities.
+INTEGER_UNITS = (ProductUnit.PCS, ProductUnit.SET)
+
+
+@dataclass(frozen=True)
+class OrderLine:
+    product_id: int
+    quantity: float
+    price_per_unit: float
+
+
+class OrderValidationError(ValueError):
+    """Raised when an order cannot be created; lists every problem found."""
+
+    def __init__(self, problems: list[str]) -> None:
+        self.problems = problems
+        super().__init__(" ".join(problems))
+
+
+class OrderService:
+    """
+    Creates and invoices orders outside the UI. Methods do not commit, so a
+    caller can combine several operations in one transaction.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def validate_lines(self, lines: Sequence[OrderLine]) -> dict[int, float]:
+        """
+        Checks every line against its product with a single query and returns
+        the VAT rate of each product. Raises OrderValidationError otherwise.
+        """
+        if not lines:
+            raise OrderValidationError(["An order needs at least one line."])
+        products = {
+            product_id: (name, unit, vat_rate)
+            for product_id, name, unit, vat_rate in self.db.execute(
+                select(Product.id, Product.name, Product.unit, Product.vat_rate).where(
+                    Product.id.in_({line.product_id for line in lines})
+                )
+            )
+        }
+        problems = []
+        for number, line in enumerate(lines, start=1):
+            if line.product_id not in products:
+                problems.append(f"Line {number}: product {line.product_id} not found.")
+                continue
+            name, unit, _ = products[line.product_id]
+            if line.quantity <= 0:
+                problems.append(f"Line {number}: quantity must be positive.")
+            elif unit in INTEGER_UNITS and line.quantity % 1 != 0:
+                problems.append(
+                    f"Line {number}: quantity of '{name}' must be a whole number "
+                    f"(unit '{unit.value}')."
+                )
+            if line.price_per_unit <= 0:
+                problems.append(f"Line {number}: price must be positive.")
+        if problems:
+            raise OrderValidationError(problems)
+        return {
+            product_id: vat_rate for product_id, (_, _, vat_rate) in products.items()
+        }
+
+    def create_order(
+        self,
+        client_id: int,
+        lines: Sequence[OrderLine],
+        order_date: datetime | None = None,
+    ) -> Order:
+        """
+        Creates an order with all its lines, reserves their stock and updates the
+        sales rollups. The order and the items are each written with one bulk
+        INSERT ... RETURNING, whatever the number of lines.
+        """
+        vat_rates = self.validate_lines(lines)
+        if self.db.get(Client, client_id) is None:
+            raise OrderValidationError([f"Client {client_id} not found."])
+
+        # Bulk inserts bypass the flush that keeps stored totals in sync, so the
+        # totals are computed here.
+        totals = calculate_order_totals(
+            (line.quantity, line.price_per_unit, vat_rates[line.product_id])
+            for line in lines
+        )
+        order = self.db.scalars(
+            insert(Order).returning(Order),
+            [
+                {
+                    "client_id": client_id,
+                    "order_date": order_date or datetime.utcnow(),
+                    "total_net": totals.total_net,
+                    "total_vat": totals.total_vat,
+                    "total_gross": totals.total_gross,
+                    "vat_breakdown": totals.vat_breakdown,
+                }
+            ],
+        ).one()
+        items = self.db.scalars(
+            insert(OrderItem).returning(OrderItem),
+            [
+                {
+                    "order_id": order.id,
+                    "product_id": line.product_id,
+                    "quantity": line.quantity,
+                    "price_per_unit": line.price_per_unit,
+                    "vat_rate": vat_rates[line.product_id],
+                }
+                for line in lines
+            ],
+        ).all()
+        set_committed_value(order, "items", sorted(items, key=lambda item: item.id))
+
+        reserve_stock(
+            self.db,
+            ((line.product_id, line.quantity) for line in lines),
+            order_id=order.id,
+        )
+        record_order_created(self.db, order)
+        return order
+
+    def issue_invoice(
+        self,
+        order: Order,
+        payment_due_date: date | None,
+        payment_method: PaymentMethod,
+        paid: bool = False,
+    ) -> str:
+        """
+        Gives an order the next invoice number and its payment terms, and
+        queues the rendering of its PDF for the invoice archive.
+        """
+        if order.invoice_number:
+            raise ValueError(f"Order #{order.id} is already invoiced.")
+        order.invoice_number = get_next_invoice_number(self.db)
+        order.payment_due_date = (
+            datetime.combine(payment_due_date, datetime.min.time())
+            if payment_due_date
+            else None
+        )
+        order.payment_method = payment_method
+        if paid:
+            order.payment_status = PaymentStatus.PAID
+        record_order_invoiced(self.db, order)
+        # The final PDF is rendered once, in the background, into the archive.
+        self.db.flush()
+        if self.db.scalars(select(CompanyProfile.id).limit(1)).first() is not None:
+            enqueue_render(self.db, order.id)
+        return order.invoice_number
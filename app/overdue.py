@@ -0,0 +1,108 @@
+# app/overdue.py
+
+import argparse
+import logging
+import os
+import threading
+from datetime import datetime
+from functools import cache
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app.database import session_scope
+from app.models import Order, PaymentStatus
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps in the Streamlit process; 0 disables the thread.
+OVERDUE_SWEEP_INTERVAL = float(os.getenv("OVERDUE_SWEEP_INTERVAL", "3600"))
+
+
+def mark_overdue_orders(db: Session, now: datetime | None = None) -> int:
+    """
+    Flips every unpaid order whose payment due date has passed to OVERDUE with
+    a single UPDATE and returns the number of orders changed. An order is
+    overdue from the day after its due date. Does not commit.
+    """
+    today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    # Rendered as a literal, so the planner can match the partial index
+    # ix_orders_unpaid_due_date on both PostgreSQL and SQLite.
+    unpaid = bindparam(
+        "unpaid",
+        PaymentStatus.UNPAID,
+        type_=Order.__table__.c.payment_status.type,
+        literal_execute=True,
+    )
+    result = db.execute(
+        update(Order)
+        .where(Order.payment_status == unpaid, Order.payment_due_date < today)
+        .values(payment_status=PaymentStatus.OVERDUE)
+        .execution_options(synchronize_session=False)
+    )
+    # Orders already loaded in this session reread their status when next used.
+    for order in db.identity_map.values():
+        if isinstance(order, Order):
+            db.expire(order, ["payment_status"])
+    return result.rowcount  # type: ignore[attr-defined]
+
+
+def sweep_overdue_orders() -> int:
+    """Runs one sweep in its own transaction and logs the outcome."""
+    with session_scope() as db:
+        changed = mark_overdue_orders(db)
+        db.commit()
+    logger.info("Marked %d order(s) as overdue.", changed)
+    return changed
+
+
+def _sweep_forever(interval: float, stop: threading.Event) -> None:
+    while True:
+        try:
+            sweep_overdue_orders()
+        except Exception:  # the next sweep retries; the app keeps running
+            logger.exception("Overdue sweep failed.")
+        if stop.wait(interval):
+            return
+
+
+@cache
+def start_overdue_sweeper(
+    interval: float = OVERDUE_SWEEP_INTERVAL,
+) -> threading.Event | None:
+    """
+    Starts the process-wide background sweeper once, so page reruns never wait
+    for it. Returns an event that stops the thread, or None when disabled.
+    """
+    if interval <= 0:
+        return None
+    stop = threading.Event()
+    threading.Thread(
+        target=_sweep_forever,
+        args=(interval, stop),
+        name="overdue-sweeper",
+        daemon=True,
+    ).start()
+    return stop
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Mark unpaid orders past their payment due date as overdue."
+    )
+    parser.add_argument(
+        "--every",
+        type=float,
+        metavar="SECONDS",
+        help="keep running and sweep at this interval (default: sweep once)",
+    )
+    args = parser.parse_args()
+    if args.every:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+        _sweep_forever(args.every, threading.Event())
+    else:
+        print(f"Marked {sweep_overdue_orders()} order(s) as overdue.")
+
+
+if __name__ == "__main__":
+    main()
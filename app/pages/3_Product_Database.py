@@ -2,79 +2,197 @@
 
 import pandas as pd
 import streamlit as st
-from sqlalchemy.orm import Session
 
-from app.database import SessionLocal
+from app.bootstrap import prepare_page
+from app.database import session_scope
+from app.importers import ImportReport, import_products
+from app.instrumentation import instrumented_rerun
+from app.inventory import adjust_stock, receive_stock, record_opening_stock
 from app.models import Product, ProductUnit
-from app.style_loader import load_css
+from app.product_search import search_products
+from app.reference_cache import get_recent_products
 from app.utils import get_next_product_index  # <-- NEW IMPORT
 
-load_css()
-db: Session = SessionLocal()
+prepare_page()
+with (
+    instrumented_rerun("Product Database"),
+    session_scope() as db,
+    session_scope(read_only=True) as reader,
+):
+    st.header("Product Database Management")
+    tab1, tab2, tab3, tab4 = st.tabs(
+        ["Product List", "Add New Product", "Bulk Import", "Stock"]
+    )
 
-st.header("Product Database Management")
-tab1, tab2 = st.tabs(["Product List", "Add New Product"])
+    with tab1:
+        st.subheader("Search and Filter Products")
+        col1, col2, col3 = st.columns([3, 2, 1])
+        with col1:
+            search_name = st.text_input("Search by Product Name")
+        with col2:
+            search_index = st.text_input("Search by Product Index")
+        with col3:
+            result_limit = st.selectbox("Show Top", options=[20, 50, 100], index=0)
+        if search_index and search_index.isdigit():
+            products = (
+                reader.query(Product)
+                .filter(Product.product_index == int(search_index))
+                .all()
+            )
+        elif search_name:
+            products = search_products(reader, search_name, limit=result_limit)
+        else:
+            products = get_recent_products(reader, result_limit)
+            st.caption(f"Showing the {result_limit} most recently added products.")
+        st.subheader("Product List")
+        if not products:
+            st.warning("No products found matching your criteria.")
+        else:
+            product_data = [
+                {
+                    "Product Name": p.name,
+                    "Index": p.product_index,
+                    "Unit": p.unit.value,
+                    "Stock": p.stock,
+                    "VAT Rate (%)": p.vat_rate,
+                }
+                for p in products
+            ]
+            st.dataframe(
+                pd.DataFrame(product_data), use_container_width=True, hide_index=True
+            )
 
-with tab1:
-    st.subheader("Search and Filter Products")
-    search_name = st.text_input("Search by Product Name")
-    search_index = st.text_input("Search by Product Index")
-    query = db.query(Product)
-    if search_name:
-        query = query.filter(Product.name.ilike(f"%{search_name}%"))
-    if search_index and search_index.isdigit():
-        query = query.filter(Product.product_index == int(search_index))
-    products = query.all()
-    st.subheader("Product List")
-    if not products:
-        st.warning("No products found matching your criteria.")
-    else:
-        product_data = [
-            {
-                "Product Name": p.name,
-                "Index": p.product_index,
-                "Unit": p.unit.value,
-                "Stock": p.stock,
-                "VAT Rate (%)": p.vat_rate,
-            }
-            for p in products
-        ]
-        st.dataframe(
-            pd.DataFrame(product_data), use_container_width=True, hide_index=True
-        )
+    with tab2:
+        st.subheader("Add a New Product")
+        with st.form("new_product_form", clear_on_submit=True):
+            st.info("A unique Product Index will be assigned automatically.")
+            name = st.text_input("Product Name")
+            unit = st.selectbox("Unit", options=[u.value for u in ProductUnit])
+            stock = st.number_input("Initial Stock", min_value=0.0, step=1.0)
+            vat_rate = st.number_input(
+                "VAT Rate (%)", min_value=0.0, max_value=100.0, value=23.0, step=1.0
+            )
+
+            # REMOVED: product_index_str text input
+
+            if st.form_submit_button("Add Product"):
+                if not name:
+                    st.error("Product Name is required.")
+                else:
+                    # NEW: Get the next available index automatically
+                    new_index = get_next_product_index(db)
+
+                    new_product = Product(
+                        name=name,
+                        product_index=new_index,
+                        unit=ProductUnit(unit),
+                        stock=stock,
+                        vat_rate=vat_rate,
+                    )
+                    db.add(new_product)
+                    db.flush()
+                    record_opening_stock(db, [new_index])
+                    db.commit()
+                    st.success(
+                        f"Product '{name}' with index {new_index} added successfully!"
+                    )
+                    st.rerun()
 
-with tab2:
-    st.subheader("Add a New Product")
-    with st.form("new_product_form", clear_on_submit=True):
-        st.info("A unique Product Index will be assigned automatically.")
-        name = st.text_input("Product Name")
-        unit = st.selectbox("Unit", options=[u.value for u in ProductUnit])
-        stock = st.number_input("Initial Stock", min_value=0.0, step=1.0)
-        vat_rate = st.number_input(
-            "VAT Rate (%)", min_value=0.0, max_value=100.0, value=23.0, step=1.0
+    with tab3:
+        st.subheader("Import Products from a File")
+        st.info(
+            "Upload a CSV or XLSX file with the columns `name` and `unit` and, "
+            "optionally, `stock` and `vat_rate`. Product indexes are assigned "
+            "automatically. Valid rows are saved even if some rows fail."
         )
+        uploaded = st.file_uploader("Product File", type=["csv", "xlsx"])
+        if uploaded and st.button("Import Products"):
+            progress_text = st.empty()
 
-        # REMOVED: product_index_str text input
+            def show_imported(report: ImportReport) -> None:
+                progress_text.text(f"Imported {report.imported} products so far...")
 
-        if st.form_submit_button("Add Product"):
-            if not name:
-                st.error("Product Name is required.")
+            try:
+                report = import_products(
+                    db,
+                    uploaded,
+                    uploaded.name,
+                    progress=show_imported,
+                )
+            except ValueError as e:
+                st.error(str(e))
             else:
-                # NEW: Get the next available index automatically
-                new_index = get_next_product_index(db)
+                st.success(f"Imported {report.imported} products.")
+                if report.errors:
+                    st.warning(f"{len(report.errors)} rows were rejected.")
+                    st.dataframe(
+                        pd.DataFrame(
+                            [
+                                {"Row": error.row, "Error": error.message}
+                                for error in report.errors
+                            ]
+                        ),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
 
-                new_product = Product(
-                    name=name,
-                    product_index=new_index,
-                    unit=ProductUnit(unit),
-                    stock=stock,
-                    vat_rate=vat_rate,
+    with tab4:
+        st.subheader("Receive and Count Stock")
+        st.info(
+            "Every change is recorded in the inventory ledger: deliveries as "
+            "receipts, stocktake corrections as adjustments."
+        )
+        col1, col2 = st.columns(2)
+        with col1, st.form("receive_stock_form", clear_on_submit=True):
+            st.markdown("**Receive Stock**")
+            receipt_index = st.number_input("Product Index", min_value=1, step=1)
+            received = st.number_input("Quantity Received", min_value=0.0, step=1.0)
+            receipt_note = st.text_input("Note", placeholder="e.g. delivery number")
+            if st.form_submit_button("Receive"):
+                product = (
+                    db.query(Product)
+                    .filter(Product.product_index == receipt_index)
+                    .first()
                 )
-                db.add(new_product)
-                db.commit()
-                st.success(
-                    f"Product '{name}' with index {new_index} added successfully!"
+                if product is None:
+                    st.error(f"No product with index {receipt_index}.")
+                else:
+                    try:
+                        receive_stock(
+                            db, [(product.id, received)], note=receipt_note or None
+                        )
+                    except ValueError as e:
+                        db.rollback()
+                        st.error(str(e))
+                    else:
+                        db.commit()
+                        st.success(
+                            f"Received {received:g} {product.unit.value} of "
+                            f"'{product.name}'; stock is now {product.stock:g}."
+                        )
+        with col2, st.form("count_stock_form", clear_on_submit=True):
+            st.markdown("**Stock Count**")
+            count_index = st.number_input(
+                "Product Index", min_value=1, step=1, key="count_index"
+            )
+            counted = st.number_input("Counted Stock", min_value=0.0, step=1.0)
+            count_note = st.text_input(
+                "Note", placeholder="e.g. annual stocktake", key="count_note"
+            )
+            if st.form_submit_button("Set Stock"):
+                product = (
+                    db.query(Product)
+                    .filter(Product.product_index == count_index)
+                    .first()
                 )
-                st.rerun()
-
-db.close()
+                if product is None:
+                    st.error(f"No product with index {count_index}.")
+                else:
+                    difference = adjust_stock(
+                        db, product.id, counted, note=count_note or None
+                    )
+                    db.commit()
+                    st.success(
+                        f"Stock of '{product.name}' set to {counted:g} "
+                        f"({difference:+g} {product.unit.value})."
+                    )
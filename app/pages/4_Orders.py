@@ -1,312 +1,609 @@
 # app/pages/4_Orders.py (FINAL, SIMPLIFIED VERSION)
 
-from datetime import datetime, timedelta
+import io
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import IO, Any
 
 import pandas as pd
 import streamlit as st
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
 
-from app.database import SessionLocal
+from app.bootstrap import prepare_page
+from app.database import mark_written, session_scope
+from app.instrumentation import instrumented_rerun
+from app.inventory import InsufficientStockError
+from app.invoice_archive import open_invoice_document
+from app.invoice_export import (
+    ExportProgress,
+    export_invoices_zip,
+    select_invoices_for_export,
+)
 from app.models import (
-    Client,
-    CompanyProfile,
+    InvoiceDocument,
     Order,
-    OrderItem,
     PaymentMethod,
     PaymentStatus,
     Product,
     ProductUnit,
+    RenderJob,
+    RenderJobStatus,
 )
-from app.style_loader import load_css
-from app.utils import generate_invoice_pdf, get_next_invoice_number
-
-load_css()
-db: Session = SessionLocal()
-
-st.header("Order Management")
-tab1, tab2 = st.tabs(["Order List", "Create New Order"])
-
-with tab1:
-    st.subheader("Existing Orders")
-    clients = db.query(Client).all()
-    client_display_names_filter = ["All"] + [c.display_name for c in clients]
-    selected_client_filter = st.selectbox(
-        "Filter by Client", options=client_display_names_filter
-    )
-    query = (
-        db.query(Order)
-        .options(
-            joinedload(Order.client),
-            joinedload(Order.items).joinedload(OrderItem.product),
+from app.order_export import export_orders
+from app.order_queries import OrderFilters, fetch_order_page
+from app.order_service import OrderLine, OrderService, OrderValidationError
+from app.reference_cache import get_clients, get_company_profile
+from app.render_jobs import enqueue_render
+from app.utils import invoice_file_name
+
+
+@st.fragment(run_every=2)
+def render_job_status(order_id: int, job_id: int) -> None:
+    """Polls a queued invoice render and reruns the page once it is archived."""
+    with session_scope() as db:
+        job = db.get(RenderJob, job_id)
+        if job is None:
+            error = "The render job no longer exists."
+        elif job.status == RenderJobStatus.FAILED:
+            error = job.error or "Unknown error."
+        elif job.status == RenderJobStatus.DONE:
+            # The worker wrote the document; read it back from the primary.
+            mark_written()
+            error = None
+        elif job.status == RenderJobStatus.RUNNING:
+            st.info("⏳ Rendering invoice...")
+            return
+        else:
+            st.info(f"⏳ Invoice queued for rendering (attempt {job.attempts + 1}).")
+            return
+    st.session_state.pop(f"render_job_{order_id}", None)
+    if error:
+        st.session_state[f"render_error_{order_id}"] = error
+    st.rerun()
+
+
+# Exports larger than this spill from memory to an anonymous temporary file.
+EXPORT_SPOOL_BYTES = 16 * 1024 * 1024
+
+
+def keep_export(key: str, export_file: IO[Any]) -> None:
+    """Keeps an export for download, closing (and so deleting) the one it replaces."""
+    previous = st.session_state.get(key)
+    if previous is not None:
+        previous.close()
+    st.session_state[key] = export_file
+
+
+def export_download(export_file: IO[Any]) -> io.BufferedReader:
+    """
+    A kept export as a file st.download_button reads from the start. It takes
+    open files but not a SpooledTemporaryFile, so the export is moved to disk
+    if still spooled and read through its descriptor.
+    """
+    descriptor = export_file.fileno()  # rolls a spooled export over to disk
+    export_file.flush()
+    return open(descriptor, "rb", closefd=False)
+
+
+def date_range_input(label: str) -> tuple[datetime | None, datetime | None]:
+    """An optional date range picker; no range (all dates) until both ends are set."""
+    picked = st.date_input(label, value=[])
+    if isinstance(picked, tuple) and len(picked) == 2:
+        return (
+            datetime.combine(picked[0], datetime.min.time()),
+            datetime.combine(picked[1], datetime.max.time()),
         )
-        .order_by(Order.order_date.desc())
-    )
-    if selected_client_filter != "All":
+    return None, None
+
+
+prepare_page()
+# Listing and exports read through `reader` (the replica, if configured);
+# everything that writes goes through `db` on the primary.
+with (
+    instrumented_rerun("Orders"),
+    session_scope() as db,
+    session_scope(read_only=True) as reader,
+):
+    st.header("Order Management")
+    tab1, tab2, tab3 = st.tabs(["Order List", "Create New Order", "Batch Export"])
+    # Served from the reference cache until a commit changes these tables.
+    clients = get_clients(reader)
+    company = get_company_profile(db)
+
+    with tab1:
+        st.subheader("Existing Orders")
+        client_display_names_filter = ["All"] + [c.display_name for c in clients]
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            selected_client_filter = st.selectbox(
+                "Filter by Client", options=client_display_names_filter
+            )
+            invoice_prefix_filter = st.text_input("Invoice Number Starts With")
+        with col2:
+            status_filter = st.selectbox(
+                "Payment Status", options=["All"] + [s.value for s in PaymentStatus]
+            )
+            method_filter = st.selectbox(
+                "Payment Method", options=["All"] + [m.value for m in PaymentMethod]
+            )
+        with col3:
+            date_from, date_to = date_range_input("Order Date Range")
+            page_size = st.selectbox(
+                "Orders per Page", options=[10, 25, 50, 100], index=1
+            )
+
         selected_client_obj = next(
             (c for c in clients if c.display_name == selected_client_filter), None
         )
-        if selected_client_obj:
-            query = query.filter(Order.client_id == selected_client_obj.id)
-
-    orders = query.all()
-
-    if not orders:
-        st.info("No orders found matching the criteria.")
-    else:
-        for order in orders:
-            status = order.payment_status.value
-            color = (
-                "green"
-                if status == "Paid"
-                else "orange"
-                if status == "Unpaid"
-                else "red"
-            )
-            invoice_info = (
-                f"| Invoice: {order.invoice_number}" if order.invoice_number else ""
-            )
-            expander_title = (
-                f"Order #{order.id} - {order.client.display_name} {invoice_info} | "
-                f"Status: :{color}[{status}]"
+        filters = OrderFilters(
+            date_from=date_from,
+            date_to=date_to,
+            payment_status=PaymentStatus(status_filter)
+            if status_filter != "All"
+            else None,
+            payment_method=PaymentMethod(method_filter)
+            if method_filter != "All"
+            else None,
+            invoice_prefix=invoice_prefix_filter or None,
+            client_id=selected_client_obj.id if selected_client_obj else None,
+        )
+
+        # Cursors of the pages visited so far; reset whenever the filters change.
+        if st.session_state.get("order_list_filters") != (filters, page_size):
+            st.session_state.order_list_filters = (filters, page_size)
+            st.session_state.order_page_cursors = [None]
+        page_cursors = st.session_state.order_page_cursors
+        order_page = fetch_order_page(
+            reader, filters, page_size=page_size, after=page_cursors[-1]
+        )
+        orders = order_page.orders
+        # Archived PDFs of the listed invoices, in one query.
+        documents = {
+            document.order_id: document
+            for document in reader.scalars(
+                select(InvoiceDocument).where(
+                    InvoiceDocument.order_id.in_([order.id for order in orders])
+                )
             )
+        }
 
-            with st.expander(expander_title):
-                st.write("**Financial Details:**")
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.text_input(
-                        "Invoice Number",
-                        value=order.invoice_number or "Not generated",
-                        disabled=True,
-                        key=f"inv_num_{order.id}",
-                    )
-                with col2:
-                    st.text_input(
-                        "Order Date",
-                        value=order.order_date.strftime("%Y-%m-%d"),
-                        disabled=True,
-                        key=f"ord_date_{order.id}",
-                    )
-                with col3:
-                    due_date_str = (
-                        order.payment_due_date.strftime("%Y-%m-%d")
-                        if order.payment_due_date
-                        else "Not set"
-                    )
-                    st.text_input(
-                        "Payment Due Date",
-                        value=due_date_str,
-                        disabled=True,
-                        key=f"due_date_{order.id}",
-                    )
-                with col4:
-                    st.text_input(
-                        "Payment Method",
-                        value=order.payment_method.value
-                        if order.payment_method
-                        else "Not set",
-                        disabled=True,
-                        key=f"pay_method_{order.id}",
+        if not orders:
+            st.info("No orders found matching the criteria.")
+        else:
+            for order in orders:
+                status = order.payment_status.value
+                color = (
+                    "green"
+                    if status == "Paid"
+                    else "orange"
+                    if status == "Unpaid"
+                    else "red"
+                )
+                invoice_info = (
+                    f"| Invoice: {order.invoice_number}" if order.invoice_number else ""
+                )
+                expander_title = (
+                    f"Order #{order.id} - {order.client.display_name} {invoice_info} | "
+                    f"Gross: {order.total_gross:.2f} PLN | Status: :{color}[{status}]"
+                )
+
+                with st.expander(expander_title):
+                    st.write("**Financial Details:**")
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.text_input(
+                            "Invoice Number",
+                            value=order.invoice_number or "Not generated",
+                            disabled=True,
+                            key=f"inv_num_{order.id}",
+                        )
+                    with col2:
+                        st.text_input(
+                            "Order Date",
+                            value=order.order_date.strftime("%Y-%m-%d"),
+                            disabled=True,
+                            key=f"ord_date_{order.id}",
+                        )
+                    with col3:
+                        due_date_str = (
+                            order.payment_due_date.strftime("%Y-%m-%d")
+                            if order.payment_due_date
+                            else "Not set"
+                        )
+                        st.text_input(
+                            "Payment Due Date",
+                            value=due_date_str,
+                            disabled=True,
+                            key=f"due_date_{order.id}",
+                        )
+                    with col4:
+                        st.text_input(
+                            "Payment Method",
+                            value=order.payment_method.value
+                            if order.payment_method
+                            else "Not set",
+                            disabled=True,
+                            key=f"pay_method_{order.id}",
+                        )
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Total Net", f"{order.total_net:.2f} PLN")
+                    col2.metric("Total VAT", f"{order.total_vat:.2f} PLN")
+                    col3.metric("Total Gross", f"{order.total_gross:.2f} PLN")
+
+                    st.write("**Items in this order:**")
+                    items_data = [
+                        {
+                            "Product": item.product.name,
+                            "Quantity": item.quantity,
+                            "Unit": item.product.unit.value,
+                            "Price/Unit": f"{item.price_per_unit:.2f}",
+                            "VAT (%)": item.vat_rate,
+                            "Total": f"{(item.quantity * item.price_per_unit):.2f}",
+                        }
+                        for item in order.items
+                    ]
+                    st.dataframe(
+                        pd.DataFrame(items_data),
+                        use_container_width=True,
+                        hide_index=True,
                     )
 
-                st.write("**Items in this order:**")
-                items_data = [
-                    {
-                        "Product": item.product.name,
-                        "Quantity": item.quantity,
-                        "Unit": item.product.unit.value,
-                        "Price/Unit": f"{item.price_per_unit:.2f}",
-                        "VAT (%)": item.vat_rate,
-                        "Total": f"{(item.quantity * item.price_per_unit):.2f}",
-                    }
-                    for item in order.items
-                ]
-                st.dataframe(
-                    pd.DataFrame(items_data), use_container_width=True, hide_index=True
-                )
+                    st.markdown("---")
+                    st.write("**Actions**")
 
-                st.markdown("---")
-                st.write("**Actions**")
-
-                if order.invoice_number:
-                    st.success(f"Invoice {order.invoice_number} has been generated.")
-                    company = db.query(CompanyProfile).first()
-                    if company:
-                        pdf_bytes = generate_invoice_pdf(order, company)
-                        st.download_button(
-                            label="📄 Download Invoice PDF",
-                            data=pdf_bytes,
-                            file_name=f"Faktura_{order.invoice_number.replace('/', '-')}.pdf",
-                            mime="application/pdf",
-                            key=f"pdf_{order.id}",
+                    if order.invoice_number:
+                        st.success(
+                            f"Invoice {order.invoice_number} has been generated."
                         )
+                        document = documents.get(order.id)
+                        job_key = f"render_job_{order.id}"
+                        if error := st.session_state.pop(
+                            f"render_error_{order.id}", None
+                        ):
+                            st.error(f"Rendering the invoice failed: {error}")
+                        if document is not None:
+                            # Issued invoices are streamed from the archive, never re-rendered.
+                            try:
+                                with open_invoice_document(document) as pdf_file:
+                                    st.download_button(
+                                        label="📄 Download Invoice PDF",
+                                        data=pdf_file,
+                                        file_name=invoice_file_name(
+                                            order.invoice_number
+                                        ),
+                                        mime="application/pdf",
+                                        key=f"pdf_{order.id}",
+                                    )
+                            except FileNotFoundError:
+                                st.error(
+                                    "The archived PDF of this invoice is missing. "
+                                    "Run `python -m app.invoice_archive verify`."
+                                )
+                        elif not company:
+                            st.warning(
+                                "Cannot generate PDF. Please complete company profile first."
+                            )
+                        elif job_key in st.session_state:
+                            render_job_status(order.id, st.session_state[job_key])
+                        elif st.button(
+                            "🖨️ Prepare Invoice PDF", key=f"prepare_pdf_{order.id}"
+                        ):
+                            # Rendered by app/render_worker.py, not this rerun; reuses
+                            # the job queued when the invoice was issued.
+                            job = enqueue_render(db, order.id)
+                            db.commit()
+                            st.session_state[job_key] = job.id
+                            st.rerun()
                     else:
-                        st.warning(
-                            "Cannot generate PDF. Please complete company profile first."
-                        )
-                else:
-                    # --- NEW INTERACTIVE FORM FOR INVOICE GENERATION ---
-                    with st.form(key=f"invoice_form_{order.id}"):
-                        st.write("Configure and generate the invoice:")
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            due_date = st.date_input(
-                                "Payment Due Date",
-                                value=datetime.now() + timedelta(days=14),
+                        # --- NEW INTERACTIVE FORM FOR INVOICE GENERATION ---
+                        with st.form(key=f"invoice_form_{order.id}"):
+                            st.write("Configure and generate the invoice:")
+                            col1, col2, col3 = st.columns(3)
+                            with col1:
+                                due_date = st.date_input(
+                                    "Payment Due Date",
+                                    value=datetime.now() + timedelta(days=14),
+                                )
+                            with col2:
+                                payment_method_str = st.selectbox(
+                                    "Payment Method",
+                                    options=[pm.value for pm in PaymentMethod],
+                                    index=0,
+                                )
+                            with col3:
+                                is_paid = st.checkbox("Mark as Paid?", value=False)
+
+                            generate_button = st.form_submit_button(
+                                "Confirm and Generate Invoice"
                             )
-                        with col2:
-                            payment_method_str = st.selectbox(
-                                "Payment Method",
-                                options=[pm.value for pm in PaymentMethod],
-                                index=0,
+
+                            if generate_button:
+                                invoice_number = OrderService(db).issue_invoice(
+                                    db.get_one(Order, order.id),
+                                    payment_due_date=due_date,
+                                    payment_method=PaymentMethod(payment_method_str),
+                                    paid=is_paid,
+                                )
+                                db.commit()
+                                st.toast(
+                                    f"Invoice {invoice_number} generated!",
+                                    icon="🎉",
+                                )
+                                st.rerun()
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("⬅️ Previous", disabled=len(page_cursors) == 1):
+                page_cursors.pop()
+                st.rerun()
+        with col2:
+            st.caption(f"Page {len(page_cursors)}")
+        with col3:
+            if st.button("Next ➡️", disabled=order_page.next_cursor is None):
+                page_cursors.append(order_page.next_cursor)
+                st.rerun()
+
+    with tab2:
+        # --- Session State Initialization ---
+        if "cart" not in st.session_state:
+            st.session_state.cart = []
+        if "product_found_for_cart" not in st.session_state:
+            st.session_state.product_found_for_cart = None
+
+        # --- Main Form for Creating the Final Order ---
+        with st.form("order_form"):
+            st.subheader("Order Details")
+            if not clients:
+                st.error("Cannot create an order. Please add a client first.")
+                st.stop()
+
+            client_display_names = [c.display_name for c in clients]
+            selected_client_name = st.selectbox(
+                "Select Client for New Order", options=client_display_names
+            )
+
+            st.subheader("Order Items (Cart)")
+            if not st.session_state.cart:
+                st.info("Your cart is empty. Add products below.")
+            else:
+                cart_df = pd.DataFrame(st.session_state.cart)
+                st.dataframe(cart_df, use_container_width=True, hide_index=True)
+
+            # The final submit button for the entire order
+            submitted_order = st.form_submit_button("Create Final Order")
+
+        # --- Logic for handling the final order submission ---
+        # This logic is now outside the form, but uses variables defined within it.
+        # This is safe because Streamlit processes the form first, then re-runs the script.
+        if submitted_order:
+            if not st.session_state.cart:
+                st.error("Cannot create an empty order.")
+                st.stop()
+
+            client_obj = next(
+                (c for c in clients if c.display_name == selected_client_name), None
+            )
+            if client_obj:
+                try:
+                    new_order = OrderService(db).create_order(
+                        client_obj.id,
+                        [
+                            OrderLine(
+                                product_id=item["Product ID"],
+                                quantity=item["Quantity"],
+                                price_per_unit=item["Price per Unit"],
                             )
-                        with col3:
-                            is_paid = st.checkbox("Mark as Paid?", value=False)
+                            for item in st.session_state.cart
+                        ],
+                    )
+                except (InsufficientStockError, OrderValidationError) as e:
+                    db.rollback()
+                    st.error(f"Order was not created. {e}")
+                    st.stop()
+                db.commit()
+                st.session_state.cart = []
+                st.success(
+                    f"Order #{new_order.id} for {client_obj.display_name} has been created!"
+                )
+                st.rerun()
+
+        # --- Interactive Section for Adding Items to Cart (Separate from the main form) ---
+        st.markdown("---")
+        st.subheader("Add Product to Order")
+
+        col1, col2 = st.columns([1, 2])
 
-                        generate_button = st.form_submit_button(
-                            "Confirm and Generate Invoice"
+        with col1:
+            # A mini-form just for finding a product
+            with st.form("find_product_form", clear_on_submit=True):
+                product_index_str = st.text_input("Enter Product Index / SKU")
+                if st.form_submit_button("Find Product"):
+                    if product_index_str and product_index_str.isdigit():
+                        product = (
+                            db.query(Product)
+                            .filter(Product.product_index == int(product_index_str))
+                            .first()
                         )
+                        st.session_state.product_found_for_cart = product
+                        if not product:
+                            st.error("Product not found!")
+                        # Rerun to update the UI immediately after search
+                        st.rerun()
+                    else:
+                        st.warning("Please enter a valid numeric index.")
 
-                        if generate_button:
-                            next_inv_num = get_next_invoice_number(db)
-                            order.invoice_number = next_inv_num
-                            order.payment_due_date = due_date
-                            order.payment_method = PaymentMethod(payment_method_str)
-                            if is_paid:
-                                order.payment_status = PaymentStatus.PAID
+        # Display the "add to cart" form only if a product has been found
+        product_to_add = st.session_state.get("product_found_for_cart")
+        if product_to_add:
+            with col2:
+                st.success(
+                    f"Found: **{product_to_add.name}** (Unit: {product_to_add.unit.value}, "
+                    f"In Stock: {product_to_add.stock:g})"
+                )
 
-                            db.commit()
-                            st.toast(
-                                f"Invoice {order.invoice_number} generated!", icon="🎉"
+                # A second mini-form just for adding the found product to the cart
+                with st.form("add_to_cart_form"):
+                    quantity = st.number_input(
+                        "Quantity", min_value=0.01, step=0.01, format="%.2f"
+                    )
+                    price_per_unit = st.number_input(
+                        "Price per Unit (Net)", min_value=0.01, value=0.01, step=0.01
+                    )
+
+                    if st.form_submit_button("Add to Cart"):
+                        is_integer_unit = product_to_add.unit in [
+                            ProductUnit.PCS,
+                            ProductUnit.SET,
+                        ]
+                        if is_integer_unit and (quantity % 1 != 0):
+                            st.error(
+                                f"Quantity for unit '{product_to_add.unit.value}' must be a whole number."
+                            )
+                        else:
+                            st.session_state.cart.append(
+                                {
+                                    "Product ID": product_to_add.id,
+                                    "Product Name": product_to_add.name,
+                                    "Quantity": quantity,
+                                    "Price per Unit": price_per_unit,
+                                    "Unit": product_to_add.unit.value,
+                                    "VAT Rate (%)": product_to_add.vat_rate,
+                                }
+                            )
+                            st.session_state.product_found_for_cart = (
+                                None  # Clear after adding
                             )
                             st.rerun()
 
-
-with tab2:
-    # --- Session State Initialization ---
-    if "cart" not in st.session_state:
-        st.session_state.cart = []
-    if "product_found_for_cart" not in st.session_state:
-        st.session_state.product_found_for_cart = None
-
-    # --- Main Form for Creating the Final Order ---
-    with st.form("order_form"):
-        st.subheader("Order Details")
-        clients = db.query(Client).all()
-        if not clients:
-            st.error("Cannot create an order. Please add a client first.")
-            st.stop()
-
-        client_display_names = [c.display_name for c in clients]
-        selected_client_name = st.selectbox(
-            "Select Client for New Order", options=client_display_names
+    with tab3:
+        st.subheader("Export Invoices to ZIP")
+        export_mode = st.radio(
+            "Select invoices by",
+            options=["Date Range", "Invoice Number Range"],
+            horizontal=True,
         )
+        with st.form("batch_export_form"):
+            export_from: date | None = None
+            export_to: date | None = None
+            first_number: str | None = None
+            last_number: str | None = None
+            if export_mode == "Date Range":
+                today = datetime.now().date()
+                col1, col2 = st.columns(2)
+                with col1:
+                    export_from = st.date_input("From", value=today.replace(day=1))
+                with col2:
+                    export_to = st.date_input("To (inclusive)", value=today)
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    first_number = st.text_input(
+                        "First Invoice Number", placeholder="FV/1/1/2025"
+                    )
+                with col2:
+                    last_number = st.text_input(
+                        "Last Invoice Number", placeholder="FV/99/1/2025"
+                    )
 
-        st.subheader("Order Items (Cart)")
-        if not st.session_state.cart:
-            st.info("Your cart is empty. Add products below.")
-        else:
-            cart_df = pd.DataFrame(st.session_state.cart)
-            st.dataframe(cart_df, use_container_width=True, hide_index=True)
-
-        # The final submit button for the entire order
-        submitted_order = st.form_submit_button("Create Final Order")
-
-    # --- Logic for handling the final order submission ---
-    # This logic is now outside the form, but uses variables defined within it.
-    # This is safe because Streamlit processes the form first, then re-runs the script.
-    if submitted_order:
-        if not st.session_state.cart:
-            st.error("Cannot create an empty order.")
-            st.stop()
-
-        client_obj = next(
-            (c for c in clients if c.display_name == selected_client_name), None
-        )
-        if client_obj:
-            new_order = Order(client_id=client_obj.id)
-            db.add(new_order)
-            db.flush()
-            for item in st.session_state.cart:
-                order_item = OrderItem(
-                    order_id=new_order.id,
-                    product_id=item["Product ID"],
-                    quantity=item["Quantity"],
-                    price_per_unit=item["Price per Unit"],
-                    vat_rate=item["VAT Rate (%)"],
-                )
-                db.add(order_item)
-            db.commit()
-            st.session_state.cart = []
-            st.success(
-                f"Order #{new_order.id} for {client_obj.display_name} has been created!"
-            )
-            st.rerun()
-
-    # --- Interactive Section for Adding Items to Cart (Separate from the main form) ---
-    st.markdown("---")
-    st.subheader("Add Product to Order")
-
-    col1, col2 = st.columns([1, 2])
-
-    with col1:
-        # A mini-form just for finding a product
-        with st.form("find_product_form", clear_on_submit=True):
-            product_index_str = st.text_input("Enter Product Index / SKU")
-            if st.form_submit_button("Find Product"):
-                if product_index_str and product_index_str.isdigit():
-                    product = (
-                        db.query(Product)
-                        .filter(Product.product_index == int(product_index_str))
-                        .first()
+            if st.form_submit_button("Export Invoices"):
+                selected_invoices: list[tuple[int, str]] = []
+                try:
+                    selected_invoices = select_invoices_for_export(
+                        reader,
+                        date_from=datetime.combine(export_from, datetime.min.time())
+                        if export_from
+                        else None,
+                        date_to=datetime.combine(export_to, datetime.max.time())
+                        if export_to
+                        else None,
+                        first_number=first_number or None,
+                        last_number=last_number or None,
                     )
-                    st.session_state.product_found_for_cart = product
-                    if not product:
-                        st.error("Product not found!")
-                    # Rerun to update the UI immediately after search
-                    st.rerun()
+                except ValueError as e:
+                    st.error(str(e))
+
+                if not selected_invoices:
+                    st.info("No invoices to export for the selected range.")
                 else:
-                    st.warning("Please enter a valid numeric index.")
+                    progress_bar = st.progress(0.0, text="Rendering invoices...")
 
-    # Display the "add to cart" form only if a product has been found
-    product_to_add = st.session_state.get("product_found_for_cart")
-    if product_to_add:
-        with col2:
-            st.success(
-                f"Found: **{product_to_add.name}** (Unit: {product_to_add.unit.value})"
+                    def show_progress(p: ExportProgress) -> None:
+                        progress_bar.progress(
+                            p.done / p.total,
+                            text=f"Rendered {p.done} of {p.total} invoices",
+                        )
+
+                    zip_file = tempfile.SpooledTemporaryFile(
+                        max_size=EXPORT_SPOOL_BYTES
+                    )
+                    export_result = export_invoices_zip(
+                        [order_id for order_id, _ in selected_invoices],
+                        zip_file,
+                        progress=show_progress,
+                    )
+                    keep_export("invoice_export", zip_file)
+                    st.success(f"Exported {export_result.exported} invoices.")
+                    for order_id, error in export_result.failed:
+                        st.error(f"Order #{order_id} could not be exported: {error}")
+
+        invoice_export = st.session_state.get("invoice_export")
+        if invoice_export is not None:
+            st.download_button(
+                label="🗜️ Download ZIP",
+                data=export_download(invoice_export),
+                file_name="invoices.zip",
+                mime="application/zip",
+                key="invoice_export_zip",
+            )
+
+        st.divider()
+        st.subheader("Export Order History")
+        st.caption(
+            "One row per order item with client and product details, for "
+            "accounting. Large histories are streamed to the file in batches."
+        )
+        with st.form("order_history_export_form"):
+            history_format = st.radio(
+                "File Format", options=["csv", "parquet"], horizontal=True
             )
+            history_from, history_to = date_range_input("Order Date Range (optional)")
+            if st.form_submit_button("Export Order History"):
+                status_text = st.empty()
 
-            # A second mini-form just for adding the found product to the cart
-            with st.form("add_to_cart_form"):
-                quantity = st.number_input(
-                    "Quantity", min_value=0.01, step=0.01, format="%.2f"
+                def show_exported(done: int) -> None:
+                    status_text.text(f"Exported {done} rows...")
+
+                history_file: IO[Any] = (
+                    tempfile.SpooledTemporaryFile(
+                        max_size=EXPORT_SPOOL_BYTES,
+                        mode="w+",
+                        newline="",
+                        encoding="utf-8",
+                    )
+                    if history_format == "csv"
+                    else tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
                 )
-                price_per_unit = st.number_input(
-                    "Price per Unit (Net)", min_value=0.01, value=0.01, step=0.01
+                exported_rows = export_orders(
+                    reader,
+                    history_file,
+                    history_format,
+                    date_from=history_from,
+                    date_to=history_to,
+                    progress=show_exported,
                 )
+                keep_export("order_history_export", history_file)
+                st.session_state.order_history_format = history_format
+                st.success(f"Exported {exported_rows} rows.")
 
-                if st.form_submit_button("Add to Cart"):
-                    is_integer_unit = product_to_add.unit in [
-                        ProductUnit.PCS,
-                        ProductUnit.SET,
-                    ]
-                    if is_integer_unit and (quantity % 1 != 0):
-                        st.error(
-                            f"Quantity for unit '{product_to_add.unit.value}' must be a whole number."
-                        )
-                    else:
-                        st.session_state.cart.append(
-                            {
-                                "Product ID": product_to_add.id,
-                                "Product Name": product_to_add.name,
-                                "Quantity": quantity,
-                                "Price per Unit": price_per_unit,
-                                "Unit": product_to_add.unit.value,
-                                "VAT Rate (%)": product_to_add.vat_rate,
-                            }
-                        )
-                        st.session_state.product_found_for_cart = (
-                            None  # Clear after adding
-                        )
-                        st.rerun()
-db.close()
+        history_export = st.session_state.get("order_history_export")
+        if history_export is not None:
+            history_format = st.session_state.order_history_format
+            st.download_button(
+                label="📄 Download Order History",
+                data=export_download(history_export),
+                file_name=f"orders.{history_format}",
+                mime="text/csv"
+                if history_format == "csv"
+                else "application/vnd.apache.parquet",
+                key="order_history_download",
+            )
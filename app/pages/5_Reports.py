@@ -0,0 +1,119 @@
+# app/pages/5_Reports.py
+
+from datetime import date, timedelta
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import select
+
+from app.bootstrap import prepare_page
+from app.database import session_scope
+from app.instrumentation import instrumented_rerun
+from app.models import (
+    Client,
+    SalesClientRollup,
+    SalesDailyRollup,
+    SalesMonthlyRollup,
+    SalesVatRollup,
+)
+
+prepare_page()
+# All figures come from the rollup tables, never from orders or order items.
+with instrumented_rerun("Reports"), session_scope(read_only=True) as db:
+    st.header("Sales Reports")
+
+    monthly = pd.read_sql(
+        select(SalesMonthlyRollup).order_by(
+            SalesMonthlyRollup.year, SalesMonthlyRollup.month
+        ),
+        db.connection(),
+    )
+    if monthly.empty:
+        st.info(
+            "No sales recorded yet. If orders already exist, rebuild the rollups "
+            "with `python -m app.reporting rebuild`."
+        )
+        st.stop()
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Orders", int(monthly["order_count"].sum()))
+    col2.metric("Revenue (Gross)", f"{monthly['total_gross'].sum():,.2f} PLN")
+    col3.metric("Invoices", int(monthly["invoice_count"].sum()))
+    col4.metric("Invoiced (Gross)", f"{monthly['invoiced_gross'].sum():,.2f} PLN")
+
+    tab1, tab2, tab3, tab4 = st.tabs(["By Month", "By Day", "By Client", "By VAT Rate"])
+
+    with tab1:
+        monthly["Month"] = (
+            monthly["year"].astype(str)
+            + "-"
+            + monthly["month"].astype(str).str.zfill(2)
+        )
+        st.bar_chart(
+            monthly.set_index("Month")[["total_net", "total_vat"]],
+            y_label="PLN",
+        )
+        st.dataframe(
+            monthly[["Month", "order_count", "total_net", "total_vat", "total_gross"]],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    with tab2:
+        days_back = st.slider("Days to show", min_value=7, max_value=365, value=90)
+        daily = pd.read_sql(
+            select(SalesDailyRollup)
+            .where(SalesDailyRollup.day >= date.today() - timedelta(days=days_back))
+            .order_by(SalesDailyRollup.day),
+            db.connection(),
+        )
+        if daily.empty:
+            st.info("No sales in the selected period.")
+        else:
+            st.line_chart(
+                daily.set_index("day")[["total_gross", "invoiced_gross"]],
+                y_label="PLN",
+            )
+
+    with tab3:
+        top_n = st.selectbox("Top clients", options=[10, 25, 50], index=0)
+        by_client = pd.read_sql(
+            select(
+                SalesClientRollup,
+                Client.company_name,
+                Client.first_name,
+                Client.last_name,
+            )
+            .join(Client, Client.id == SalesClientRollup.client_id)
+            .order_by(SalesClientRollup.total_gross.desc())
+            .limit(top_n),
+            db.connection(),
+        )
+        by_client["Client"] = by_client["company_name"].fillna(
+            (
+                by_client["first_name"].fillna("")
+                + " "
+                + by_client["last_name"].fillna("")
+            ).str.strip()
+        )
+        st.bar_chart(by_client.set_index("Client")["total_gross"], y_label="PLN")
+        st.dataframe(
+            by_client[["Client", "order_count", "total_gross", "invoiced_gross"]],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    with tab4:
+        by_vat = pd.read_sql(
+            select(SalesVatRollup).order_by(SalesVatRollup.vat_rate.desc()),
+            db.connection(),
+        )
+        by_vat["VAT Rate"] = by_vat["vat_rate"].map(lambda rate: f"{rate:g}%")
+        st.bar_chart(by_vat.set_index("VAT Rate")[["total_net", "total_vat"]])
+        st.dataframe(
+            by_vat[
+                ["VAT Rate", "order_count", "total_net", "total_vat", "total_gross"]
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
@@ -0,0 +1,61 @@
+# app/product_search.py
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import Product
+
+DEFAULT_SEARCH_LIMIT = 20
+
+
+def _like_pattern(term: str) -> str:
+    """Builds a '%term%' pattern with LIKE wildcards in the term escaped."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_products(
+    db: Session, term: str, limit: int = DEFAULT_SEARCH_LIMIT
+) -> list[Product]:
+    """
+    Returns up to `limit` products whose name matches the term, best first.
+
+    On PostgreSQL the search is served by the pg_trgm GIN index on
+    products.name: substring matches and close (typo-tolerant) matches are
+    ranked by trigram similarity. Other databases fall back to a substring
+    match ranked by exact, prefix and earliest-position hits.
+    """
+    term = term.strip()
+    if not term:
+        return []
+    pattern = _like_pattern(term)
+
+    if db.get_bind().dialect.name == "postgresql":
+        query = (
+            select(Product)
+            .where(
+                or_(
+                    Product.name.ilike(pattern, escape="\\"),
+                    Product.name.op("%")(term),
+                )
+            )
+            .order_by(func.similarity(Product.name, term).desc(), Product.name)
+        )
+    else:
+        name = func.lower(Product.name)
+        lowered = term.lower()
+        query = (
+            select(Product)
+            .where(name.like(pattern.lower(), escape="\\"))
+            .order_by(
+                case(
+                    (name == lowered, 0),
+                    (func.instr(name, lowered) == 1, 1),
+                    else_=2,
+                ),
+                func.instr(name, lowered),
+                func.length(Product.name),
+                Product.name,
+            )
+        )
+    return list(db.scalars(query.limit(limit)))
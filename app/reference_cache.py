@@ -0,0 +1,244 @@
+# app/reference_cache.py
+
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import ORMExecuteState, Session, object_mapper
+
+from app.models import Client, CompanyProfile, Product
+
+
+@dataclass(frozen=True)
+class ReferenceCacheStats:
+    hits: int
+    misses: int
+    invalidations: int
+    evictions: int
+    entries: int
+    size_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ReferenceCache:
+    """
+    Thread-safe LRU cache of query results over rarely changing tables. Each
+    entry depends on a set of tables and is dropped when a commit changes any
+    of them; entries are also bounded by count, size and age.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        # key -> (stored at, tables, size in bytes, value)
+        self._entries: OrderedDict[Hashable, tuple[float, frozenset[str], int, Any]] = (
+            OrderedDict()
+        )
+        # Bumped on every invalidation, so a load that raced one is not stored.
+        self._generations: dict[str, int] = {}
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    def get_or_load[T](
+        self, key: Hashable, tables: Iterable[str], load: Callable[[], T]
+    ) -> T:
+        """Returns the cached value for a key or loads, stores and returns it."""
+        tables = frozenset(tables)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self.ttl_seconds and self._clock() - entry[0] > self.ttl_seconds:
+                    self._remove(key)
+                    self._evictions += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[3]
+            self._misses += 1
+            generations = [self._generations.get(table, 0) for table in tables]
+
+        value = load()
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if generations != [self._generations.get(table, 0) for table in tables]:
+                return value  # a commit changed the tables while loading
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock(), tables, size, value)
+            self._size_bytes += size
+            self._evict()
+        return value
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Drops every entry that depends on any of the tables."""
+        tables = set(tables)
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [
+                key
+                for key, (_, depends_on, _, _) in self._entries.items()
+                if depends_on & tables
+            ]
+            for key in stale:
+                self._remove(key)
+            self._invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def stats(self) -> ReferenceCacheStats:
+        with self._lock:
+            return ReferenceCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                invalidations=self._invalidations,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+            )
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size, _ = self._entries.pop(key)
+        self._size_bytes -= size
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._size_bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+
+def _estimate_size(value: Any) -> int:
+    try:
+        return len(pickle.dumps(value))
+    except Exception:  # unpicklable values are counted shallowly
+        return sys.getsizeof(value)
+
+
+# Process-wide cache shared by every Streamlit session. The TTL bounds how
+# long writes made by other processes can go unnoticed; 0 disables it.
+reference_cache = ReferenceCache(
+    max_entries=int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", "128")),
+    max_bytes=int(os.getenv("REFERENCE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300")),
+)
+
+
+# --- Invalidation: tables written in a session are dropped on its commit ---
+def _changed_tables(db: Session) -> set[str]:
+    return db.info.setdefault("reference_cache_tables", set())
+
+
+def mark_tables_changed(db: Session, tables: Iterable[str]) -> None:
+    """
+    Records tables written behind the ORM's back (e.g. a raw COPY), so the
+    session's next commit drops their cached entries like any other write.
+    """
+    _changed_tables(db).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_tables(db: Session, *args: Any) -> None:
+    for obj in chain(db.new, db.dirty, db.deleted):
+        _changed_tables(db).update(table.name for table in object_mapper(obj).tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement_tables(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        _changed_tables(state.session).add(state.statement.table.name)  # type: ignore[attr-defined]
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tables(db: Session) -> None:
+    tables = db.info.pop("reference_cache_tables", None)
+    if tables:
+        reference_cache.invalidate(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_tables(db: Session) -> None:
+    db.info.pop("reference_cache_tables", None)
+
+
+# --- Cached reference data ---
+def cached_query[T](
+    db: Session, key: Hashable, tables: Iterable[str], load: Callable[[Session], T]
+) -> T:
+    """
+    Returns a cached query result. Loaded objects are detached from the
+    session, so they stay usable across sessions but must not be modified.
+    """
+
+    def load_detached() -> T:
+        value = load(db)
+        for obj in value if isinstance(value, list) else [value]:
+            if obj is not None:
+                db.expunge(obj)
+        return value
+
+    # Keyed by database too: the primary and a replica are cached separately.
+    database = str(db.get_bind().engine.url)
+    return reference_cache.get_or_load((database, key), tables, load_detached)
+
+
+def get_clients(db: Session) -> list[Client]:
+    return cached_query(
+        db,
+        "clients",
+        [Client.__tablename__],
+        lambda db: list(db.scalars(select(Client).order_by(Client.id))),
+    )
+
+
+def get_company_profile(db: Session) -> CompanyProfile | None:
+    return cached_query(
+        db,
+        "company_profile",
+        [CompanyProfile.__tablename__],
+        lambda db: db.scalars(select(CompanyProfile).limit(1)).first(),
+    )
+
+
+def get_recent_products(db: Session, limit: int) -> list[Product]:
+    """The most recently added products, newest first."""
+    return cached_query(
+        db,
+        ("recent_products", limit),
+        [Product.__tablename__],
+        lambda db: list(
+            db.scalars(
+                select(Product).order_by(Product.product_index.desc()).limit(limit)
+            )
+        ),
+    )
@@ -0,0 +1,152 @@
+# app/render_jobs.py
+
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session, joinedload
+
+from app.models import (
+    CompanyProfile,
+    Order,
+    OrderItem,
+    RenderJob,
+    RenderJobStatus,
+)
+
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "60"))
+RENDER_MAX_ATTEMPTS = int(os.getenv("RENDER_MAX_ATTEMPTS", "3"))
+# A failed attempt waits this long times the number of attempts so far.
+RETRY_DELAY_SECONDS = 5.0
+
+
+def load_invoice(db: Session, order_id: int) -> tuple[Order, CompanyProfile]:
+    """Loads an invoiced order with everything printed on it."""
+    order = (
+        db.scalars(
+            select(Order)
+            .options(
+                joinedload(Order.client),
+                joinedload(Order.items).joinedload(OrderItem.product),
+            )
+            .where(Order.id == order_id)
+        )
+        .unique()
+        .one()
+    )
+    if not order.invoice_number:
+        raise ValueError(f"Order #{order_id} has no invoice yet.")
+    company = db.scalars(select(CompanyProfile).limit(1)).first()
+    if company is None:
+        raise ValueError("Company profile is missing.")
+    return order, company
+
+
+def enqueue_render(db: Session, order_id: int) -> RenderJob:
+    """
+    Queues the rendering of an order's invoice and returns the job. An issued
+    invoice is final, so a queued, running or done job of the order is reused.
+    Does not commit.
+    """
+    existing = db.scalars(
+        select(RenderJob)
+        .where(
+            RenderJob.order_id == order_id,
+            RenderJob.status != RenderJobStatus.FAILED,
+        )
+        .order_by(RenderJob.id.desc())
+        .limit(1)
+    ).first()
+    if existing is not None and (
+        existing.status != RenderJobStatus.DONE
+        or (existing.result_path and Path(existing.result_path).exists())
+    ):
+        return existing
+    job = RenderJob(order_id=order_id)
+    db.add(job)
+    db.flush()
+    return job
+
+
+def claim_next_job(
+    db: Session,
+    lease_seconds: float,
+    max_attempts: int = RENDER_MAX_ATTEMPTS,
+    now: datetime | None = None,
+) -> RenderJob | None:
+    """
+    Marks the oldest runnable job as running and returns it, or None when
+    there is nothing to do. Jobs whose worker died are failed or retried once
+    their lease expires. Does not commit.
+    """
+    now = now or datetime.utcnow()
+    abandoned = and_(
+        RenderJob.status == RenderJobStatus.RUNNING,
+        RenderJob.lease_expires_at < now,
+    )
+    db.execute(
+        update(RenderJob)
+        .where(abandoned, RenderJob.attempts >= max_attempts)
+        .values(
+            status=RenderJobStatus.FAILED,
+            error="The renderer stopped responding.",
+            finished_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    runnable = or_(
+        and_(RenderJob.status == RenderJobStatus.QUEUED, RenderJob.run_after <= now),
+        and_(abandoned, RenderJob.attempts < max_attempts),
+    )
+    # SKIP LOCKED lets several workers claim different jobs on PostgreSQL.
+    job = db.scalars(
+        select(RenderJob)
+        .where(runnable)
+        .order_by(RenderJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).first()
+    if job is None:
+        return None
+    # The guard makes the claim safe where the SELECT does not lock (SQLite).
+    claimed = db.execute(
+        update(RenderJob)
+        .where(RenderJob.id == job.id, RenderJob.attempts == job.attempts)
+        .values(
+            status=RenderJobStatus.RUNNING,
+            attempts=RenderJob.attempts + 1,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if not claimed.rowcount:  # type: ignore[attr-defined]
+        return None
+    db.refresh(job)
+    return job
+
+
+def complete_job(job: RenderJob, result_path: Path | str) -> None:
+    job.status = RenderJobStatus.DONE
+    job.result_path = str(result_path)
+    job.error = None
+    job.lease_expires_at = None
+    job.finished_at = datetime.utcnow()
+
+
+def fail_job(
+    job: RenderJob,
+    error: str,
+    max_attempts: int = RENDER_MAX_ATTEMPTS,
+    now: datetime | None = None,
+) -> None:
+    """Schedules another attempt, or fails the job once attempts run out."""
+    now = now or datetime.utcnow()
+    job.error = error
+    job.lease_expires_at = None
+    if job.attempts >= max_attempts:
+        job.status = RenderJobStatus.FAILED
+        job.finished_at = now
+    else:
+        job.status = RenderJobStatus.QUEUED
+        job.run_after = now + timedelta(seconds=RETRY_DELAY_SECONDS * job.attempts)
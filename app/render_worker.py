@@ -0,0 +1,218 @@
+# app/render_worker.py
+
+import argparse
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from multiprocessing.process import BaseProcess
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import DATABASE_URL, engine_options
+from app.invoice_archive import archive_path, record_invoice_document, store_pdf
+from app.models import RenderJob
+from app.render_jobs import (
+    RENDER_MAX_ATTEMPTS,
+    RENDER_TIMEOUT,
+    claim_next_job,
+    complete_job,
+    fail_job,
+    load_invoice,
+)
+from app.utils import generate_invoice_pdf
+
+logger = logging.getLogger(__name__)
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+
+
+def render_invoice(db: Session, order_id: int) -> bytes:
+    order, company = load_invoice(db, order_id)
+    return generate_invoice_pdf(order, company)
+
+
+def _renderer(
+    connection: Connection,
+    database_url: str,
+    render: Callable[[Session, int], bytes],
+) -> None:
+    """
+    Renderer process: renders the jobs it is sent into the invoice archive
+    until it receives None. Replies with the PDF's checksum or an error.
+    """
+    sessions = sessionmaker(bind=create_engine(database_url))
+    while (message := connection.recv()) is not None:
+        job_id, order_id = message
+        try:
+            with sessions() as db:
+                sha256 = store_pdf(render(db, order_id))
+        except Exception as e:
+            connection.send((job_id, None, f"{e.__class__.__name__}: {e}"))
+        else:
+            connection.send((job_id, sha256, None))
+
+
+@dataclass
+class _Slot:
+    process: BaseProcess
+    connection: Connection
+    job_id: int | None = None
+    started: float = 0.0
+
+
+class RenderWorker:
+    """
+    Claims render jobs from the database and hands them to a fixed number of
+    renderer processes. A render that exceeds the timeout, or whose process
+    dies, has its process replaced and the job retried or failed.
+    """
+
+    def __init__(
+        self,
+        database_url: str = DATABASE_URL,
+        workers: int = RENDER_WORKERS,
+        timeout: float = RENDER_TIMEOUT,
+        max_attempts: int = RENDER_MAX_ATTEMPTS,
+        poll_interval: float = 1.0,
+        render: Callable[[Session, int], bytes] = render_invoice,
+    ) -> None:
+        self.database_url = database_url
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.render = render
+        self._sessions = sessionmaker(
+            bind=create_engine(database_url, **engine_options(database_url))
+        )
+        # "spawn" keeps renderers independent of this process's threads.
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = [self._start_slot() for _ in range(workers)]
+
+    def _start_slot(self) -> _Slot:
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_renderer,
+            args=(child, self.database_url, self.render),
+            daemon=True,
+        )
+        process.start()
+        return _Slot(process, parent)
+
+    def _finish(self, job_id: int, sha256: str | None, error: str | None) -> None:
+        with self._sessions() as db:
+            job = db.get(RenderJob, job_id)
+            if job is None:
+                return
+            if error is None and sha256:
+                # An order keeps the first document archived for it.
+                document = record_invoice_document(db, job.order_id, sha256)
+                complete_job(job, archive_path(document.sha256))
+                logger.info("Archived job %d as %s.", job_id, document.sha256)
+            else:
+                fail_job(job, error or "No output.", self.max_attempts)
+                logger.warning("Render job %d failed: %s", job_id, error)
+            db.commit()
+
+    def _dispatch(self) -> int:
+        """Hands claimable jobs to idle renderers; returns how many were sent."""
+        sent = 0
+        for slot in self._slots:
+            if slot.job_id is not None:
+                continue
+            with self._sessions() as db:
+                # The lease outlives the timeout, which this process enforces.
+                job = claim_next_job(db, self.timeout * 2, self.max_attempts)
+                if job is None:
+                    break
+                message = (job.id, job.order_id)
+                db.commit()
+            slot.connection.send(message)
+            slot.job_id, slot.started = message[0], time.monotonic()
+            sent += 1
+        return sent
+
+    def _collect(self, timeout: float) -> None:
+        busy = {slot.connection: slot for slot in self._slots if slot.job_id}
+        if not busy:
+            time.sleep(timeout)
+            return
+        for connection in wait(list(busy), timeout):
+            slot = busy[connection]  # type: ignore[index]
+            try:
+                job_id, sha256, error = slot.connection.recv()
+            except EOFError:
+                continue  # the process died; handled by _replace_stuck
+            slot.job_id = None
+            self._finish(job_id, sha256, error)
+
+    def _replace_stuck(self) -> None:
+        for index, slot in enumerate(self._slots):
+            if slot.job_id is None and slot.process.is_alive():
+                continue
+            if slot.job_id is None:
+                error = None
+            elif not slot.process.is_alive():
+                error = "The renderer process exited."
+            elif time.monotonic() - slot.started > self.timeout:
+                error = f"Rendering timed out after {self.timeout:g}s."
+            else:
+                continue
+            slot.process.terminate()
+            slot.process.join()
+            if error and slot.job_id is not None:
+                self._finish(slot.job_id, None, error)
+            self._slots[index] = self._start_slot()
+
+    def run(
+        self, stop: threading.Event | None = None, until_idle: bool = False
+    ) -> None:
+        """
+        Works the queue until stopped. With until_idle, returns once no job is
+        claimable and every renderer is idle.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            sent = self._dispatch()
+            if until_idle and not sent and not any(s.job_id for s in self._slots):
+                return
+            self._collect(0 if sent else self.poll_interval)
+            self._replace_stuck()
+
+    def close(self) -> None:
+        for slot in self._slots:
+            if slot.process.is_alive() and slot.job_id is None:
+                slot.connection.send(None)
+            slot.process.join(timeout=5)
+            if slot.process.is_alive():
+                slot.process.terminate()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render queued invoice PDFs.")
+    parser.add_argument("--workers", type=int, default=RENDER_WORKERS)
+    parser.add_argument(
+        "--timeout", type=float, default=RENDER_TIMEOUT, help="seconds per render"
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="exit when the queue is empty"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    worker = RenderWorker(workers=args.workers, timeout=args.timeout)
+    try:
+        worker.run(until_idle=args.once)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.close()
+
+
+if __name__ == "__main__":
+    main()
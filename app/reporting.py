@@ -0,0 +1,164 @@
+# app/reporting.py
+
+import argparse
+from collections import defaultdict
+from typing import Any
+
+from sqlalchemy import case, delete, extract, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert, session_scope
+from app.models import (
+    Base,
+    Order,
+    SalesClientRollup,
+    SalesDailyRollup,
+    SalesMonthlyRollup,
+    SalesVatRollup,
+)
+
+ROLLUP_MODELS = (
+    SalesDailyRollup,
+    SalesMonthlyRollup,
+    SalesClientRollup,
+    SalesVatRollup,
+)
+ROLLUP_COLUMNS = (
+    "order_count",
+    "total_net",
+    "total_vat",
+    "total_gross",
+    "invoice_count",
+    "invoiced_gross",
+)
+
+
+def _increment(
+    db: Session, model: type, keys: dict[str, Any], deltas: dict[str, float]
+) -> None:
+    """Adds deltas to one rollup row, creating the row when it does not exist."""
+    table = model.__table__  # type: ignore[attr-defined]
+    stmt = dialect_insert(db)(table).values(
+        **keys, **{column: deltas.get(column, 0) for column in ROLLUP_COLUMNS}
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={column: table.c[column] + stmt.excluded[column] for column in deltas},
+    )
+    db.execute(stmt)
+
+
+def _record(db: Session, order: Order, invoiced: bool) -> None:
+    if invoiced:
+        order_deltas = {"invoice_count": 1, "invoiced_gross": order.total_gross}
+    else:
+        order_deltas = {
+            "order_count": 1,
+            "total_net": order.total_net,
+            "total_vat": order.total_vat,
+            "total_gross": order.total_gross,
+        }
+    _increment(db, SalesDailyRollup, {"day": order.order_date.date()}, order_deltas)
+    _increment(
+        db,
+        SalesMonthlyRollup,
+        {"year": order.order_date.year, "month": order.order_date.month},
+        order_deltas,
+    )
+    _increment(db, SalesClientRollup, {"client_id": order.client_id}, order_deltas)
+
+    for rate, amounts in order.vat_breakdown.items():
+        if invoiced:
+            rate_deltas = {"invoice_count": 1, "invoiced_gross": amounts["gross"]}
+        else:
+            rate_deltas = {
+                "order_count": 1,
+                "total_net": amounts["net"],
+                "total_vat": amounts["vat"],
+                "total_gross": amounts["gross"],
+            }
+        _increment(db, SalesVatRollup, {"vat_rate": float(rate)}, rate_deltas)
+
+
+def record_order_created(db: Session, order: Order) -> None:
+    """
+    Adds a new order to the rollups. Call after the order's items have been
+    flushed, so its stored totals are final, and before committing.
+    """
+    _record(db, order, invoiced=False)
+
+
+def record_order_invoiced(db: Session, order: Order) -> None:
+    """Adds an order that has just been given an invoice number to the rollups."""
+    _record(db, order, invoiced=True)
+
+
+def rebuild_rollups(db: Session) -> None:
+    """Recomputes every rollup table from scratch from the stored order totals."""
+    for rollup in ROLLUP_MODELS:
+        db.execute(delete(rollup))
+
+    invoiced = Order.invoice_number.is_not(None)
+    order_aggregates = (
+        func.count(Order.id),
+        func.coalesce(func.sum(Order.total_net), 0.0),
+        func.coalesce(func.sum(Order.total_vat), 0.0),
+        func.coalesce(func.sum(Order.total_gross), 0.0),
+        func.coalesce(func.sum(case((invoiced, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((invoiced, Order.total_gross), else_=0.0)), 0.0),
+    )
+    day = func.date(Order.order_date)
+    year = extract("year", Order.order_date)
+    month = extract("month", Order.order_date)
+    groupings: list[tuple[type[Base], list[str], tuple[Any, ...]]] = [
+        (SalesDailyRollup, ["day"], (day,)),
+        (SalesMonthlyRollup, ["year", "month"], (year, month)),
+        (SalesClientRollup, ["client_id"], (Order.client_id,)),
+    ]
+    for model, keys, key_columns in groupings:
+        db.execute(
+            insert(model).from_select(
+                [*keys, *ROLLUP_COLUMNS],
+                select(*key_columns, *order_aggregates).group_by(*key_columns),
+            )
+        )
+
+    # From each order's stored, rounded breakdown, as _record adds them, so a
+    # rebuild gives the same per-rate amounts as the incremental updates.
+    per_rate: dict[float, dict[str, float]] = defaultdict(
+        lambda: dict.fromkeys(ROLLUP_COLUMNS, 0.0)
+    )
+    breakdowns = db.execute(
+        select(Order.vat_breakdown, invoiced).execution_options(yield_per=1000)
+    )
+    for breakdown, is_invoiced in breakdowns:
+        for rate, amounts in breakdown.items():
+            row = per_rate[float(rate)]
+            row["order_count"] += 1
+            row["total_net"] += amounts["net"]
+            row["total_vat"] += amounts["vat"]
+            row["total_gross"] += amounts["gross"]
+            if is_invoiced:
+                row["invoice_count"] += 1
+                row["invoiced_gross"] += amounts["gross"]
+    if per_rate:
+        db.execute(
+            insert(SalesVatRollup),
+            [{"vat_rate": rate, **row} for rate, row in per_rate.items()],
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the sales rollup tables.")
+    parser.add_argument(
+        "command", choices=["rebuild"], help="rebuild: recompute every rollup table"
+    )
+    parser.parse_args()
+    with session_scope() as db:
+        rebuild_rollups(db)
+        db.commit()
+    print("Sales rollups rebuilt.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
 # app/style_loader.py (Clean version)
 import streamlit as st
 
+from app.bootstrap import CSS_FILE_PATH, read_asset
+
 
 def load_css() -> None:
-    """Loads the global CSS file."""
-    css_file_path = "assets/style.css"
-    try:
-        with open(css_file_path) as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    except FileNotFoundError:
+    """Loads the global CSS file, read from disk once per process."""
+    css = read_asset(CSS_FILE_PATH)
+    if css is None:
         st.error("CSS file not found. Check Dockerfile COPY instruction for 'assets'.")
+    else:
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
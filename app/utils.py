@@ -2,61 +2,156 @@
 
 from datetime import datetime
 
-from jinja2 import Environment, FileSystemLoader
 from num2words import num2words
-from sqlalchemy import func
+from sqlalchemy import func, select, text, update
 from sqlalchemy.orm import Session
-from weasyprint import HTML
 
-from app.models import CompanyProfile, Order, Product
+from app.database import dialect_insert
+from app.invoice_renderer import get_invoice_renderer
+from app.models import (
+    CompanyProfile,
+    InvoiceSequence,
+    Order,
+    Product,
+    SequenceCounter,
+    product_index_seq,
+)
+
+# Engines whose product index sequence was already aligned with the table.
+_synced_product_index_binds: set[str] = set()
+
+
+def _sync_product_index_sequence(db: Session) -> None:
+    """
+    Moves the PostgreSQL sequence past any product_index inserted without it
+    (e.g. before the sequence existed). Never moves the sequence backwards.
+    """
+    db.execute(
+        text(
+            "SELECT setval('product_index_seq', m.max_index) "
+            "FROM (SELECT max(product_index) AS max_index FROM products) AS m "
+            "WHERE m.max_index >= (SELECT last_value FROM product_index_seq)"
+        )
+    )
+
+
+def _reserve_emulated_product_indexes(db: Session, count: int) -> list[int]:
+    """Allocates indexes from the sequence_counters row on SQLite."""
+    increment = (
+        update(SequenceCounter)
+        .where(SequenceCounter.name == product_index_seq.name)
+        .values(last_value=SequenceCounter.last_value + count)
+        .returning(SequenceCounter.last_value)
+        .execution_options(synchronize_session=False)
+    )
+    last_value = db.execute(increment).scalar_one_or_none()
+    if last_value is None:
+        max_index = db.query(func.max(Product.product_index)).scalar() or 0
+        insert = dialect_insert(db)
+        db.execute(
+            insert(SequenceCounter)
+            .values(name=product_index_seq.name, last_value=max_index)
+            .on_conflict_do_nothing()
+        )
+        last_value = db.execute(increment).scalar_one()
+    return list(range(last_value - count + 1, last_value + 1))
+
+
+def reserve_product_indexes(db: Session, count: int) -> list[int]:
+    """
+    Reserves a block of unique product indexes in one round trip, for bulk
+    product creation. Indexes come from the product_index_seq sequence on
+    PostgreSQL; unused ones are simply skipped, so gaps are possible.
+    """
+    if count < 1:
+        return []
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return _reserve_emulated_product_indexes(db, count)
+
+    bind_key = str(bind.engine.url)
+    if bind_key not in _synced_product_index_binds:
+        _sync_product_index_sequence(db)
+        _synced_product_index_binds.add(bind_key)
+    return list(
+        db.scalars(
+            select(product_index_seq.next_value()).select_from(
+                func.generate_series(1, count)
+            )
+        )
+    )
 
 
 def get_next_product_index(db: Session) -> int:
-    """Finds the highest product_index and returns the next integer."""
-    max_index = db.query(func.max(Product.product_index)).scalar()
-    if max_index is None:
-        return 1
-    return max_index + 1
+    """Reserves and returns the next unique product_index."""
+    return reserve_product_indexes(db, 1)[0]
+
+
+def _last_issued_invoice_number(db: Session, prefix: str, month: int, year: int) -> int:
+    """Finds the highest number already used in a period by scanning invoices."""
+    invoice_numbers = db.scalars(
+        select(Order.invoice_number).where(
+            Order.invoice_number.like(f"{prefix}/%/{month}/{year}")
+        )
+    )
+    return max(
+        (int(number.split("/")[1]) for number in invoice_numbers if number),
+        default=0,
+    )
 
 
-def get_next_invoice_number(db: Session) -> str:
+def get_next_invoice_number(db: Session, prefix: str = "FV") -> str:
     """
-    Generates the next invoice number for the current month and year.
+    Reserves the next invoice number for the current month and year.
     Format: FV/Number/Month/Year
+
+    The number comes from the invoice_sequences counter row of the period,
+    incremented with a single UPDATE ... RETURNING. The row stays locked until
+    the caller commits, so concurrent issuers are serialised and a rolled back
+    invoice gives its number back, keeping the numbering gap-free.
     """
     now = datetime.now()
     month = now.month
     year = now.year
-    prefix = "FV"
-    last_invoice_num = (
-        db.query(Order.invoice_number)
-        .filter(
-            Order.invoice_number.like(f"{prefix}/%/%/{year}"),
-            func.extract("month", Order.order_date) == month,
+    increment = (
+        update(InvoiceSequence)
+        .where(
+            InvoiceSequence.prefix == prefix,
+            InvoiceSequence.year == year,
+            InvoiceSequence.month == month,
         )
-        .order_by(Order.id.desc())
-        .first()
+        .values(last_value=InvoiceSequence.last_value + 1)
+        .returning(InvoiceSequence.last_value)
+        .execution_options(synchronize_session=False)
     )
-    if last_invoice_num:
-        last_number = int(last_invoice_num[0].split("/")[1])
-        next_number = last_number + 1
-    else:
-        next_number = 1
+    next_number = db.execute(increment).scalar_one_or_none()
+    if next_number is None:
+        # First invoice of the period: seed the counter from any invoices
+        # issued before the counter table existed, then increment it.
+        insert = dialect_insert(db)
+        db.execute(
+            insert(InvoiceSequence)
+            .values(
+                prefix=prefix,
+                year=year,
+                month=month,
+                last_value=_last_issued_invoice_number(db, prefix, month, year),
+            )
+            .on_conflict_do_nothing()
+        )
+        next_number = db.execute(increment).scalar_one()
     return f"{prefix}/{next_number}/{month}/{year}"
 
 
+def invoice_file_name(invoice_number: str) -> str:
+    """Returns the download file name for an invoice number."""
+    return f"Faktura_{invoice_number.replace('/', '-')}.pdf"
+
+
 def generate_invoice_pdf(order: Order, company: CompanyProfile) -> bytes:
     """Generates a PDF invoice from an HTML template for a given order."""
-    # The base_url needs to point to the root where assets are, relative to WORKDIR
-    env = Environment(loader=FileSystemLoader("."))
-    template = env.get_template("app/invoice_template.html")
-
-    total_net = sum(item.quantity * item.price_per_unit for item in order.items)
-    total_vat = sum(
-        item.quantity * item.price_per_unit * (item.vat_rate / 100)
-        for item in order.items
-    )
-    total_gross = total_net + total_vat
+    # Totals are stored on the order and kept in sync with its items.
+    total_gross = order.total_gross
 
     integer_part = int(total_gross)
     fractional_part = round((total_gross % 1) * 100)
@@ -69,15 +164,12 @@ def generate_invoice_pdf(order: Order, company: CompanyProfile) -> bytes:
         "order": order,
         "company": company,
         "summary": {
-            "total_net": total_net,
-            "total_vat": total_vat,
+            "total_net": order.total_net,
+            "total_vat": order.total_vat,
             "total_gross": total_gross,
+            "vat_breakdown": order.vat_breakdown,
             "total_in_words": total_in_words.capitalize(),
         },
     }
 
-    html_out = template.render(template_data)
-    # The base_url helps WeasyPrint find relative paths for assets like fonts
-    pdf_bytes = HTML(string=html_out, base_url=".").write_pdf()
-
-    return pdf_bytes
+    return get_invoice_renderer().render_pdf(template_data)
@@ -0,0 +1,291 @@
+# benchmarks/generate_data.py
+
+import argparse
+import random
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import batched
+from typing import Any
+
+from sqlalchemy import Connection, Engine, create_engine, func, insert, select
+from sqlalchemy import text as sql_text
+from sqlalchemy.orm import Session
+
+from app.database import DATABASE_URL, engine_options
+from app.importers import NIP_WEIGHTS
+from app.migrate import upgrade
+from app.models import (
+    Client,
+    ClientCategory,
+    ClientType,
+    CompanyProfile,
+    InvoiceSequence,
+    Order,
+    OrderItem,
+    PaymentMethod,
+    PaymentStatus,
+    Product,
+    ProductUnit,
+    calculate_order_totals,
+)
+from app.reporting import rebuild_rollups
+
+BATCH_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class Volumes:
+    clients: int
+    products: int
+    orders: int
+    max_items_per_order: int = 8
+
+
+SCALES = {
+    "tiny": Volumes(clients=50, products=200, orders=500),
+    "small": Volumes(clients=2_000, products=10_000, orders=40_000),
+    "medium": Volumes(clients=20_000, products=100_000, orders=400_000),
+    "full": Volumes(clients=100_000, products=500_000, orders=2_000_000),
+}
+
+PRODUCT_NOUNS = (
+    "Bolt", "Nut", "Washer", "Screw", "Bracket", "Hinge", "Cable", "Rope", "Pipe",
+    "Valve", "Filter", "Bearing", "Gasket", "Spring", "Clamp", "Panel", "Sheet",
+    "Paint", "Glue", "Tape",
+)  # fmt: skip
+PRODUCT_ADJECTIVES = (
+    "Steel", "Brass", "Copper", "Plastic", "Galvanised", "Stainless", "Heavy",
+    "Light", "Flexible", "Industrial", "Waterproof", "Reinforced",
+)  # fmt: skip
+FIRST_NAMES = ("Anna", "Jan", "Piotr", "Maria", "Katarzyna", "Tomasz", "Agnieszka")
+LAST_NAMES = ("Nowak", "Kowalski", "Wiśniewski", "Wójcik", "Kamińska", "Lewandowska")
+CITIES = ("Warszawa", "Kraków", "Łódź", "Wrocław", "Poznań", "Gdańsk", "Lublin")
+VAT_RATES = (23.0, 23.0, 23.0, 8.0, 5.0, 0.0)
+
+
+def _nip(number: int) -> str:
+    """Returns a NIP with a valid checksum, unique for each number below 10M."""
+    for candidate in range(100_000_000 + number * 10, 100_000_000 + number * 10 + 10):
+        digits = [int(d) for d in str(candidate)]
+        check = sum(d * w for d, w in zip(digits, NIP_WEIGHTS, strict=True)) % 11
+        if check < 10:
+            return f"{candidate}{check}"
+    raise AssertionError("unreachable")
+
+
+def _clients(rng: random.Random, count: int) -> Iterator[dict[str, Any]]:
+    for client_id in range(1, count + 1):
+        city = rng.choice(CITIES)
+        row = {
+            "id": client_id,
+            "client_type": ClientType.RECIPIENT,
+            "address_street": f"ul. Przykładowa {rng.randint(1, 200)}",
+            "address_zipcode": f"{rng.randint(0, 99):02d}-{rng.randint(0, 999):03d}",
+            "address_city": city,
+            "email": f"client{client_id}@example.com",
+            "phone_number": f"+48 {rng.randint(500_000_000, 899_999_999)}",
+        }
+        if rng.random() < 0.7:
+            row |= {
+                "category": ClientCategory.COMPANY,
+                "company_name": f"{rng.choice(PRODUCT_ADJECTIVES)} {city} "
+                f"Sp. z o.o. {client_id}",
+                "vat_id": f"PL{_nip(client_id)}",
+                "first_name": None,
+                "last_name": None,
+            }
+        else:
+            row |= {
+                "category": ClientCategory.INDIVIDUAL,
+                "company_name": None,
+                "vat_id": None,
+                "first_name": rng.choice(FIRST_NAMES),
+                "last_name": rng.choice(LAST_NAMES),
+            }
+        yield row
+
+
+def _products(rng: random.Random, count: int) -> Iterator[dict[str, Any]]:
+    units = list(ProductUnit)
+    for product_id in range(1, count + 1):
+        yield {
+            "id": product_id,
+            "name": f"{rng.choice(PRODUCT_ADJECTIVES)} {rng.choice(PRODUCT_NOUNS)} "
+            f"{rng.choice('ABCDEFGHKMPRSTXZ')}{rng.randint(1, 999)}",
+            "product_index": product_id,
+            "unit": rng.choice(units),
+            "stock": float(rng.randint(0, 10_000)),
+            "vat_rate": rng.choice(VAT_RATES),
+        }
+
+
+def _pick_client(rng: random.Random, clients: int) -> int:
+    # The largest 1% of clients place a fifth of the orders.
+    if rng.random() < 0.2:
+        return rng.randint(1, max(clients // 100, 1))
+    return rng.randint(1, clients)
+
+
+def _orders(
+    rng: random.Random,
+    volumes: Volumes,
+    product_rates: list[float],
+    invoice_counters: dict[tuple[int, int], int],
+) -> Iterator[tuple[dict[str, Any], list[dict[str, Any]]]]:
+    """Yields (order, items) pairs in order-date order over the last three years."""
+    start = datetime.now() - timedelta(days=3 * 365)
+    step = (datetime.now() - start) / max(volumes.orders, 1)
+    item_id = 0
+    for order_id in range(1, volumes.orders + 1):
+        order_date = start + step * (order_id - 1)
+        items = []
+        for _ in range(rng.randint(1, volumes.max_items_per_order)):
+            item_id += 1
+            product_id = rng.randint(1, volumes.products)
+            items.append(
+                {
+                    "id": item_id,
+                    "order_id": order_id,
+                    "product_id": product_id,
+                    "quantity": float(rng.randint(1, 20)),
+                    "price_per_unit": round(rng.uniform(0.5, 500.0), 2),
+                    "vat_rate": product_rates[product_id - 1],
+                }
+            )
+        totals = calculate_order_totals(
+            (item["quantity"], item["price_per_unit"], item["vat_rate"])
+            for item in items
+        )
+        order = {
+            "id": order_id,
+            "client_id": _pick_client(rng, volumes.clients),
+            "order_date": order_date,
+            "invoice_number": None,
+            "payment_due_date": None,
+            "payment_method": None,
+            "payment_status": PaymentStatus.UNPAID,
+            "total_net": totals.total_net,
+            "total_vat": totals.total_vat,
+            "total_gross": totals.total_gross,
+            "vat_breakdown": totals.vat_breakdown,
+        }
+        if rng.random() < 0.6:
+            period = (order_date.year, order_date.month)
+            invoice_counters[period] = invoice_counters.get(period, 0) + 1
+            order |= {
+                "invoice_number": f"FV/{invoice_counters[period]}/{period[1]}/"
+                f"{period[0]}",
+                "payment_due_date": order_date + timedelta(days=14),
+                "payment_method": rng.choice(list(PaymentMethod)),
+                "payment_status": rng.choice(
+                    [PaymentStatus.PAID, PaymentStatus.PAID, PaymentStatus.OVERDUE]
+                ),
+            }
+        yield order, items
+
+
+def _insert(connection: Connection, model: type, rows: list[dict[str, Any]]) -> None:
+    if rows:
+        connection.execute(insert(model.__table__), rows)  # type: ignore[attr-defined]
+
+
+def seed(engine: Engine, volumes: Volumes, seed_value: int = 42) -> None:
+    """
+    Migrates an empty database, fills it with synthetic clients, products,
+    orders and invoices, then rebuilds the sales rollups. Deterministic for a
+    given seed.
+    """
+    with engine.begin() as connection:
+        upgrade(connection)
+    with engine.connect() as connection:
+        if connection.scalar(select(func.count(Order.id))):
+            raise ValueError("The benchmark database must be empty.")
+
+    rng = random.Random(seed_value)
+    with engine.begin() as connection:
+        _insert(
+            connection,
+            CompanyProfile,
+            [
+                {
+                    "company_name": "Benchmark Sp. z o.o.",
+                    "vat_id": f"PL{_nip(0)}",
+                    "address_street": "ul. Testowa 1",
+                    "address_zipcode": "00-001",
+                    "address_city": "Warszawa",
+                    "bank_account_number": "PL61 1090 1014 0000 0712 1981 2874",
+                }
+            ],
+        )
+        for batch in batched(_clients(rng, volumes.clients), BATCH_SIZE):
+            _insert(connection, Client, list(batch))
+
+        product_rates: list[float] = []
+        for batch in batched(_products(rng, volumes.products), BATCH_SIZE):
+            product_rates.extend(row["vat_rate"] for row in batch)
+            _insert(connection, Product, list(batch))
+
+    invoice_counters: dict[tuple[int, int], int] = {}
+    orders = _orders(rng, volumes, product_rates, invoice_counters)
+    for order_batch in batched(orders, BATCH_SIZE):
+        with engine.begin() as connection:
+            _insert(connection, Order, [order for order, _ in order_batch])
+            _insert(
+                connection,
+                OrderItem,
+                [item for _, items in order_batch for item in items],
+            )
+
+    with engine.begin() as connection:
+        _insert(
+            connection,
+            InvoiceSequence,
+            [
+                {"prefix": "FV", "year": year, "month": month, "last_value": last}
+                for (year, month), last in invoice_counters.items()
+            ],
+        )
+        if connection.dialect.name == "postgresql":
+            # Explicit ids bypass the serial sequences; move them past the data.
+            for table in ("clients", "products", "orders", "order_items"):
+                connection.execute(
+                    sql_text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT max(id) FROM {table}))"
+                    )
+                )
+
+    with Session(engine) as db:
+        rebuild_rollups(db)
+        db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Seed a database with synthetic data for the benchmarks."
+    )
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--clients", type=int, help="override the scale's clients")
+    parser.add_argument("--products", type=int, help="override the scale's products")
+    parser.add_argument("--orders", type=int, help="override the scale's orders")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    base = SCALES[args.scale]
+    volumes = Volumes(
+        clients=args.clients or base.clients,
+        products=args.products or base.products,
+        orders=args.orders or base.orders,
+        max_items_per_order=base.max_items_per_order,
+    )
+    started = time.perf_counter()
+    engine = create_engine(args.database_url, **engine_options(args.database_url))
+    seed(engine, volumes, args.seed)
+    print(f"Seeded {volumes} in {time.perf_counter() - started:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
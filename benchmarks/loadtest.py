@@ -0,0 +1,337 @@
+# benchmarks/loadtest.py
+
+import argparse
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+from streamlit.testing.v1 import AppTest
+
+PAGES_DIR = Path(__file__).parent.parent / "app" / "pages"
+PRODUCT_PAGE = str(PAGES_DIR / "3_Product_Database.py")
+ORDERS_PAGE = str(PAGES_DIR / "4_Orders.py")
+SEARCH_WORDS = ("Steel", "Bolt", "Valve", "Cable", "Brass", "Glue", "Pipe", "Tape")
+
+
+@dataclass
+class LoadTestStats:
+    """Rerun timings and errors collected from every simulated user."""
+
+    timings: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, list[str]] = field(default_factory=lambda: defaultdict(list))
+    flows: int = 0
+    pool_samples: list[dict[str, int]] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, step: str, seconds: float, at: AppTest) -> None:
+        problems = [str(e.value) for e in at.exception]
+        with self.lock:
+            self.timings[step].append(seconds * 1000)
+            if problems:
+                self.errors[step].extend(problems)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+class SimulatedUser:
+    """One browser session walking through the order flow with AppTest."""
+
+    def __init__(
+        self,
+        stats: LoadTestStats,
+        product_indexes: list[int],
+        rng: random.Random,
+        think_time: float,
+        timeout: float,
+    ) -> None:
+        self.stats = stats
+        self.product_indexes = product_indexes
+        self.rng = rng
+        self.think_time = think_time
+        self.timeout = timeout
+
+    def _step(self, step: str, at: AppTest) -> AppTest:
+        started = time.perf_counter()
+        at.run(timeout=self.timeout)
+        self.stats.record(step, time.perf_counter() - started, at)
+        if self.think_time:
+            time.sleep(self.rng.uniform(0, self.think_time))
+        return at
+
+    @staticmethod
+    def _widget(widgets: Any, label: str) -> Any:
+        for widget in widgets:
+            if widget.label == label:
+                return widget
+        raise LookupError(f"No widget labelled '{label}' on the page.")
+
+    def search_products(self) -> None:
+        at = self._step("products_open", AppTest.from_file(PRODUCT_PAGE))
+        self._widget(at.text_input, "Search by Product Name").set_value(
+            self.rng.choice(SEARCH_WORDS)
+        )
+        self._step("product_search", at)
+
+    def create_order(self) -> None:
+        at = self._step("orders_open", AppTest.from_file(ORDERS_PAGE))
+        for _ in range(self.rng.randint(1, 4)):
+            self._widget(at.text_input, "Enter Product Index / SKU").set_value(
+                str(self.rng.choice(self.product_indexes))
+            )
+            self._widget(at.button, "Find Product").click()
+            self._step("find_product", at)
+            self._widget(at.number_input, "Quantity").set_value(1.0)
+            self._widget(at.number_input, "Price per Unit (Net)").set_value(
+                round(self.rng.uniform(1, 100), 2)
+            )
+            self._widget(at.button, "Add to Cart").click()
+            self._step("add_to_cart", at)
+        self._widget(at.button, "Create Final Order").click()
+        self._step("create_order", at)
+
+        # The newest orders are listed first, so this is usually our order.
+        invoice_buttons = [
+            button
+            for button in at.button
+            if button.label == "Confirm and Generate Invoice"
+        ]
+        if invoice_buttons:
+            invoice_buttons[0].click()
+            self._step("issue_invoice", at)
+
+    def run(self, deadline: float) -> None:
+        while time.time() < deadline:
+            try:
+                self.search_products()
+                self.create_order()
+            except Exception as e:  # a broken flow must not stop the other users
+                with self.stats.lock:
+                    self.stats.errors["flow"].append(f"{e.__class__.__name__}: {e}")
+            else:
+                with self.stats.lock:
+                    self.stats.flows += 1
+
+
+def _sample_pool(stats: LoadTestStats, stop: threading.Event) -> None:
+    from app.database import engine
+
+    pool: Any = engine.pool
+    while not stop.wait(0.1):
+        if hasattr(pool, "checkedout"):
+            stats.pool_samples.append(
+                {"checked_out": pool.checkedout(), "overflow": pool.overflow()}
+            )
+
+
+def _run_user(
+    number: int,
+    product_indexes: list[int],
+    deadline: float,
+    think_time: float,
+    timeout: float,
+    seed: int,
+) -> dict[str, Any]:
+    """Runs one simulated user in a worker process and returns its raw stats."""
+    stats = LoadTestStats()
+    stop_sampling = threading.Event()
+    sampler = threading.Thread(target=_sample_pool, args=(stats, stop_sampling))
+    sampler.start()
+    try:
+        user = SimulatedUser(
+            stats, product_indexes, random.Random(seed + number), think_time, timeout
+        )
+        user.run(deadline)
+    finally:
+        stop_sampling.set()
+        sampler.join()
+    return {
+        "timings": dict(stats.timings),
+        "errors": dict(stats.errors),
+        "flows": stats.flows,
+        "pool_samples": stats.pool_samples,
+    }
+
+
+def _count_connections(samples: list[int], stop: threading.Event) -> None:
+    """Samples the server's connections to the database (PostgreSQL only)."""
+    from sqlalchemy import create_engine, func, select, text
+
+    from app.database import DATABASE_URL
+
+    engine = create_engine(DATABASE_URL, pool_size=1)
+    if engine.dialect.name != "postgresql":
+        return
+    query = (
+        select(func.count())
+        .select_from(text("pg_stat_activity"))
+        .where(text("datname = current_database()"))
+    )
+    with engine.connect() as connection:
+        while not stop.wait(0.5):
+            # Minus the sampling connection itself.
+            samples.append((connection.scalar(query) or 1) - 1)
+            connection.rollback()
+    engine.dispose()
+
+
+def run_load_test(
+    users: int,
+    duration: float,
+    ramp_up: float = 5.0,
+    think_time: float = 0.5,
+    timeout: float = 30.0,
+    seed: int = 1,
+) -> dict[str, Any]:
+    """
+    Runs concurrent simulated users against DATABASE_URL and returns a report.
+    AppTest swaps process-wide globals on every run, so each user gets its own
+    process; the pool figures are therefore per browser session.
+    """
+    from sqlalchemy import select
+
+    from app.database import engine, session_scope
+    from app.models import Product
+
+    with session_scope() as db:
+        product_indexes = list(
+            db.scalars(
+                select(Product.product_index)
+                .where(Product.stock >= 1000)
+                .order_by(Product.id)
+                .limit(1000)
+            )
+        )
+    if not product_indexes:
+        raise ValueError(
+            "No products with stock to order; seed the database with "
+            "benchmarks.generate_data first."
+        )
+
+    connections: list[int] = []
+    stop_counting = threading.Event()
+    counter = threading.Thread(
+        target=_count_connections, args=(connections, stop_counting)
+    )
+    counter.start()
+    stats = LoadTestStats()
+    started = time.time()
+    deadline = started + duration
+    with ProcessPoolExecutor(users, mp_context=get_context("spawn")) as executor:
+        futures = []
+        for number in range(users):
+            futures.append(
+                executor.submit(
+                    _run_user,
+                    number,
+                    product_indexes,
+                    deadline,
+                    think_time,
+                    timeout,
+                    seed,
+                )
+            )
+            time.sleep(ramp_up / users)
+        for future in futures:
+            result = future.result()
+            stats.flows += result["flows"]
+            stats.pool_samples.extend(result["pool_samples"])
+            for step, timings in result["timings"].items():
+                stats.timings[step].extend(timings)
+            for step, messages in result["errors"].items():
+                stats.errors[step].extend(messages)
+    elapsed = time.time() - started
+    stop_counting.set()
+    counter.join()
+
+    steps = {}
+    for step, timings in sorted(stats.timings.items()):
+        timings.sort()
+        steps[step] = {
+            "reruns": len(timings),
+            "p50_ms": round(_percentile(timings, 0.50), 1),
+            "p90_ms": round(_percentile(timings, 0.90), 1),
+            "p95_ms": round(_percentile(timings, 0.95), 1),
+            "p99_ms": round(_percentile(timings, 0.99), 1),
+            "max_ms": round(timings[-1], 1),
+            "mean_ms": round(statistics.fmean(timings), 1),
+            "errors": len(stats.errors.get(step, [])),
+        }
+    checked_out = [sample["checked_out"] for sample in stats.pool_samples]
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "database": engine.url.render_as_string(hide_password=True),
+        "users": users,
+        "duration_s": round(elapsed, 1),
+        "flows_completed": stats.flows,
+        "flows_per_minute": round(stats.flows / elapsed * 60, 1),
+        "steps": steps,
+        "pool": {
+            "size_per_session": getattr(engine.pool, "size", lambda: None)(),
+            "max_checked_out": max(checked_out, default=0),
+            "mean_checked_out": round(statistics.fmean(checked_out), 2)
+            if checked_out
+            else 0,
+            "max_overflow": max(
+                (sample["overflow"] for sample in stats.pool_samples), default=0
+            ),
+            "max_server_connections": max(connections, default=None),
+        },
+        "errors": {
+            step: sorted(set(messages))[:20] for step, messages in stats.errors.items()
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Drive the Streamlit pages with concurrent simulated users."
+    )
+    parser.add_argument(
+        "--database-url", help="database to use (default: the DATABASE_URL setting)"
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds")
+    parser.add_argument(
+        "--think-time", type=float, default=0.5, help="max pause between reruns (s)"
+    )
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    args = parser.parse_args()
+
+    # Must be set before app.database creates the shared engine.
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    report = run_load_test(args.users, args.duration, args.ramp_up, args.think_time)
+
+    print(
+        f"{report['users']} users, {report['flows_completed']} flows "
+        f"({report['flows_per_minute']}/min) in {report['duration_s']}s"
+    )
+    print(f"{'step':<16}{'reruns':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+    for step, s in report["steps"].items():
+        print(
+            f"{step:<16}{s['reruns']:>8}{s['p50_ms']:>9}{s['p95_ms']:>9}"
+            f"{s['p99_ms']:>9}{s['errors']:>8}"
+        )
+    print(f"pool: {report['pool']}")
+    for step, messages in report["errors"].items():
+        for message in messages:
+            print(f"ERROR [{step}] {message}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+# benchmarks/run.py
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import sqlalchemy
+from sqlalchemy import Engine, create_engine, func, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.database import DATABASE_URL, engine_options
+from app.models import Client, CompanyProfile, Order, OrderItem, Product
+from app.order_queries import OrderFilters, fetch_order_page
+from app.product_search import search_products
+from app.utils import (
+    generate_invoice_pdf,
+    get_next_invoice_number,
+    get_next_product_index,
+)
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_THRESHOLD = 1.25
+
+
+@dataclass
+class Workload:
+    """Inputs sampled once from the seeded database, so every run is comparable."""
+
+    client_ids: list[int]
+    search_terms: list[str]
+    invoiced_order_ids: list[int]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    run: Callable[[Session, random.Random, Workload], object]
+
+
+def _order_list_first_page(db: Session, rng: random.Random, w: Workload) -> object:
+    return fetch_order_page(db, OrderFilters(), page_size=25)
+
+
+def _order_list_fifth_page(db: Session, rng: random.Random, w: Workload) -> object:
+    page = fetch_order_page(db, OrderFilters(), page_size=25)
+    for _ in range(4):
+        page = fetch_order_page(
+            db, OrderFilters(), page_size=25, after=page.next_cursor
+        )
+    return page
+
+
+def _order_list_by_client(db: Session, rng: random.Random, w: Workload) -> object:
+    filters = OrderFilters(client_id=rng.choice(w.client_ids))
+    return fetch_order_page(db, filters, page_size=25)
+
+
+def _product_search(db: Session, rng: random.Random, w: Workload) -> object:
+    return search_products(db, rng.choice(w.search_terms))
+
+
+def _invoice_pdf(db: Session, rng: random.Random, w: Workload) -> object:
+    order = (
+        db.scalars(
+            select(Order)
+            .options(joinedload(Order.items).joinedload(OrderItem.product))
+            .where(Order.id == rng.choice(w.invoiced_order_ids))
+        )
+        .unique()
+        .one()
+    )
+    company = db.scalars(select(CompanyProfile).limit(1)).one()
+    return generate_invoice_pdf(order, company)
+
+
+BENCHMARKS = (
+    Benchmark("invoice_number", lambda db, rng, w: get_next_invoice_number(db)),
+    Benchmark("product_index", lambda db, rng, w: get_next_product_index(db)),
+    Benchmark("order_list_first_page", _order_list_first_page),
+    Benchmark("order_list_fifth_page", _order_list_fifth_page),
+    Benchmark("order_list_by_client", _order_list_by_client),
+    Benchmark("product_search", _product_search),
+    Benchmark("invoice_pdf", _invoice_pdf),
+)
+
+
+def sample_workload(engine: Engine, rng: random.Random, size: int = 100) -> Workload:
+    with Session(engine) as db:
+        client_ids = list(db.scalars(select(Client.id).limit(10_000)))
+        names = list(db.scalars(select(Product.name).limit(10_000)))
+        invoiced = list(
+            db.scalars(
+                select(Order.id).where(Order.invoice_number.is_not(None)).limit(10_000)
+            )
+        )
+    if not (client_ids and names and invoiced):
+        raise ValueError(
+            "The database has no data to benchmark; run benchmarks.generate_data first."
+        )
+    # Whole words, word prefixes and misspellings, as typed into the search box.
+    words = [
+        word
+        for name in rng.sample(names, min(size, len(names)))
+        for word in name.split()
+    ]
+    terms = [rng.choice([word, word[:3], word[:-1] + "x"]) for word in words]
+    return Workload(
+        client_ids=rng.sample(client_ids, min(size, len(client_ids))),
+        search_terms=terms[:size],
+        invoiced_order_ids=rng.sample(invoiced, min(size, len(invoiced))),
+    )
+
+
+def time_benchmark(
+    engine: Engine,
+    benchmark: Benchmark,
+    workload: Workload,
+    repeat: int,
+    warmup: int,
+    rng: random.Random,
+) -> dict[str, float]:
+    """
+    Times repeat runs, each in a fresh session that is rolled back afterwards,
+    and returns summary statistics in milliseconds.
+    """
+    timings = []
+    for iteration in range(warmup + repeat):
+        with Session(engine) as db:
+            started = time.perf_counter()
+            benchmark.run(db, rng, workload)
+            elapsed = time.perf_counter() - started
+            db.rollback()
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+    timings.sort()
+    return {
+        "runs": len(timings),
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(int(len(timings) * 0.95) - 1, 0)], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    engine: Engine,
+    names: Sequence[str] | None = None,
+    repeat: int = 20,
+    warmup: int = 2,
+    seed: int = 1,
+) -> dict[str, Any]:
+    """Runs the selected benchmarks and returns the results document."""
+    rng = random.Random(seed)
+    workload = sample_workload(engine, rng)
+    with Session(engine) as db:
+        row_counts = {
+            model.__tablename__: db.scalar(select(func.count()).select_from(model))
+            for model in (Client, Product, Order, OrderItem)
+        }
+    results = {}
+    for benchmark in BENCHMARKS:
+        if names and benchmark.name not in names:
+            continue
+        results[benchmark.name] = time_benchmark(
+            engine, benchmark, workload, repeat, warmup, rng
+        )
+        print(
+            f"{benchmark.name:<24} median {results[benchmark.name]['median_ms']:>9.2f} ms"
+        )
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "database": engine.url.render_as_string(hide_password=True),
+        "row_counts": row_counts,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def find_regressions(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Lists benchmarks whose median grew by more than the threshold ratio."""
+    regressions = []
+    for name, stats in current["results"].items():
+        before = baseline["results"].get(name)
+        if before and stats["median_ms"] > before["median_ms"] * threshold:
+            regressions.append(
+                f"{name}: median {before['median_ms']:.2f} ms -> "
+                f"{stats['median_ms']:.2f} ms "
+                f"(x{stats['median_ms'] / before['median_ms']:.2f})"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time the application's hot paths.")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument(
+        "--only", nargs="+", choices=[b.name for b in BENCHMARKS], metavar="NAME"
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--output", type=Path, help="results file (JSON)")
+    parser.add_argument("--compare", type=Path, help="baseline results to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="median ratio above which a benchmark counts as a regression",
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url, **engine_options(args.database_url))
+    document = run_benchmarks(engine, args.only, args.repeat, args.warmup)
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f"Results written to {output}.")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = find_regressions(document, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# tests/conftest.py
+
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session
+
+from app.models import Base
+
+
+@pytest.fixture(scope="function")
+def database_url() -> str:
+    """
+    In-memory by default. Modules whose code opens its own connections from
+    other processes override it with a file URL.
+    """
+    return "sqlite:///:memory:"
+
+
+@pytest.fixture(scope="function")
+def engine(database_url: str) -> Generator[Engine, None, None]:
+    """An engine on a fresh database with the schema of the models."""
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def db_session(engine: Engine) -> Generator[Session, None, None]:
+    """
+    A session on the fresh database. Modules seed it by overriding this
+    fixture with one that takes db_session and adds their rows.
+    """
+    session = Session(engine)
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,271 @@
+# tests/test_api.py
+
+from collections.abc import AsyncIterator, Generator
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+import app.api as api
+from app.database import get_async_engine
+from app.migrate import upgrade
+from app.models import (
+    Client,
+    ClientCategory,
+    InventoryMovement,
+    MovementReason,
+    Order,
+    Product,
+    ProductUnit,
+)
+
+
+@pytest.fixture(scope="function")
+def client(tmp_path: Path) -> Generator[TestClient, None, None]:
+    """The API served against a migrated, file-based SQLite database."""
+    url = f"sqlite:///{tmp_path / 'erp.db'}"
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        upgrade(connection)
+    sessions = async_sessionmaker(
+        get_async_engine(url), autoflush=False, expire_on_commit=False
+    )
+
+    async def get_session() -> AsyncIterator[AsyncSession]:
+        async with sessions() as session:
+            yield session
+
+    api.app.dependency_overrides[api.get_session] = get_session
+    with TestClient(api.app) as test_client:
+        test_client.engine = engine  # type: ignore[attr-defined]
+        yield test_client
+    api.app.dependency_overrides.clear()
+    engine.dispose()
+
+
+def test_products_batch_creates_and_updates_by_index(client: TestClient):
+    created = client.post(
+        "/products/batch",
+        json=[
+            {"name": "Bolt", "unit": "pcs", "stock": 100},
+            {"name": "", "unit": "box"},
+            {"name": "Rope", "unit": "m", "vat_rate": 8},
+        ],
+    ).json()
+    assert (created["succeeded"], created["failed"]) == (2, 1)
+    assert created["results"][1]["errors"] == [
+        "Product name is required.",
+        "Unit must be one of: pcs, kg, set, m.",
+    ]
+
+    with Session(client.engine) as db:  # type: ignore[attr-defined]
+        bolt = db.get_one(Product, created["results"][0]["id"])
+        index = bolt.product_index
+    updated = client.post(
+        "/products/batch",
+        json=[
+            {"name": "Hex bolt", "unit": "pcs", "stock": 5, "product_index": index},
+            {"name": "Ghost", "unit": "pcs", "product_index": 999},
+        ],
+    ).json()
+    assert updated["results"][0] == {
+        "index": 0,
+        "ok": True,
+        "id": bolt.id,
+        "invoice_number": None,
+        "errors": [],
+    }
+    assert updated["results"][1]["errors"] == ["Product with index 999 not found."]
+    with Session(client.engine) as db:  # type: ignore[attr-defined]
+        bolt = db.get_one(Product, bolt.id)
+        assert (bolt.name, bolt.stock) == ("Hex bolt", 100)
+        assert db.scalar(select(func.count(Product.id))) == 2
+        # Only the opening stock of the created product is in the ledger.
+        movements = db.execute(
+            select(
+                InventoryMovement.product_id,
+                InventoryMovement.quantity,
+                InventoryMovement.reason,
+            )
+        ).all()
+        assert movements == [(bolt.id, 100.0, MovementReason.RECEIPT)]
+
+
+def test_stock_batches_record_receipts_and_adjustments(client: TestClient):
+    with Session(client.engine) as db:  # type: ignore[attr-defined]
+        db.add(Product(id=1, name="Bolt", product_index=1, unit=ProductUnit.PCS))
+        db.commit()
+
+    received = client.post(
+        "/stock/receipts/batch",
+        json=[
+            {"product_id": 1, "quantity": 10, "note": "Delivery 7"},
+            {"product_id": 2, "quantity": 1},
+        ],
+    ).json()
+    assert [result["ok"] for result in received["results"]] == [True, False]
+    assert received["results"][1]["errors"] == ["Unknown product ids: [2]."]
+    assert (
+        client.post(
+            "/stock/receipts/batch", json=[{"product_id": 1, "quantity": 0}]
+        ).status_code
+        == 422
+    )
+
+    adjusted = client.post(
+        "/stock/adjustments/batch", json=[{"product_id": 1, "counted": 8}]
+    ).json()
+    assert adjusted["succeeded"] == 1
+    with Session(client.engine) as db:  # type: ignore[attr-defined]
+        assert db.get_one(Product, 1).stock == 8
+        movements = db.execute(
+            select(InventoryMovement.quantity, InventoryMovement.reason).order_by(
+                InventoryMovement.id
+            )
+        ).all()
+        assert movements == [
+            (10.0, MovementReason.RECEIPT),
+            (-2.0, MovementReason.ADJUSTMENT),
+        ]
+
+
+def test_clients_batch_upserts_by_vat_id(client: TestClient):
+    company = {"category": "Company", "company_name": "Acme", "vat_id": "5260250274"}
+    first = client.post(
+        "/clients/batch",
+        json=[
+            company,
+            {"category": "Individual", "first_name": "Jan", "last_name": "Kowalski"},
+            {"category": "Company", "company_name": "Bad", "vat_id": "5260250275"},
+        ],
+    ).json()
+    assert (first["succeeded"], first["failed"]) == (2, 1)
+    assert first["results"][2]["errors"] == ["VAT ID (NIP) checksum is invalid."]
+
+    second = client.post(
+        "/clients/batch", json=[{**company, "company_name": "Acme Sp. z o.o."}]
+    ).json()
+    assert second["results"][0]["id"] == first["results"][0]["id"]
+    with Session(client.engine) as db:  # type: ignore[attr-defined]
+        assert db.scalar(select(func.count(Client.id))) == 2
+        acme = db.get_one(Client, first["results"][0]["id"])
+        assert acme.company_name == "Acme Sp. z o.o."
+
+
+def test_orders_and_invoices_batches_report_each_item(client: TestClient):
+    with Session(client.engine) as db:  # type: ignore[attr-defined]
+        db.add_all(
+            [
+                Client(id=1, category=ClientCategory.COMPANY, company_name="Buyer"),
+                Product(
+                    id=1, name="Bolt", product_index=1, unit=ProductUnit.PCS, stock=5
+                ),
+            ]
+        )
+        db.commit()
+
+    orders = client.post(
+        "/orders/batch",
+        json=[
+            {
+                "client_id": 1,
+                "lines": [{"product_id": 1, "quantity": 2, "price_per_unit": 10}],
+            },
+            {
+                "client_id": 1,
+                "lines": [{"product_id": 1, "quantity": 9, "price_per_unit": 10}],
+            },
+            {
+                "client_id": 2,
+                "lines": [{"product_id": 1, "quantity": 1, "price_per_unit": 10}],
+            },
+        ],
+    ).json()
+    assert [result["ok"] for result in orders["results"]] == [True, False, False]
+    assert orders["results"][2]["errors"] == ["Client 2 not found."]
+    with Session(client.engine) as db:  # type: ignore[attr-defined]
+        # The failed orders were rolled back alone.
+        assert db.scalar(select(func.count(Order.id))) == 1
+        assert db.get_one(Product, 1).stock == 3
+
+    order_id = orders["results"][0]["id"]
+    invoices = client.post(
+        "/invoices/batch",
+        json=[
+            {"order_id": order_id, "payment_method": "Cash", "paid": True},
+            {"order_id": order_id},
+            {"order_id": 999},
+        ],
+    ).json()
+    assert invoices["results"][0]["invoice_number"]
+    assert invoices["results"][1]["errors"] == [
+        f"Order #{order_id} is already invoiced."
+    ]
+    assert invoices["results"][2]["errors"] == ["Order #999 not found."]
+
+
+def test_api_checks_token_batch_size_and_health(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    assert client.get("/health").json()["status"] == "ok"
+    assert client.post("/orders/batch", json=[]).status_code == 422
+
+    monkeypatch.setattr(api, "API_TOKEN", "secret")
+    product = [{"name": "Bolt", "unit": "pcs"}]
+    assert client.post("/products/batch", json=product).status_code == 401
+    response = client.post(
+        "/products/batch", json=product, headers={"Authorization": "Bearer secret"}
+    )
+    assert response.json()["succeeded"] == 1
+
+
+def test_order_dates_with_an_offset_are_stored_as_utc(client: TestClient):
+    with Session(client.engine) as db:  # type: ignore[attr-defined]
+        db.add_all(
+            [
+                Client(id=1, category=ClientCategory.COMPANY, company_name="Buyer"),
+                Product(
+                    id=1, name="Bolt", product_index=1, unit=ProductUnit.PCS, stock=5
+                ),
+            ]
+        )
+        db.commit()
+
+    result = client.post(
+        "/orders/batch",
+        json=[
+            {
+                "client_id": 1,
+                "order_date": "2025-03-01T12:30:00+02:00",
+                "lines": [{"product_id": 1, "quantity": 1, "price_per_unit": 10}],
+            },
+            {
+                "client_id": 1,
+                "order_date": "2025-03-01T12:30:00Z",
+                "lines": [{"product_id": 1, "quantity": 1, "price_per_unit": 10}],
+            },
+        ],
+    ).json()
+    with Session(client.engine) as db:  # type: ignore[attr-defined]
+        dates = [db.get_one(Order, item["id"]).order_date for item in result["results"]]
+    assert dates == [datetime(2025, 3, 1, 10, 30), datetime(2025, 3, 1, 12, 30)]
+
+
+def test_database_errors_fail_only_their_item(db_session: Session):
+    def create(client_id: int) -> tuple[int, str | None]:
+        db_session.add(
+            Client(id=client_id, category=ClientCategory.COMPANY, company_name="C")
+        )
+        db_session.flush()
+        return client_id, None
+
+    batch = api._per_item(db_session, [1, 1, 2], create)
+    db_session.commit()
+
+    assert [result.ok for result in batch.results] == [True, False, True]
+    assert batch.results[1].errors == ["Item could not be saved: IntegrityError."]
+    assert db_session.scalar(select(func.count(Client.id))) == 2
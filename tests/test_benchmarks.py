@@ -0,0 +1,58 @@
+# tests/test_benchmarks.py
+
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.importers import valid_nip
+from app.models import Client, InvoiceSequence, Order, OrderItem, SalesMonthlyRollup
+from benchmarks.generate_data import Volumes, seed
+from benchmarks.run import BENCHMARKS, find_regressions, run_benchmarks
+
+
+def test_seed_and_run_every_benchmark(tmp_path: Path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    seed(engine, Volumes(clients=20, products=50, orders=100))
+
+    with Session(engine) as db:
+        assert db.scalar(select(func.count(Order.id))) == 100
+        order_count = db.scalar(select(func.sum(SalesMonthlyRollup.order_count)))
+        assert order_count == 100
+        vat_ids = db.scalars(select(Client.vat_id).where(Client.vat_id.is_not(None)))
+        assert valid_nip(pd.Series(list(vat_ids))).all()
+        # Invoice counters continue after the seeded invoices.
+        invoiced = db.scalar(select(func.count(Order.invoice_number)))
+        assert db.scalar(select(func.sum(InvoiceSequence.last_value))) == invoiced
+        items_gross = db.scalar(
+            select(
+                func.sum(
+                    OrderItem.quantity
+                    * OrderItem.price_per_unit
+                    * (1 + OrderItem.vat_rate / 100)
+                )
+            )
+        )
+        orders_gross = db.scalar(select(func.sum(Order.total_gross)))
+        assert items_gross is not None and orders_gross is not None
+        assert abs(items_gross - orders_gross) < 1
+
+    document = run_benchmarks(engine, repeat=2, warmup=0)
+    assert set(document["results"]) == {b.name for b in BENCHMARKS}
+    assert document["row_counts"]["orders"] == 100
+    assert all(r["runs"] == 2 for r in document["results"].values())
+
+
+def test_find_regressions():
+    baseline = {"results": {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}}}
+    current = {
+        "results": {
+            "a": {"median_ms": 12.0},
+            "b": {"median_ms": 30.0},
+            "c": {"median_ms": 99.0},
+        }
+    }
+    assert find_regressions(current, baseline, threshold=1.25) == [
+        "b: median 10.00 ms -> 30.00 ms (x3.00)"
+    ]
@@ -0,0 +1,127 @@
+# tests/test_bootstrap.py
+
+import logging
+import threading
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine, create_engine, event
+
+import app.bootstrap as bootstrap_module
+from app.bootstrap import bootstrap, read_asset, readiness, wait_for_database
+from app.migrate import upgrade
+
+
+@pytest.fixture(scope="function")
+def sweepers(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """Records overdue sweeper starts instead of starting the thread."""
+    started: list[int] = []
+    monkeypatch.setattr(
+        bootstrap_module, "start_overdue_sweeper", lambda: started.append(1)
+    )
+    return started
+
+
+@pytest.fixture(scope="function")
+def engine(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, sweepers: list[int]
+) -> Generator[Engine, None, None]:
+    """A fresh process state bootstrapping against an empty SQLite database."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'erp.db'}")
+    monkeypatch.setattr(bootstrap_module, "engine", engine)
+    monkeypatch.setattr(bootstrap_module, "_state", None)
+    yield engine
+    engine.dispose()
+
+
+def test_bootstrap_reports_pending_migrations_and_retries(
+    engine: Engine, sweepers: list[int]
+):
+    state = bootstrap()
+    assert not state.ready
+    assert "Run `python -m app.migrate upgrade`" in state.problems[0]
+    assert sweepers == []
+
+    with engine.begin() as connection:
+        upgrade(connection)
+    state = bootstrap()
+    assert state.ready
+    assert state.problems == ()
+    assert {"database", "schema", "assets", "total"} <= set(state.timings_ms)
+    assert sweepers == [1]
+
+
+def test_bootstrap_runs_once_per_process(engine: Engine):
+    with engine.begin() as connection:
+        upgrade(connection)
+    first = bootstrap()
+
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+    assert bootstrap() is first
+    assert readiness() is first
+    assert statements == []
+
+
+def test_wait_for_database_gives_up_after_the_timeout(tmp_path: Path):
+    missing = create_engine(f"sqlite:///{tmp_path / 'missing' / 'erp.db'}")
+    error = wait_for_database(missing, timeout=0)
+    assert error is not None
+    assert "unable to open database file" in error
+
+
+def test_read_asset_reads_each_file_once(tmp_path: Path):
+    css = tmp_path / "style.css"
+    css.write_text("body {}")
+    assert read_asset(str(css)) == "body {}"
+    css.write_text("changed")
+    assert read_asset(str(css)) == "body {}"
+
+
+def test_read_asset_looks_for_a_missing_file_again(tmp_path: Path):
+    css = tmp_path / "style.css"
+    assert read_asset(str(css)) is None
+    css.write_text("body {}")
+    assert read_asset(str(css)) == "body {}"
+
+
+def test_bootstrap_does_not_queue_behind_a_running_attempt(
+    engine: Engine, monkeypatch: pytest.MonkeyPatch
+):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_wait(engine: Engine, timeout: float) -> str:
+        started.set()
+        release.wait(5)
+        return "connection refused"
+
+    monkeypatch.setattr(bootstrap_module, "wait_for_database", slow_wait)
+    attempt = threading.Thread(target=bootstrap)
+    attempt.start()
+    started.wait(5)
+    try:
+        state = bootstrap()
+        assert not state.ready
+        assert "starting" in state.problems[0]
+    finally:
+        release.set()
+        attempt.join()
+    outcome = readiness()
+    assert outcome is not None
+    assert outcome.problems == ("The database is not reachable: connection refused",)
+
+
+def test_bootstrap_sends_app_logs_to_a_handler(
+    engine: Engine, monkeypatch: pytest.MonkeyPatch
+):
+    app_logger = logging.getLogger("app")
+    monkeypatch.setattr(app_logger, "handlers", [])
+    monkeypatch.setattr(app_logger, "level", logging.NOTSET)
+    bootstrap()
+    bootstrap()
+    assert len(app_logger.handlers) == 1
+    assert logging.getLogger("app.instrumentation").isEnabledFor(logging.INFO)
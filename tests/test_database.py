@@ -0,0 +1,118 @@
+# tests/test_database.py
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, func, select, text, update
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.database as database
+from app.database import (
+    ReadOnlySessionError,
+    engine_options,
+    get_engine,
+    session_scope,
+    with_session,
+)
+from app.models import Base, Client, ClientCategory
+
+
+@pytest.fixture(scope="function")
+def file_engine(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Points SessionLocal at a pooled, file-based SQLite database."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'erp.db'}")
+    monkeypatch.setattr(
+        database, "SessionLocal", sessionmaker(autoflush=False, bind=engine)
+    )
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def replica(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Two SQLite files standing in for a primary and a lagging replica."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(engine)
+    monkeypatch.setattr(database, "engine", primary)
+    monkeypatch.setattr(database, "replica_engine", replica)
+    monkeypatch.setattr(
+        database, "SessionLocal", sessionmaker(autoflush=False, bind=primary)
+    )
+    monkeypatch.setattr(database, "_last_write", float("-inf"))
+    yield replica
+    primary.dispose()
+    replica.dispose()
+
+
+def count_clients(db: Session) -> int:
+    return db.scalars(select(func.count(Client.id))).one()
+
+
+def test_read_only_sessions_read_the_replica_except_after_a_write(
+    replica, monkeypatch: pytest.MonkeyPatch
+):
+    with session_scope(read_only=True) as reader:
+        assert reader.get_bind() is replica
+
+    with session_scope() as db:
+        db.add(Client(category=ClientCategory.COMPANY, company_name="New"))
+        db.commit()
+    # The replica has not caught up, but the writer still sees its write.
+    with session_scope(read_only=True) as reader:
+        assert count_clients(reader) == 1
+
+    monkeypatch.setattr(database, "DB_REPLICA_LAG_WINDOW", 0)
+    with session_scope(read_only=True) as reader:
+        assert count_clients(reader) == 0
+
+
+def test_only_commits_that_wrote_pin_reads_to_the_primary(replica):
+    with session_scope() as db:
+        count_clients(db)
+        db.commit()
+    with session_scope(read_only=True) as reader:
+        assert reader.get_bind() is replica
+
+
+def test_read_only_sessions_refuse_to_write(replica):
+    with session_scope(read_only=True) as reader:
+        reader.add(Client(category=ClientCategory.COMPANY, company_name="New"))
+        with pytest.raises(ReadOnlySessionError):
+            reader.flush()
+        reader.rollback()
+        with pytest.raises(ReadOnlySessionError):
+            reader.execute(update(Client).values(company_name="Renamed"))
+
+
+def test_engine_options_configure_pool_for_server_databases():
+    options = engine_options("postgresql://admin:admin@db/erp_db")
+    assert options["pool_pre_ping"] is True
+    assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle"} <= set(options)
+    assert engine_options("sqlite:///:memory:") == {"pool_pre_ping": True}
+
+
+def test_get_engine_is_cached_per_url():
+    assert get_engine("sqlite:///:memory:") is get_engine("sqlite:///:memory:")
+
+
+def test_session_scope_returns_connection_on_interrupt(file_engine):
+    class StopPage(BaseException):
+        """Stands in for Streamlit's st.stop() control-flow exception."""
+
+    with pytest.raises(StopPage), session_scope() as db:
+        db.execute(text("SELECT 1"))
+        assert file_engine.pool.checkedout() == 1
+        raise StopPage
+    assert file_engine.pool.checkedout() == 0
+
+
+def test_with_session_injects_scoped_session(file_engine):
+    @with_session
+    def count_connections(db: Session, offset: int) -> int:
+        db.execute(text("SELECT 1"))
+        return file_engine.pool.checkedout() + offset
+
+    assert count_connections(10) == 11
+    assert file_engine.pool.checkedout() == 0
@@ -0,0 +1,141 @@
+# tests/test_importers.py
+
+import io
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.importers import ImportReport, import_clients, import_products, valid_nip
+from app.models import (
+    Client,
+    ClientCategory,
+    InventoryMovement,
+    MovementReason,
+    Product,
+    ProductUnit,
+)
+
+
+def csv_file(text: str) -> io.BytesIO:
+    return io.BytesIO(text.strip().encode())
+
+
+def test_valid_nip_checks_polish_checksum():
+    vat_ids = pd.Series(["5260250274", "PL5260250274", "5260250275", "DE123456789"])
+    assert valid_nip(vat_ids).tolist() == [True, True, False, True]
+
+
+def test_import_products_in_chunks_reports_row_errors(db_session: Session):
+    db_session.add(Product(name="Existing", product_index=7, unit=ProductUnit.PCS))
+    db_session.commit()
+    source = csv_file(
+        """
+name,unit,stock,vat_rate
+Bolt,pcs,10,23
+Rope,m,,8
+,pcs,1,23
+Sugar,kg,5,7
+Screws,box,1,23
+Nails,set,-1,0
+Glue,KG,2.5,5
+"""
+    )
+    progress: list[ImportReport] = []
+    report = import_products(
+        db_session, source, "products.csv", chunk_size=3, progress=progress.append
+    )
+
+    assert report.imported == 3
+    assert [(e.row, e.message.split()[0]) for e in report.errors] == [
+        (4, "Product"),
+        (5, "VAT"),
+        (6, "Unit"),
+        (7, "Stock"),
+    ]
+    assert len(progress) == 3
+    products = db_session.scalars(select(Product).order_by(Product.product_index)).all()
+    assert [(p.name, p.product_index, p.unit) for p in products] == [
+        ("Existing", 7, ProductUnit.PCS),
+        ("Bolt", 8, ProductUnit.PCS),
+        ("Rope", 9, ProductUnit.M),
+        ("Glue", 10, ProductUnit.KG),
+    ]
+    assert products[2].stock == 0.0
+
+
+def test_imported_stock_is_recorded_as_receipts(db_session: Session):
+    source = csv_file("name,unit,stock,vat_rate\nBolt,pcs,10,23\nRope,m,0,8\n")
+    import_products(db_session, source, "products.csv")
+
+    movements = db_session.execute(
+        select(Product.name, InventoryMovement.quantity, InventoryMovement.reason)
+        .join(Product)
+        .order_by(Product.name)
+    ).all()
+    assert movements == [("Bolt", 10.0, MovementReason.RECEIPT)]
+
+
+def test_failed_chunk_reports_only_the_rows_it_tried_to_save(db_session: Session):
+    db_session.execute(
+        text(
+            "CREATE TRIGGER reject_boom BEFORE INSERT ON products "
+            "WHEN NEW.name = 'Boom' BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        )
+    )
+    source = csv_file(
+        """
+name,unit,stock,vat_rate
+Bolt,pcs,10,23
+,pcs,1,23
+Boom,pcs,1,23
+Glue,kg,2,5
+"""
+    )
+    report = import_products(db_session, source, "products.csv", chunk_size=3)
+
+    assert report.imported == 1
+    assert [(e.row, e.message.split()[0]) for e in report.errors] == [
+        (2, "Chunk"),
+        (3, "Product"),
+        (4, "Chunk"),
+    ]
+    assert db_session.scalars(select(Product.name)).all() == ["Glue"]
+
+
+def test_import_clients_validates_vat_ids(db_session: Session, tmp_path: Path):
+    db_session.add(
+        Client(category=ClientCategory.COMPANY, company_name="Old", vat_id="5260250274")
+    )
+    db_session.commit()
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(
+        ["category", "company_name", "vat_id", "first_name", "last_name", "email"]
+    )
+    sheet.append(["Company", "New Co", "PL 123-456-32-18", None, None, "a@b.pl"])
+    sheet.append(["Company", "Dup Co", "5260250274", None, None, None])
+    sheet.append(["Company", "Bad Co", "1234567890", None, None, None])
+    sheet.append(["individual", None, None, "Jan", "Kowalski", "not-an-email"])
+    sheet.append(["Individual", None, None, "Anna", "Nowak", None])
+    path = tmp_path / "clients.xlsx"
+    workbook.save(path)
+
+    report = import_clients(db_session, str(path), "clients.xlsx")
+
+    assert report.imported == 2
+    assert [error.row for error in report.errors] == [3, 4, 5]
+    names = sorted(c.display_name for c in db_session.scalars(select(Client)))
+    assert names == ["Anna Nowak", "New Co", "Old"]
+    new_client = db_session.scalars(
+        select(Client).filter_by(company_name="New Co")
+    ).one()
+    assert new_client.vat_id == "PL1234563218"
+
+
+def test_import_rejects_files_without_required_columns(db_session: Session):
+    with pytest.raises(ValueError, match="unit"):
+        import_products(db_session, csv_file("name\nBolt"), "products.csv")
@@ -0,0 +1,86 @@
+# tests/test_instrumentation.py
+
+import json
+import logging
+
+import pytest
+from sqlalchemy import Engine, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+import app.instrumentation as instrumentation
+from app.instrumentation import instrument_engine, track_queries
+from app.models import Client, ClientCategory, Order
+
+
+@pytest.fixture(scope="function")
+def engine(engine: Engine) -> Engine:
+    instrument_engine(engine)
+    instrument_engine(engine)  # listeners are attached only once
+    return engine
+
+
+def test_track_queries_counts_statements_and_flags_repeats(engine, caplog):
+    with Session(engine) as db:
+        client = Client(category=ClientCategory.COMPANY, company_name="ACME")
+        db.add_all([Order(client=client) for _ in range(6)])
+        db.commit()
+        order_ids = list(db.scalars(select(Order.id)))
+        db.expunge_all()
+
+        caplog.set_level(logging.INFO, logger="app.instrumentation")
+        with track_queries("Orders") as rerun:
+            # A lazy load per order: the classic N+1.
+            for order_id in order_ids:
+                db.get(Order, order_id)
+            db.execute(text("SELECT 1"))
+
+    assert rerun.count == 7
+    repeated = rerun.repeated()
+    assert len(repeated) == 1
+    assert next(iter(repeated.values())).count == 6
+    events = [json.loads(record.getMessage()) for record in caplog.records]
+    assert events[0] | {"rerun_ms": 0, "sql_ms": 0} == {
+        "event": "rerun_queries",
+        "page": "Orders",
+        "rerun_ms": 0,
+        "statements": 7,
+        "sql_ms": 0,
+        "slow_queries": 0,
+    }
+    assert events[1]["event"] == "repeated_statement"
+    assert events[1]["count"] == 6
+
+
+def test_slow_queries_are_logged_with_parameters(engine, caplog, monkeypatch):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0)
+    with engine.connect() as connection, track_queries("Reports") as rerun:
+        connection.execute(text("SELECT :value"), {"value": 42})
+
+    assert len(rerun.slow_queries) == 1
+    slow = [
+        json.loads(record.getMessage())
+        for record in caplog.records
+        if "slow_query" in record.getMessage()
+    ]
+    assert slow[0]["page"] == "Reports"
+    assert slow[0]["statement"] == "SELECT ?"
+    assert "42" in slow[0]["parameters"]
+
+
+def test_statements_outside_a_rerun_are_not_tracked(engine):
+    with track_queries("Orders") as rerun:
+        pass
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert rerun.count == 0
+
+
+def test_failed_statements_do_not_leave_a_start_time_behind(engine):
+    with engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM missing_table"))
+        assert connection.info["query_started"] == []
+        with track_queries("Orders") as rerun:
+            connection.execute(text("SELECT 1"))
+    assert rerun.count == 1
@@ -0,0 +1,141 @@
+# tests/test_inventory.py
+
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.inventory import (
+    InsufficientStockError,
+    adjust_stock,
+    receive_stock,
+    record_opening_stock,
+    reserve_stock,
+)
+from app.models import (
+    InventoryMovement,
+    MovementReason,
+    Product,
+    ProductUnit,
+)
+
+
+@pytest.fixture(scope="function")
+def db_session(db_session: Session) -> Session:
+    db_session.add_all(
+        [
+            Product(id=1, name="Bolt", product_index=1, unit=ProductUnit.PCS, stock=10),
+            Product(id=2, name="Rope", product_index=2, unit=ProductUnit.M, stock=2.5),
+        ]
+    )
+    db_session.commit()
+    return db_session
+
+
+def test_reserve_stock_decrements_and_records_movements(db_session: Session):
+    bolt = db_session.get(Product, 1)
+    reserve_stock(db_session, [(1, 3), (2, 2.5), (1, 4)])
+    db_session.commit()
+
+    assert bolt is not None and bolt.stock == 3
+    assert db_session.get(Product, 2).stock == 0  # type: ignore[union-attr]
+    movements = db_session.execute(
+        select(
+            InventoryMovement.product_id,
+            InventoryMovement.quantity,
+            InventoryMovement.reason,
+        ).order_by(InventoryMovement.product_id)
+    ).all()
+    assert movements == [
+        (1, -7.0, MovementReason.ORDER),
+        (2, -2.5, MovementReason.ORDER),
+    ]
+
+
+def test_reserve_stock_is_all_or_nothing(db_session: Session):
+    with pytest.raises(InsufficientStockError) as excinfo:
+        reserve_stock(db_session, [(1, 5), (2, 3)])
+    db_session.rollback()
+
+    assert excinfo.value.shortages == {"Rope": (3, 2.5)}
+    assert "Rope (requested 3, available 2.5)" in str(excinfo.value)
+    assert [
+        p.stock for p in db_session.scalars(select(Product).order_by(Product.id))
+    ] == [
+        10,
+        2.5,
+    ]
+    assert db_session.scalars(select(InventoryMovement)).first() is None
+
+
+def test_reserve_stock_rejects_unknown_products(db_session: Session):
+    with pytest.raises(ValueError, match="Unknown product"):
+        reserve_stock(db_session, [(99, 1)])
+
+
+def test_receive_stock_adds_and_records_receipts(db_session: Session):
+    bolt = db_session.get_one(Product, 1)
+    receive_stock(db_session, [(1, 5), (2, 1.5), (1, 1)], note="Delivery 7")
+    db_session.commit()
+
+    assert bolt.stock == 16
+    assert db_session.get_one(Product, 2).stock == 4
+    movements = db_session.execute(
+        select(
+            InventoryMovement.product_id,
+            InventoryMovement.quantity,
+            InventoryMovement.reason,
+            InventoryMovement.note,
+        ).order_by(InventoryMovement.product_id)
+    ).all()
+    assert movements == [
+        (1, 6.0, MovementReason.RECEIPT, "Delivery 7"),
+        (2, 1.5, MovementReason.RECEIPT, "Delivery 7"),
+    ]
+
+
+def test_receive_stock_rejects_unknown_products_and_non_positive_quantities(
+    db_session: Session,
+):
+    with pytest.raises(ValueError, match=r"Unknown product ids: \[99\]"):
+        receive_stock(db_session, [(1, 1), (99, 1)])
+    db_session.rollback()
+    with pytest.raises(ValueError, match="positive"):
+        receive_stock(db_session, [(1, 0)])
+
+    assert db_session.get_one(Product, 1).stock == 10
+    assert db_session.scalars(select(InventoryMovement)).first() is None
+
+
+def test_adjust_stock_records_the_counted_difference(db_session: Session):
+    assert adjust_stock(db_session, 1, 7, note="Stocktake") == -3
+    assert adjust_stock(db_session, 2, 2.5) == 0
+    db_session.commit()
+
+    assert db_session.get_one(Product, 1).stock == 7
+    movements = db_session.execute(
+        select(InventoryMovement.product_id, InventoryMovement.quantity)
+    ).all()
+    assert movements == [(1, -3.0)]
+    with pytest.raises(ValueError, match="negative"):
+        adjust_stock(db_session, 1, -1)
+    with pytest.raises(ValueError, match="Unknown product"):
+        adjust_stock(db_session, 99, 1)
+
+
+def test_record_opening_stock_receives_the_stock_of_new_products(
+    db_session: Session,
+):
+    db_session.add(Product(id=3, name="Nut", product_index=3, unit=ProductUnit.PCS))
+    db_session.flush()
+    record_opening_stock(db_session, [1, 3])
+    db_session.commit()
+
+    movements = db_session.execute(
+        select(
+            InventoryMovement.product_id,
+            InventoryMovement.quantity,
+            InventoryMovement.reason,
+        )
+    ).all()
+    assert movements == [(1, 10.0, MovementReason.RECEIPT)]
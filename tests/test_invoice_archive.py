@@ -0,0 +1,104 @@
+# tests/test_invoice_archive.py
+
+import hashlib
+import os
+import stat
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import app.invoice_archive as invoice_archive
+from app.invoice_archive import (
+    archive_path,
+    enqueue_missing_documents,
+    open_invoice_document,
+    record_invoice_document,
+    store_pdf,
+    verify_invoice_document,
+)
+from app.models import (
+    Client,
+    ClientCategory,
+    CompanyProfile,
+    Order,
+    OrderItem,
+    PaymentMethod,
+    Product,
+    ProductUnit,
+    RenderJob,
+)
+from app.order_service import OrderService
+
+
+@pytest.fixture(scope="function")
+def archive(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(invoice_archive, "INVOICE_ARCHIVE_DIR", tmp_path / "archive")
+    return tmp_path / "archive"
+
+
+@pytest.fixture(scope="function")
+def db_session(db_session: Session) -> Session:
+    client = Client(category=ClientCategory.COMPANY, company_name="Buyer")
+    product = Product(name="Widget", product_index=1, unit=ProductUnit.PCS)
+    db_session.add_all([client, product, CompanyProfile(company_name="Seller")])
+    for number, invoice_number in [(1, "FV/1/3/2025"), (2, "FV/2/3/2025"), (3, None)]:
+        order = Order(id=number, client=client, invoice_number=invoice_number)
+        order.items.append(
+            OrderItem(product=product, quantity=1, price_per_unit=10.0, vat_rate=23.0)
+        )
+        db_session.add(order)
+    db_session.commit()
+    return db_session
+
+
+def test_store_pdf_writes_each_content_once_and_read_only(archive: Path):
+    sha256 = store_pdf(b"%PDF first")
+    path = archive_path(sha256)
+    assert sha256 == hashlib.sha256(b"%PDF first").hexdigest()
+    assert path.parent.parent == archive
+    assert path.read_bytes() == b"%PDF first"
+    assert not path.stat().st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+    modified = path.stat().st_mtime_ns
+    assert store_pdf(b"%PDF first") == sha256
+    assert path.stat().st_mtime_ns == modified
+
+
+def test_the_first_archived_document_of_an_order_is_final(
+    archive: Path, db_session: Session
+):
+    first = record_invoice_document(db_session, 1, store_pdf(b"%PDF issued"))
+    later = record_invoice_document(db_session, 1, store_pdf(b"%PDF re-rendered"))
+    assert later is first
+    assert (first.invoice_number, first.size_bytes) == ("FV/1/3/2025", 11)
+    with open_invoice_document(first) as f:
+        assert f.read() == b"%PDF issued"
+
+
+def test_verify_detects_modified_and_missing_files(archive: Path, db_session: Session):
+    document = record_invoice_document(db_session, 1, store_pdf(b"%PDF issued"))
+    assert verify_invoice_document(document) is None
+
+    path = archive_path(document.sha256)
+    os.chmod(path, stat.S_IWUSR | stat.S_IRUSR)
+    path.write_bytes(b"%PDF forged")
+    problem = verify_invoice_document(document)
+    assert problem is not None and "checksum mismatch" in problem
+    path.unlink()
+    problem = verify_invoice_document(document)
+    assert problem is not None and "is missing" in problem
+
+
+def test_invoices_are_queued_for_the_archive(archive: Path, db_session: Session):
+    # Issued before the archive existed.
+    record_invoice_document(db_session, 1, store_pdf(b"%PDF issued"))
+    assert enqueue_missing_documents(db_session) == 1
+
+    OrderService(db_session).issue_invoice(
+        db_session.get_one(Order, 3), date(2025, 4, 1), PaymentMethod.CASH
+    )
+    queued = db_session.scalars(select(RenderJob.order_id).order_by(RenderJob.id))
+    assert queued.all() == [2, 3]
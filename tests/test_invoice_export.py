@@ -0,0 +1,154 @@
+# tests/test_invoice_export.py
+
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import app.invoice_archive as invoice_archive
+import app.invoice_export as invoice_export
+from app.invoice_archive import (
+    archive_path,
+    open_invoice_document,
+    record_invoice_document,
+    store_pdf,
+)
+from app.invoice_export import (
+    ExportProgress,
+    export_invoices_zip,
+    select_invoices_for_export,
+)
+from app.models import (
+    Client,
+    ClientCategory,
+    CompanyProfile,
+    InvoiceDocument,
+    Order,
+    OrderItem,
+    Product,
+    ProductUnit,
+)
+from app.utils import invoice_file_name
+
+
+@pytest.fixture(scope="function")
+def database_url(tmp_path: Path) -> str:
+    return f"sqlite:///{tmp_path / 'erp.db'}"
+
+
+@pytest.fixture(scope="function")
+def archive(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """An archive directory seen by this process and by the worker processes."""
+    monkeypatch.setenv("INVOICE_ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(invoice_archive, "INVOICE_ARCHIVE_DIR", tmp_path / "archive")
+    return tmp_path / "archive"
+
+
+@pytest.fixture(scope="function")
+def db_session(db_session: Session) -> Session:
+    """Seeds a file-based SQLite database that worker processes can open."""
+    client = Client(category=ClientCategory.COMPANY, company_name="Buyer", vat_id="PL1")
+    product = Product(name="Widget", product_index=1, unit=ProductUnit.PCS)
+    db_session.add_all([client, product, CompanyProfile(company_name="Seller")])
+    for number, day in [(1, 5), (2, 12), (3, 20)]:
+        order = Order(
+            client=client,
+            invoice_number=f"FV/{number}/3/2025",
+            order_date=datetime(2025, 3, day),
+        )
+        order.items.append(
+            OrderItem(product=product, quantity=1, price_per_unit=10.0, vat_rate=23.0)
+        )
+        db_session.add(order)
+    db_session.add(Order(client=client, order_date=datetime(2025, 3, 25)))
+    db_session.commit()
+    return db_session
+
+
+def test_select_invoices_by_date_range(db_session: Session):
+    selected = select_invoices_for_export(
+        db_session, date_from=datetime(2025, 3, 10), date_to=datetime(2025, 3, 31)
+    )
+    assert [number for _, number in selected] == ["FV/2/3/2025", "FV/3/3/2025"]
+
+
+def test_select_invoices_by_number_range(db_session: Session):
+    selected = select_invoices_for_export(
+        db_session, first_number="FV/1/3/2025", last_number="FV/2/3/2025"
+    )
+    assert [number for _, number in selected] == ["FV/1/3/2025", "FV/2/3/2025"]
+
+
+def test_select_invoices_rejects_cross_period_range(db_session: Session):
+    with pytest.raises(ValueError):
+        select_invoices_for_export(
+            db_session, first_number="FV/1/3/2025", last_number="FV/2/4/2025"
+        )
+
+
+def test_export_invoices_zip(
+    db_session: Session, database_url: str, tmp_path: Path, archive: Path
+):
+    order_ids = [order_id for order_id, _ in select_invoices_for_export(db_session)]
+    record_invoice_document(db_session, order_ids[0], store_pdf(b"%PDF archived"))
+    db_session.commit()
+    updates: list[ExportProgress] = []
+    destination = tmp_path / "invoices.zip"
+
+    result = export_invoices_zip(
+        order_ids,
+        str(destination),
+        database_url=database_url,
+        max_workers=2,
+        progress=updates.append,
+    )
+
+    assert result.exported == 3
+    assert result.failed == []
+    assert updates[-1] == ExportProgress(done=3, total=3, failed=0)
+    with zipfile.ZipFile(destination) as exported:
+        assert sorted(exported.namelist()) == [
+            "Faktura_FV-1-3-2025.pdf",
+            "Faktura_FV-2-3-2025.pdf",
+            "Faktura_FV-3-3-2025.pdf",
+        ]
+        # The archived PDF is exported as is; the others are archived on
+        # their first render and exported from the archive.
+        assert exported.read("Faktura_FV-1-3-2025.pdf") == b"%PDF archived"
+        documents = db_session.scalars(select(InvoiceDocument)).all()
+        assert len(documents) == 3
+        for document in documents:
+            with open_invoice_document(document) as f:
+                file_name = invoice_file_name(document.invoice_number)
+                assert exported.read(file_name) == f.read()
+
+
+def test_archived_invoices_are_exported_without_a_process_pool(
+    db_session: Session,
+    database_url: str,
+    tmp_path: Path,
+    archive: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    order_ids = [order_id for order_id, _ in select_invoices_for_export(db_session)]
+    documents = [
+        record_invoice_document(db_session, order_id, store_pdf(f"%PDF {n}".encode()))
+        for n, order_id in enumerate(order_ids)
+    ]
+    db_session.commit()
+    archive_path(documents[2].sha256).unlink()
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("No invoice needed a render.")
+
+    monkeypatch.setattr(invoice_export, "ProcessPoolExecutor", no_pool)
+    destination = tmp_path / "invoices.zip"
+    result = export_invoices_zip(order_ids, str(destination), database_url)
+
+    assert result.exported == 2
+    assert [order_id for order_id, _ in result.failed] == [order_ids[2]]
+    with zipfile.ZipFile(destination) as exported:
+        assert exported.read("Faktura_FV-2-3-2025.pdf") == b"%PDF 1"
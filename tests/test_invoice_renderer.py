@@ -0,0 +1,92 @@
+# tests/test_invoice_renderer.py
+
+import os
+from datetime import datetime
+from pathlib import Path
+
+from app.invoice_renderer import InvoiceRenderer
+from app.models import (
+    Client,
+    ClientCategory,
+    CompanyProfile,
+    Order,
+    OrderItem,
+    PaymentMethod,
+    PaymentStatus,
+    Product,
+    ProductUnit,
+    calculate_order_totals,
+)
+
+
+def make_renderer(tmp_path: Path) -> InvoiceRenderer:
+    template = tmp_path / "invoice.html"
+    stylesheet = tmp_path / "invoice.css"
+    template.write_text("<h1>Invoice {{ number }}</h1>")
+    stylesheet.write_text("h1 { color: #333; }")
+    return InvoiceRenderer(template_path=str(template), stylesheet_path=str(stylesheet))
+
+
+def test_renderer_reuses_compiled_template(tmp_path: Path):
+    renderer = make_renderer(tmp_path)
+    assert renderer.render_html({"number": "FV/1/1/2025"}) == (
+        "<h1>Invoice FV/1/1/2025</h1>"
+    )
+    assert renderer.reload_if_changed() is False
+
+
+def test_renderer_hot_reloads_changed_template(tmp_path: Path):
+    renderer = make_renderer(tmp_path)
+    fingerprint = renderer.fingerprint
+    template = tmp_path / "invoice.html"
+    template.write_text("<h2>Faktura {{ number }}</h2>")
+    stat = template.stat()
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert renderer.reload_if_changed() is True
+    assert renderer.render_html({"number": "FV/2/1/2025"}) == (
+        "<h2>Faktura FV/2/1/2025</h2>"
+    )
+    assert renderer.fingerprint != fingerprint
+
+
+def test_invoice_template_lists_vat_per_rate():
+    bolt = Product(name="Bolt", unit=ProductUnit.PCS)
+    items = [
+        OrderItem(product=bolt, quantity=2, price_per_unit=10.0, vat_rate=23),
+        OrderItem(product=bolt, quantity=1, price_per_unit=5.0, vat_rate=8),
+    ]
+    totals = calculate_order_totals(
+        (i.quantity, i.price_per_unit, i.vat_rate) for i in items
+    )
+    order = Order(
+        invoice_number="FV/1/1/2025",
+        order_date=datetime(2025, 1, 2),
+        client=Client(category=ClientCategory.COMPANY, company_name="Buyer"),
+        items=items,
+        payment_method=PaymentMethod.CASH,
+        payment_status=PaymentStatus.PAID,
+    )
+
+    html = InvoiceRenderer().render_html(
+        {
+            "order": order,
+            "company": CompanyProfile(company_name="Seller"),
+            "summary": {
+                "total_net": totals.total_net,
+                "total_vat": totals.total_vat,
+                "total_gross": totals.total_gross,
+                "vat_breakdown": totals.vat_breakdown,
+                "total_in_words": "",
+            },
+        }
+    )
+    rows = [" ".join(row.split("</tr>")[0].split()) for row in html.split("<tr>")]
+    assert (
+        '<td class="center">23%</td> <td class="right">20.00 PLN</td> '
+        '<td class="right">4.60 PLN</td> <td class="right">24.60 PLN</td>' in rows
+    )
+    assert (
+        '<td class="center">8%</td> <td class="right">5.00 PLN</td> '
+        '<td class="right">0.40 PLN</td> <td class="right">5.40 PLN</td>' in rows
+    )
@@ -0,0 +1,260 @@
+# tests/test_migrations.py
+
+from collections.abc import Generator
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Engine,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy import Enum as SAEnum
+from sqlalchemy.orm import Session
+
+from app.migrate import check, current_revision, head_revision, upgrade
+from app.models import (
+    InventoryMovement,
+    InvoiceSequence,
+    MovementReason,
+    Order,
+    SalesMonthlyRollup,
+    SalesVatRollup,
+)
+from app.utils import get_next_product_index
+
+
+@pytest.fixture(scope="function")
+def engine(tmp_path: Path) -> Generator[Engine, None, None]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'erp.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_builds_the_schema_of_the_models(engine: Engine):
+    with engine.begin() as connection:
+        upgrade(connection)
+    with engine.connect() as connection:
+        assert current_revision(connection) == head_revision()
+        assert check(connection) == []
+        indexes = {index["name"] for index in inspect(connection).get_indexes("orders")}
+        assert {"ix_orders_order_date_id", "ix_orders_client_id_order_date_id"} <= (
+            indexes
+        )
+
+
+def pre_migration_metadata() -> MetaData:
+    """The tables of app/models.py before migrations, as create_all built them."""
+    metadata = MetaData()
+    Table(
+        "clients",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column(
+            "category",
+            SAEnum("COMPANY", "INDIVIDUAL", name="clientcategory"),
+            nullable=False,
+        ),
+        Column("company_name", String, index=True),
+        Column("vat_id", String, unique=True, index=True),
+        *(
+            Column(name, String)
+            for name in (
+                "first_name",
+                "last_name",
+                "email",
+                "phone_number",
+                "address_street",
+                "address_zipcode",
+                "address_city",
+            )
+        ),
+        Column(
+            "client_type",
+            SAEnum("RECIPIENT", "SUPPLIER", name="clienttype"),
+            nullable=False,
+        ),
+    )
+    Table(
+        "products",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("name", String, index=True, nullable=False),
+        Column("product_index", BigInteger, unique=True, index=True, nullable=False),
+        Column(
+            "unit", SAEnum("PCS", "KG", "SET", "M", name="productunit"), nullable=False
+        ),
+        Column("stock", Float, nullable=False),
+        Column("vat_rate", Float, nullable=False),
+    )
+    Table(
+        "orders",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("invoice_number", String, unique=True, index=True, nullable=True),
+        Column("payment_due_date", DateTime, nullable=True),
+        Column(
+            "payment_status",
+            SAEnum("UNPAID", "PAID", "OVERDUE", name="paymentstatus"),
+            nullable=False,
+        ),
+        Column(
+            "payment_method",
+            SAEnum("BANK_TRANSFER", "CASH", "CARD", name="paymentmethod"),
+            nullable=True,
+        ),
+        Column("order_date", DateTime, nullable=False),
+        Column("client_id", ForeignKey("clients.id"), nullable=False),
+    )
+    Table(
+        "order_items",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("order_id", ForeignKey("orders.id"), nullable=False),
+        Column("product_id", ForeignKey("products.id"), nullable=False),
+        Column("quantity", Float, nullable=False),
+        Column("price_per_unit", Float, nullable=False),
+        Column("vat_rate", Float, nullable=False),
+    )
+    Table(
+        "company_profile",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        *(
+            Column(name, String)
+            for name in (
+                "company_name",
+                "vat_id",
+                "address_street",
+                "address_zipcode",
+                "address_city",
+                "bank_account_number",
+            )
+        ),
+        Column("additional_info", Text),
+    )
+    return metadata
+
+
+def test_upgrade_adopts_a_database_built_by_create_all(engine: Engine):
+    metadata = pre_migration_metadata()
+    metadata.create_all(engine)
+    tables = metadata.tables
+    with engine.begin() as connection:
+        connection.execute(
+            insert(tables["clients"]),
+            [{"id": 1, "category": "COMPANY", "client_type": "RECIPIENT"}],
+        )
+        connection.execute(
+            insert(tables["products"]),
+            [
+                {
+                    "id": 1,
+                    "name": "Bolt",
+                    "product_index": 7,
+                    "unit": "PCS",
+                    "stock": 10,
+                    "vat_rate": 23,
+                }
+            ],
+        )
+        connection.execute(
+            insert(tables["orders"]),
+            [
+                {
+                    "id": 1,
+                    "invoice_number": "FV/3/1/2025",
+                    "payment_status": "PAID",
+                    "order_date": datetime(2025, 1, 5),
+                    "client_id": 1,
+                },
+                {
+                    "id": 2,
+                    "invoice_number": None,
+                    "payment_status": "UNPAID",
+                    "order_date": datetime(2025, 1, 6),
+                    "client_id": 1,
+                },
+            ],
+        )
+        connection.execute(
+            insert(tables["order_items"]),
+            [
+                {
+                    "order_id": order_id,
+                    "product_id": 1,
+                    "quantity": quantity,
+                    "price_per_unit": price,
+                    "vat_rate": vat_rate,
+                }
+                for order_id, quantity, price, vat_rate in [
+                    (1, 2, 10, 23),
+                    (1, 1, 5, 8),
+                    (2, 1, 10, 23),
+                ]
+            ],
+        )
+
+    with engine.begin() as connection:
+        upgrade(connection)
+    with engine.connect() as connection:
+        assert check(connection) == []
+    with Session(engine) as db:
+        first = db.get_one(Order, 1)
+        assert (first.total_net, first.total_vat, first.total_gross) == (
+            25.0,
+            5.0,
+            30.0,
+        )
+        assert first.vat_breakdown["8"] == {"net": 5.0, "vat": 0.4, "gross": 5.4}
+        month = db.get_one(SalesMonthlyRollup, (2025, 1))
+        assert (month.order_count, month.invoice_count, month.total_gross) == (
+            2,
+            1,
+            42.3,
+        )
+        assert db.get_one(SalesVatRollup, 23.0).order_count == 2
+        assert db.get_one(InvoiceSequence, ("FV", 2025, 1)).last_value == 3
+        assert get_next_product_index(db) == 8
+        # The stock the ledger did not record is an opening balance.
+        assert db.execute(
+            select(
+                InventoryMovement.product_id,
+                InventoryMovement.quantity,
+                InventoryMovement.reason,
+            )
+        ).all() == [(1, 10.0, MovementReason.ADJUSTMENT)]
+
+
+def test_check_reports_drift_between_models_and_database(engine: Engine):
+    with engine.begin() as connection:
+        upgrade(connection)
+        connection.execute(text("DROP INDEX ix_order_items_order_id"))
+    with engine.connect() as connection:
+        problems = check(connection)
+    assert len(problems) == 1
+    assert "ix_order_items_order_id" in problems[0]
+
+
+def test_check_reports_a_database_behind_the_code(engine: Engine):
+    with engine.begin() as connection:
+        upgrade(connection, "0001")
+    with engine.connect() as connection:
+        problems = check(connection)
+    assert problems[0] == (
+        f"Database is at revision 0001, the code expects {head_revision()}."
+    )
@@ -1,6 +1,17 @@
 # tests/test_models.py (CLEANED VERSION)
 
-from app.models import Client, ClientCategory
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Client,
+    ClientCategory,
+    Order,
+    OrderItem,
+    Product,
+    ProductUnit,
+    calculate_order_totals,
+)
 
 
 def test_client_creation():
@@ -27,3 +38,47 @@ def test_client_repr():
     )
     expected_repr = "<Client(id=None, name='Jan Kowalski')>"
     assert repr(client) == expected_repr
+
+
+def test_calculate_order_totals_breaks_down_vat_rates():
+    totals = calculate_order_totals([(2, 10.0, 23.0), (1, 5.0, 8.0), (1, 10.0, 23.0)])
+    assert (totals.total_net, totals.total_vat, totals.total_gross) == (
+        35.0,
+        7.3,
+        42.3,
+    )
+    assert totals.vat_breakdown == {
+        "23": {"net": 30.0, "vat": 6.9, "gross": 36.9},
+        "8": {"net": 5.0, "vat": 0.4, "gross": 5.4},
+    }
+
+
+def test_order_totals_follow_item_changes(db_session: Session):
+    client = Client(category=ClientCategory.COMPANY, company_name="Buyer")
+    product = Product(name="Widget", product_index=1, unit=ProductUnit.PCS)
+    order = Order(client=client)
+    order.items.append(
+        OrderItem(product=product, quantity=2, price_per_unit=10, vat_rate=23)
+    )
+    db_session.add(order)
+    db_session.commit()
+    assert (order.total_net, order.total_gross) == (20.0, 24.6)
+
+    # Items added by foreign key only are picked up as well.
+    db_session.add(
+        OrderItem(
+            order_id=order.id,
+            product=product,
+            quantity=1,
+            price_per_unit=5,
+            vat_rate=8,
+        )
+    )
+    db_session.flush()
+    assert order.total_net == 25.0
+    assert set(order.vat_breakdown) == {"23", "8"}
+
+    db_session.delete(order.items[0])
+    db_session.commit()
+    stored = db_session.execute(select(Order.total_net, Order.total_gross)).one()
+    assert tuple(stored) == (5.0, 5.4)
@@ -0,0 +1,89 @@
+# tests/test_order_export.py
+
+import csv
+import io
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Client,
+    ClientCategory,
+    Order,
+    OrderItem,
+    PaymentStatus,
+    Product,
+    ProductUnit,
+)
+from app.order_export import EXPORT_SCHEMA, export_orders, iter_order_rows
+
+
+@pytest.fixture(scope="function")
+def db_session(db_session: Session) -> Session:
+    client = Client(category=ClientCategory.COMPANY, company_name="Buyer", vat_id="PL1")
+    bolt = Product(name="Bolt", product_index=1, unit=ProductUnit.PCS)
+    rope = Product(name="Rope", product_index=2, unit=ProductUnit.M)
+    for day in range(1, 6):
+        order = Order(client=client, order_date=datetime(2025, 3, day))
+        order.items.append(
+            OrderItem(product=bolt, quantity=day, price_per_unit=10.0, vat_rate=23.0)
+        )
+        order.items.append(
+            OrderItem(product=rope, quantity=2, price_per_unit=1.5, vat_rate=8.0)
+        )
+        db_session.add(order)
+    db_session.add(Order(client=client, order_date=datetime(2025, 3, 6)))
+    db_session.commit()
+    return db_session
+
+
+def test_rows_are_read_in_fixed_size_batches(db_session: Session):
+    batches = list(iter_order_rows(db_session, batch_size=4))
+    assert [len(batch) for batch in batches] == [4, 4, 3]
+    first = dict(zip(EXPORT_SCHEMA.names, batches[0][0], strict=True))
+    assert first["payment_status"] == PaymentStatus.UNPAID.value
+    assert first["unit"] == "pcs"
+    assert first["line_net"] == 10.0
+    assert first["line_gross"] == pytest.approx(12.3)
+    # The order without items is exported with empty item fields.
+    assert batches[-1][-1][EXPORT_SCHEMA.names.index("product_name")] is None
+
+
+def test_export_orders_to_csv(db_session: Session):
+    buffer = io.StringIO()
+    progress: list[int] = []
+    written = export_orders(
+        db_session,
+        buffer,
+        "csv",
+        batch_size=3,
+        date_from=datetime(2025, 3, 2),
+        date_to=datetime(2025, 3, 3, 23, 59),
+        progress=progress.append,
+    )
+
+    rows = list(csv.DictReader(io.StringIO(buffer.getvalue())))
+    assert written == len(rows) == 4
+    assert progress == [3, 4]
+    assert [row["product_name"] for row in rows] == ["Bolt", "Rope", "Bolt", "Rope"]
+    assert rows[0]["client_company_name"] == "Buyer"
+
+
+def test_export_orders_to_parquet(db_session: Session, tmp_path: Path):
+    path = tmp_path / "orders.parquet"
+    written = export_orders(db_session, str(path), "parquet", batch_size=4)
+
+    parquet_file = pq.ParquetFile(path)
+    assert written == parquet_file.metadata.num_rows == 11
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.schema.equals(EXPORT_SCHEMA)
+    assert table.column("quantity").to_pylist()[:4] == [1.0, 2.0, 2.0, 2.0]
+
+
+def test_export_orders_rejects_unknown_format(db_session: Session):
+    with pytest.raises(ValueError):
+        export_orders(db_session, io.StringIO(), "xlsx")
@@ -0,0 +1,63 @@
+# tests/test_order_queries.py
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Client, ClientCategory, Order, PaymentStatus
+from app.order_queries import OrderFilters, fetch_order_page
+
+
+@pytest.fixture(scope="function")
+def db_session(db_session: Session) -> Session:
+    first = Client(category=ClientCategory.COMPANY, company_name="First", vat_id="1")
+    second = Client(category=ClientCategory.COMPANY, company_name="Second", vat_id="2")
+    db_session.add_all([first, second])
+    for day in range(1, 8):
+        db_session.add(
+            Order(
+                client=first if day % 2 else second,
+                order_date=datetime(2025, 1, day),
+                invoice_number=f"FV/{day}/1/2025" if day <= 3 else None,
+                payment_status=PaymentStatus.PAID if day == 2 else PaymentStatus.UNPAID,
+            )
+        )
+    # Two orders sharing a timestamp must both appear exactly once.
+    db_session.add(Order(client=first, order_date=datetime(2025, 1, 7)))
+    db_session.commit()
+    return db_session
+
+
+def test_keyset_pages_cover_all_orders_once(db_session: Session):
+    seen = []
+    page = fetch_order_page(db_session, page_size=3)
+    seen.extend(page.orders)
+    while page.next_cursor:
+        page = fetch_order_page(db_session, page_size=3, after=page.next_cursor)
+        seen.extend(page.orders)
+
+    assert len(seen) == 8
+    assert len({order.id for order in seen}) == 8
+    keys = [(order.order_date, order.id) for order in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filters_are_applied_in_sql(db_session: Session):
+    page = fetch_order_page(
+        db_session,
+        OrderFilters(invoice_prefix="FV/", payment_status=PaymentStatus.UNPAID),
+    )
+    assert {order.invoice_number for order in page.orders} == {
+        "FV/1/1/2025",
+        "FV/3/1/2025",
+    }
+    assert len(page.orders) == 2
+    assert page.next_cursor is None
+
+    client_id = db_session.query(Client.id).filter_by(company_name="Second").scalar()
+    page = fetch_order_page(
+        db_session,
+        OrderFilters(client_id=client_id, date_from=datetime(2025, 1, 3)),
+    )
+    assert [order.order_date.day for order in page.orders] == [6, 4]
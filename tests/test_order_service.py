@@ -0,0 +1,126 @@
+# tests/test_order_service.py
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.inventory import InsufficientStockError
+from app.models import (
+    Client,
+    ClientCategory,
+    InventoryMovement,
+    Order,
+    OrderItem,
+    PaymentMethod,
+    PaymentStatus,
+    Product,
+    ProductUnit,
+    SalesMonthlyRollup,
+)
+from app.order_service import OrderLine, OrderService, OrderValidationError
+
+
+@pytest.fixture(scope="function")
+def db_session(db_session: Session) -> Session:
+    db_session.add_all(
+        [
+            Client(id=1, category=ClientCategory.COMPANY, company_name="Buyer"),
+            Product(
+                id=1, name="Bolt", product_index=1, unit=ProductUnit.PCS, stock=10_000
+            ),
+            Product(
+                id=2,
+                name="Rope",
+                product_index=2,
+                unit=ProductUnit.M,
+                stock=50,
+                vat_rate=8.0,
+            ),
+        ]
+    )
+    db_session.commit()
+    return db_session
+
+
+def test_create_order_writes_order_items_stock_and_rollups(db_session: Session):
+    order = OrderService(db_session).create_order(
+        1,
+        [OrderLine(1, 2, 10.0), OrderLine(2, 1.5, 4.0)],
+        order_date=datetime(2025, 3, 1),
+    )
+    db_session.commit()
+    db_session.expire_all()
+
+    stored = db_session.get(Order, order.id)
+    assert stored is not None
+    assert (stored.total_net, stored.total_vat, stored.total_gross) == (
+        26.0,
+        5.08,
+        31.08,
+    )
+    assert stored.vat_breakdown["8"] == {"net": 6.0, "vat": 0.48, "gross": 6.48}
+    assert [(i.product.name, i.quantity, i.vat_rate) for i in stored.items] == [
+        ("Bolt", 2, 23.0),
+        ("Rope", 1.5, 8.0),
+    ]
+    assert db_session.get(Product, 2).stock == 48.5  # type: ignore[union-attr]
+    assert db_session.scalar(select(func.count(InventoryMovement.id))) == 2
+    rollup = db_session.get(SalesMonthlyRollup, (2025, 3))
+    assert rollup is not None and rollup.total_gross == 31.08
+
+
+def test_create_order_uses_one_insert_per_table(db_session: Session):
+    statements: list[str] = []
+    event.listen(
+        db_session.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    order = OrderService(db_session).create_order(
+        1, [OrderLine(1, 1, 1.0) for _ in range(500)]
+    )
+
+    assert len(order.items) == 500
+    assert sum(s.startswith("INSERT INTO order_items") for s in statements) == 1
+    assert sum(s.startswith("SELECT products.id") for s in statements) <= 2
+
+
+def test_create_order_reports_every_invalid_line(db_session: Session):
+    with pytest.raises(OrderValidationError) as excinfo:
+        OrderService(db_session).create_order(
+            1,
+            [
+                OrderLine(1, 1.5, 10.0),
+                OrderLine(99, 1, 10.0),
+                OrderLine(2, 0.5, 0),
+            ],
+        )
+    assert excinfo.value.problems == [
+        "Line 1: quantity of 'Bolt' must be a whole number (unit 'pcs').",
+        "Line 2: product 99 not found.",
+        "Line 3: price must be positive.",
+    ]
+    assert db_session.scalar(select(func.count(Order.id))) == 0
+
+
+def test_create_order_fails_without_enough_stock(db_session: Session):
+    with pytest.raises(InsufficientStockError):
+        OrderService(db_session).create_order(1, [OrderLine(2, 51, 1.0)])
+    db_session.rollback()
+    assert db_session.scalar(select(func.count(OrderItem.id))) == 0
+
+
+def test_issue_invoice(db_session: Session):
+    service = OrderService(db_session)
+    order = service.create_order(1, [OrderLine(1, 1, 100.0)])
+    number = service.issue_invoice(
+        order, date(2025, 4, 1), PaymentMethod.CASH, paid=True
+    )
+    db_session.commit()
+
+    assert order.invoice_number == number
+    assert order.payment_status == PaymentStatus.PAID
+    with pytest.raises(ValueError):
+        service.issue_invoice(order, None, PaymentMethod.CASH)
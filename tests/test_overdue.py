@@ -0,0 +1,73 @@
+# tests/test_overdue.py
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import app.overdue as overdue
+from app.models import Client, ClientCategory, Order, PaymentStatus
+from app.overdue import mark_overdue_orders, start_overdue_sweeper
+
+NOW = datetime(2025, 3, 15, 12, 30)
+
+
+@pytest.fixture(scope="function")
+def db_session(db_session: Session) -> Session:
+    client = Client(category=ClientCategory.COMPANY, company_name="Buyer")
+    db_session.add_all(
+        [
+            # Past due: becomes overdue.
+            Order(id=1, client=client, payment_due_date=datetime(2025, 3, 1)),
+            Order(id=2, client=client, payment_due_date=datetime(2025, 3, 14)),
+            # Due today, due later, never invoiced: stay unpaid.
+            Order(id=3, client=client, payment_due_date=datetime(2025, 3, 15)),
+            Order(id=4, client=client, payment_due_date=datetime(2025, 4, 1)),
+            Order(id=5, client=client, payment_due_date=None),
+            # Already settled.
+            Order(
+                id=6,
+                client=client,
+                payment_due_date=datetime(2025, 1, 1),
+                payment_status=PaymentStatus.PAID,
+            ),
+        ]
+    )
+    db_session.commit()
+    return db_session
+
+
+def test_mark_overdue_orders_flips_only_unpaid_orders_past_due(db_session: Session):
+    order = db_session.get_one(Order, 1)
+    assert mark_overdue_orders(db_session, now=NOW) == 2
+    # Loaded objects see the new status.
+    assert order.payment_status == PaymentStatus.OVERDUE
+
+    statuses = dict(
+        db_session.execute(select(Order.id, Order.payment_status)).tuples().all()
+    )
+    assert statuses == {
+        1: PaymentStatus.OVERDUE,
+        2: PaymentStatus.OVERDUE,
+        3: PaymentStatus.UNPAID,
+        4: PaymentStatus.UNPAID,
+        5: PaymentStatus.UNPAID,
+        6: PaymentStatus.PAID,
+    }
+    # A second sweep has nothing left to do.
+    assert mark_overdue_orders(db_session, now=NOW) == 0
+
+
+def test_start_overdue_sweeper_runs_once_per_process(monkeypatch: pytest.MonkeyPatch):
+    sweeps = []
+    monkeypatch.setattr(overdue, "sweep_overdue_orders", lambda: sweeps.append(1))
+    start_overdue_sweeper.cache_clear()
+    try:
+        assert start_overdue_sweeper(0) is None
+        stop = start_overdue_sweeper(3600)
+        assert stop is not None
+        assert start_overdue_sweeper(3600) is stop
+        stop.set()
+    finally:
+        start_overdue_sweeper.cache_clear()
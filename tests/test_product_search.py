@@ -0,0 +1,33 @@
+# tests/test_product_search.py
+
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Product, ProductUnit
+from app.product_search import search_products
+
+
+@pytest.fixture(scope="function")
+def db_session(db_session: Session) -> Session:
+    names = ["Steel Bolt M8", "Bolt", "Anchor bolt", "Bolt cutter", "Nut M8", "50% off"]
+    db_session.add_all(
+        Product(name=name, product_index=i, unit=ProductUnit.PCS)
+        for i, name in enumerate(names, start=1)
+    )
+    db_session.commit()
+    return db_session
+
+
+def test_search_ranks_exact_then_prefix_then_substring(db_session: Session):
+    names = [p.name for p in search_products(db_session, "bolt")]
+    assert names == ["Bolt", "Bolt cutter", "Steel Bolt M8", "Anchor bolt"]
+
+
+def test_search_respects_limit_and_blank_terms(db_session: Session):
+    assert len(search_products(db_session, "bolt", limit=2)) == 2
+    assert search_products(db_session, "   ") == []
+
+
+def test_search_escapes_like_wildcards(db_session: Session):
+    assert [p.name for p in search_products(db_session, "%")] == ["50% off"]
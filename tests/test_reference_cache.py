@@ -0,0 +1,159 @@
+# tests/test_reference_cache.py
+
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, Table, event, update
+from sqlalchemy.orm import Session
+
+import app.reference_cache as reference_cache_module
+from app.importers import _copy_rows
+from app.models import (
+    Client,
+    ClientCategory,
+    CompanyProfile,
+    Product,
+    ProductUnit,
+)
+from app.reference_cache import (
+    ReferenceCache,
+    get_clients,
+    get_company_profile,
+    get_recent_products,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(scope="function")
+def cache(monkeypatch: pytest.MonkeyPatch) -> ReferenceCache:
+    cache = ReferenceCache()
+    monkeypatch.setattr(reference_cache_module, "reference_cache", cache)
+    return cache
+
+
+@pytest.fixture(scope="function")
+def engine(engine: Engine) -> Engine:
+    with Session(engine) as db:
+        db.add_all(
+            [
+                Client(category=ClientCategory.COMPANY, company_name="Buyer"),
+                CompanyProfile(company_name="Seller"),
+                Product(name="Widget", product_index=1, unit=ProductUnit.PCS),
+            ]
+        )
+        db.commit()
+    return engine
+
+
+def count_statements(engine: Engine) -> list[str]:
+    statements: list[str] = []
+    event.listen(
+        engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+    return statements
+
+
+def test_reference_data_is_loaded_once_across_sessions(
+    cache: ReferenceCache, engine: Engine
+):
+    with Session(engine) as db:
+        assert [c.display_name for c in get_clients(db)] == ["Buyer"]
+        company = get_company_profile(db)
+        assert company is not None
+        assert company.company_name == "Seller"
+        assert [p.name for p in get_recent_products(db, 20)] == ["Widget"]
+        db.commit()  # the detached results survive the session's commit
+
+    statements = count_statements(engine)
+    with Session(engine) as db:
+        assert [c.display_name for c in get_clients(db)] == ["Buyer"]
+        company = get_company_profile(db)
+        assert company is not None
+        assert company.company_name == "Seller"
+    assert statements == []
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 3, 3)
+    assert stats.hit_rate == 0.4
+
+
+def test_commits_invalidate_only_the_tables_they_change(
+    cache: ReferenceCache, engine: Engine
+):
+    with Session(engine) as db:
+        get_clients(db)
+        get_recent_products(db, 20)
+
+        # A flushed insert, rolled back: nothing changes.
+        db.add(Client(category=ClientCategory.COMPANY, company_name="Rolled back"))
+        db.flush()
+        db.rollback()
+        assert cache.stats().invalidations == 0
+
+        db.add(Client(category=ClientCategory.INDIVIDUAL, first_name="Ann"))
+        db.commit()
+        assert cache.stats().entries == 1
+        assert len(get_clients(db)) == 2
+
+        # Bulk statements invalidate too.
+        db.execute(update(Product).values(stock=Product.stock + 1))
+        db.commit()
+        assert get_recent_products(db, 20)[0].stock == 1
+    assert cache.stats().invalidations == 2
+
+
+def test_cache_respects_size_and_age_bounds():
+    clock = FakeClock()
+    cache = ReferenceCache(max_entries=2, max_bytes=1024, ttl_seconds=60, clock=clock)
+    for key in "abc":
+        cache.get_or_load(key, ["t"], key.upper)
+    assert cache.stats().entries == 2
+    assert cache.stats().evictions == 1
+
+    cache.get_or_load("big", ["t"], lambda: "x" * 2048)
+    assert cache.stats().entries == 2
+
+    clock.now = 61
+    cache.get_or_load("b", ["t"], lambda: "reloaded")
+    assert cache.stats().evictions == 2
+
+
+def test_a_load_racing_an_invalidation_is_not_stored():
+    cache = ReferenceCache()
+
+    def load_during_commit() -> str:
+        cache.invalidate(["clients"])
+        return "stale"
+
+    assert cache.get_or_load("clients", ["clients"], load_during_commit) == "stale"
+    assert cache.get_or_load("clients", ["clients"], lambda: "fresh") == "fresh"
+
+
+def test_raw_copy_loads_invalidate_on_commit(
+    cache: ReferenceCache, engine: Engine, monkeypatch: pytest.MonkeyPatch
+):
+    class CopyCursor:
+        """Stands in for the psycopg2 cursor of a PostgreSQL connection."""
+
+        def copy_expert(self, sql: str, buffer: Any) -> None:
+            copied.append(buffer.read())
+
+        def close(self) -> None:
+            pass
+
+    copied: list[str] = []
+    with Session(engine) as db:
+        get_clients(db)
+        monkeypatch.setattr(db.connection().connection, "cursor", CopyCursor)
+        clients: Table = Client.__table__  # type: ignore[assignment]
+        _copy_rows(db, clients, ["company_name"], [("Acme",)])
+        db.commit()
+    assert copied == ["Acme\r\n"]
+    assert cache.stats().entries == 0
+    assert cache.stats().invalidations == 1
@@ -0,0 +1,128 @@
+# tests/test_render_jobs.py
+
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import Session
+
+import app.invoice_archive as invoice_archive
+from app.models import (
+    Client,
+    ClientCategory,
+    CompanyProfile,
+    InvoiceDocument,
+    Order,
+    OrderItem,
+    Product,
+    ProductUnit,
+    RenderJob,
+    RenderJobStatus,
+)
+from app.render_jobs import claim_next_job, enqueue_render, fail_job
+from app.render_worker import RenderWorker
+
+NOW = datetime(2025, 3, 15, 12, 30)
+
+
+def fake_render(db: Session, order_id: int) -> bytes:
+    """Renders order 1 instantly and hangs on every other order."""
+    if order_id != 1:
+        time.sleep(60)
+    return b"%%PDF-1.7 order %d" % order_id
+
+
+@pytest.fixture(scope="function")
+def database_url(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    # Read by the renderer processes when they import app.invoice_archive.
+    monkeypatch.setenv("INVOICE_ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(invoice_archive, "INVOICE_ARCHIVE_DIR", tmp_path / "archive")
+    return f"sqlite:///{tmp_path / 'erp.db'}"
+
+
+@pytest.fixture(scope="function")
+def db_session(db_session: Session) -> Session:
+    """Seeds two invoiced orders in a file database the renderers can open."""
+    client = Client(category=ClientCategory.COMPANY, company_name="Buyer")
+    product = Product(name="Widget", product_index=1, unit=ProductUnit.PCS)
+    db_session.add_all([client, product, CompanyProfile(company_name="Seller")])
+    for number in (1, 2):
+        order = Order(id=number, client=client, invoice_number=f"FV/{number}/3/2025")
+        order.items.append(
+            OrderItem(product=product, quantity=1, price_per_unit=10.0, vat_rate=23.0)
+        )
+        db_session.add(order)
+    db_session.commit()
+    return db_session
+
+
+def test_enqueue_render_reuses_the_job_of_the_same_invoice(db_session: Session):
+    job = enqueue_render(db_session, 1)
+    assert job.status == RenderJobStatus.QUEUED
+    assert enqueue_render(db_session, 1) is job
+    assert enqueue_render(db_session, 2) is not job
+
+    job.status = RenderJobStatus.FAILED
+    assert enqueue_render(db_session, 1) is not job
+
+
+def test_claim_retries_failed_and_abandoned_jobs(db_session: Session):
+    job = enqueue_render(db_session, 1)
+    job.run_after = NOW
+    db_session.commit()
+
+    assert claim_next_job(db_session, 60, max_attempts=3, now=NOW) is job
+    assert (job.status, job.attempts) == (RenderJobStatus.RUNNING, 1)
+    assert claim_next_job(db_session, 60, max_attempts=3, now=NOW) is None
+
+    # A failed attempt is retried after a delay.
+    fail_job(job, "boom", max_attempts=3, now=NOW)
+    assert job.status == RenderJobStatus.QUEUED
+    assert claim_next_job(db_session, 60, max_attempts=3, now=NOW) is None
+    later = NOW + timedelta(minutes=1)
+    assert claim_next_job(db_session, 60, max_attempts=3, now=later) is job
+    assert job.attempts == 2
+
+    # A worker that died leaves a running job behind; its lease runs out.
+    expired = later + timedelta(minutes=2)
+    assert claim_next_job(db_session, 60, max_attempts=3, now=expired) is job
+    assert job.attempts == 3
+    assert claim_next_job(db_session, 60, max_attempts=3, now=expired) is None
+    # Out of attempts, the next expiry fails it for good.
+    gone = expired + timedelta(minutes=2)
+    assert claim_next_job(db_session, 60, max_attempts=3, now=gone) is None
+    db_session.refresh(job)
+    assert job.status == RenderJobStatus.FAILED
+
+
+def test_worker_renders_jobs_and_kills_renders_that_time_out(
+    database_url: str, db_session: Session
+):
+    done = enqueue_render(db_session, 1)
+    hung = enqueue_render(db_session, 2)
+    db_session.commit()
+
+    worker = RenderWorker(
+        database_url,
+        workers=2,
+        timeout=3,
+        max_attempts=1,
+        poll_interval=0.1,
+        render=fake_render,
+    )
+    try:
+        worker.run(until_idle=True)
+    finally:
+        worker.close()
+
+    db_session.expire_all()
+    assert done.status == RenderJobStatus.DONE
+    assert done.result_path is not None
+    assert Path(done.result_path).read_bytes() == b"%PDF-1.7 order 1"
+    document = db_session.get_one(InvoiceDocument, 1)
+    assert Path(done.result_path).name == f"{document.sha256}.pdf"
+    assert db_session.get(InvoiceDocument, 2) is None
+    assert hung.status == RenderJobStatus.FAILED
+    assert hung.error == "Rendering timed out after 3s."
+    assert db_session.get_one(RenderJob, hung.id).attempts == 1
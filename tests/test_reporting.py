@@ -0,0 +1,94 @@
+# tests/test_reporting.py
+
+from datetime import date, datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Client,
+    ClientCategory,
+    Order,
+    OrderItem,
+    Product,
+    ProductUnit,
+    SalesClientRollup,
+    SalesDailyRollup,
+    SalesMonthlyRollup,
+    SalesVatRollup,
+)
+from app.reporting import (
+    ROLLUP_MODELS,
+    rebuild_rollups,
+    record_order_created,
+    record_order_invoiced,
+)
+
+
+def create_order(db: Session, client: Client, day: int, lines: list) -> Order:
+    order = Order(client=client, order_date=datetime(2025, 3, day, 12))
+    for product, quantity, price, vat_rate in lines:
+        order.items.append(
+            OrderItem(
+                product=product,
+                quantity=quantity,
+                price_per_unit=price,
+                vat_rate=vat_rate,
+            )
+        )
+    db.add(order)
+    db.flush()
+    record_order_created(db, order)
+    return order
+
+
+def snapshot(db: Session) -> dict:
+    return {
+        model.__tablename__: sorted(
+            tuple(
+                round(value, 2) if isinstance(value, float) else value for value in row
+            )
+            for row in db.execute(select(*model.__table__.columns))
+        )
+        for model in ROLLUP_MODELS
+    }
+
+
+def test_incremental_rollups_match_full_rebuild(db_session: Session):
+    client = Client(category=ClientCategory.COMPANY, company_name="Buyer")
+    widget = Product(name="Widget", product_index=1, unit=ProductUnit.PCS)
+    book = Product(name="Book", product_index=2, unit=ProductUnit.PCS)
+    first = create_order(db_session, client, 1, [(widget, 2, 10.0, 23.0)])
+    create_order(db_session, client, 1, [(widget, 1, 10.0, 23.0), (book, 1, 50.0, 5.0)])
+    create_order(db_session, client, 2, [(book, 2, 50.0, 5.0)])
+    first.invoice_number = "FV/1/3/2025"
+    record_order_invoiced(db_session, first)
+    db_session.commit()
+
+    incremental = snapshot(db_session)
+    rebuild_rollups(db_session)
+    db_session.commit()
+    assert snapshot(db_session) == incremental
+
+    day = db_session.get_one(SalesDailyRollup, date(2025, 3, 1))
+    assert (day.order_count, day.total_gross, day.invoice_count) == (2, 89.4, 1)
+    month = db_session.get_one(SalesMonthlyRollup, (2025, 3))
+    assert (month.order_count, month.total_net) == (3, 180.0)
+    assert db_session.get_one(SalesClientRollup, client.id).invoiced_gross == 24.6
+    reduced = db_session.get_one(SalesVatRollup, 5.0)
+    assert (reduced.order_count, reduced.total_vat) == (2, 7.5)
+
+
+def test_rebuild_sums_the_rounded_vat_of_each_order(db_session: Session):
+    client = Client(category=ClientCategory.COMPANY, company_name="Buyer")
+    pen = Product(name="Pen", product_index=1, unit=ProductUnit.PCS)
+    for day in (1, 2, 3):
+        create_order(db_session, client, day, [(pen, 1, 0.33, 8.0)])
+    db_session.commit()
+
+    incremental = snapshot(db_session)
+    rebuild_rollups(db_session)
+    db_session.commit()
+    assert snapshot(db_session) == incremental
+    # 3 x round(0.0264, 2), not round(3 x 0.0264, 2).
+    assert round(db_session.get_one(SalesVatRollup, 8.0).total_vat, 2) == 0.09
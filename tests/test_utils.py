@@ -1,33 +1,18 @@
 # tests/test_utils.py (FINAL, CLEANED VERSION)
 
-from collections.abc import Generator  # <-- NEW, REQUIRED IMPORT
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
 # Imports must now be explicit from the 'app' package
-from app.models import Base, Client, ClientCategory, Order
-from app.utils import get_next_invoice_number
-
-
-# --- Test Setup ---
-@pytest.fixture(scope="function")
-def db_session() -> Generator[
-    Session, None, None
-]:  # <-- FIX: Correct return type for a generator
-    """
-    Pytest fixture to create a temporary, in-memory SQLite database
-    for each test function.
-    """
-    engine = create_engine("sqlite:///:memory:")
-    Base.metadata.create_all(engine)
-    session = Session(engine)
-    try:
-        yield session
-    finally:
-        session.close()
+from app.models import Base, Client, ClientCategory, Order, Product, ProductUnit
+from app.utils import (
+    get_next_invoice_number,
+    get_next_product_index,
+    reserve_product_indexes,
+)
 
 
 # --- Tests for get_next_invoice_number ---
@@ -59,3 +44,55 @@ def test_get_next_invoice_number_with_existing_invoices(db_session: Session):
     next_number = get_next_invoice_number(db_session)
     expected_number = f"FV/6/{now.month}/{now.year}"
     assert next_number == expected_number
+
+
+def test_get_next_invoice_number_reserves_consecutive_numbers(db_session: Session):
+    now = datetime.now()
+    numbers = [get_next_invoice_number(db_session) for _ in range(3)]
+    assert numbers == [f"FV/{n}/{now.month}/{now.year}" for n in (1, 2, 3)]
+
+
+def test_get_next_invoice_number_returns_rolled_back_numbers(db_session: Session):
+    get_next_invoice_number(db_session)
+    db_session.commit()
+    get_next_invoice_number(db_session)
+    db_session.rollback()
+    now = datetime.now()
+    assert get_next_invoice_number(db_session) == f"FV/2/{now.month}/{now.year}"
+
+
+def test_get_next_invoice_number_is_gap_free_under_concurrency(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'erp.db'}")
+    Base.metadata.create_all(engine)
+
+    def issue_invoices() -> list[str]:
+        issued = []
+        for _ in range(5):
+            with Session(engine) as session:
+                issued.append(get_next_invoice_number(session))
+                session.commit()
+        return issued
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = [
+            number
+            for batch in executor.map(lambda _: issue_invoices(), range(4))
+            for number in batch
+        ]
+
+    assert sorted(int(number.split("/")[1]) for number in results) == list(range(1, 21))
+
+
+# --- Tests for product index allocation ---
+def test_get_next_product_index_on_empty_db(db_session: Session):
+    assert get_next_product_index(db_session) == 1
+    assert get_next_product_index(db_session) == 2
+
+
+def test_reserve_product_indexes_continues_after_existing_products(
+    db_session: Session,
+):
+    db_session.add(Product(name="Widget", product_index=41, unit=ProductUnit.PCS))
+    db_session.commit()
+    assert reserve_product_indexes(db_session, 3) == [42, 43, 44]
+    assert get_next_product_index(db_session) == 45